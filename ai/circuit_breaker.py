@@ -0,0 +1,74 @@
+# === Ryo AI Assistant - Circuit Breaker ===
+# Remembers which remote models are currently failing (quota, outages...) so we can
+# skip them for a while instead of paying a wasted round-trip on every question.
+
+import threading
+import time
+from typing import Dict
+
+
+class CircuitBreaker:
+    """Per-model health tracking with cooldowns, plus success/latency/error statistics."""
+
+    def __init__(self, cooldown_seconds: float = 30.0, quota_cooldown_seconds: float = 300.0):
+        """
+        Args:
+            cooldown_seconds (float): How long to skip a model after an ordinary error.
+            quota_cooldown_seconds (float): How long to skip a model after a quota/rate-limit error.
+        """
+        self.cooldown_seconds = cooldown_seconds
+        self.quota_cooldown_seconds = quota_cooldown_seconds
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, name: str) -> dict:
+        if name not in self._stats:
+            self._stats[name] = {
+                'successes': 0,
+                'failures': 0,
+                'total_latency': 0.0,
+                'last_error': None,
+                'open_until': 0.0,
+            }
+        return self._stats[name]
+
+    def allow(self, name: str) -> bool:
+        """True if the model may be tried now (healthy, or its cooldown has run out)."""
+        with self._lock:
+            return self._entry(name)['open_until'] <= time.monotonic()
+
+    def seconds_until_available(self, name: str) -> float:
+        with self._lock:
+            return max(0.0, self._entry(name)['open_until'] - time.monotonic())
+
+    def record_success(self, name: str, latency: float):
+        with self._lock:
+            entry = self._entry(name)
+            entry['successes'] += 1
+            entry['total_latency'] += latency
+            entry['open_until'] = 0.0
+
+    def record_failure(self, name: str, error: Exception, quota: bool = False):
+        """Marks the model as failing; it will be skipped until the cooldown expires."""
+        cooldown = self.quota_cooldown_seconds if quota else self.cooldown_seconds
+        with self._lock:
+            entry = self._entry(name)
+            entry['failures'] += 1
+            entry['last_error'] = str(error)
+            entry['open_until'] = time.monotonic() + cooldown
+        print(f"[CircuitBreaker] Skipping {name} for {cooldown:.0f}s after error: {error}")
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Get per-model statistics"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    'successes': entry['successes'],
+                    'failures': entry['failures'],
+                    'avg_latency': (entry['total_latency'] / entry['successes']) if entry['successes'] else 0.0,
+                    'last_error': entry['last_error'],
+                    'available': entry['open_until'] <= now,
+                }
+                for name, entry in self._stats.items()
+            }
@@ -0,0 +1,258 @@
+# === Ryo AI Assistant - Google Gemini Handler ===
+# This file manages all communication with the Google Gemini API.
+# Configured model clients are created once and reused, and a circuit breaker
+# remembers which model is failing so we don't keep trying it on every question.
+# The system prompt is set once per client as its system instruction, and each
+# question is sent through a chat session holding the conversation so far. That session is
+# kept for the next question of the same conversation; one is started afresh (seeded with
+# the history) only when the conversation has changed some other way: a new session, a
+# trimmed history, or an answer from another model. The Gemini API itself is stateless,
+# so each request still carries the history, the same way the Ollama path sends it.
+
+import time
+import threading
+from ai.circuit_breaker import CircuitBreaker
+from core.config import (
+    GEMINI_API_KEY,
+    GEMINI_MODELS,
+    GEMINI_COOLDOWN_SECONDS,
+    GEMINI_QUOTA_COOLDOWN_SECONDS,
+)
+
+
+def _import_genai():
+    # Imported on first use rather than with this module: google.generativeai pulls in gRPC
+    # and protobuf, which takes a noticeable part of a second at startup.
+    try:
+        import google.generativeai as genai
+    except ImportError:
+        genai = None
+    return genai
+
+
+class GeminiError(Exception):
+    """Base class for everything that can go wrong while talking to Gemini."""
+
+
+class GeminiQuotaError(GeminiError):
+    """Every usable Gemini model is out of quota."""
+
+
+def _is_quota_error(error: Exception) -> bool:
+    error_str = f"{type(error).__name__} {error}".lower()
+    return "quota" in error_str or "exceeded" in error_str or "resourceexhausted" in error_str or "429" in error_str
+
+
+class GeminiHandler:
+    """A client for Google Gemini that reuses configured models and falls back between them."""
+
+    def __init__(self, api_key: str = GEMINI_API_KEY, models=GEMINI_MODELS, breaker: CircuitBreaker = None,
+                 genai_module=None):
+        """
+        Args:
+            api_key (str): The Gemini API key.
+            models (list): Model names in order of preference; later ones are fallbacks.
+            breaker (CircuitBreaker, optional): Shared health tracker for the models.
+            genai_module: The google.generativeai module (tests pass a local fake). Imported
+                          on first use when not given.
+        """
+        self.api_key = api_key
+        self.models = list(models)
+        self.breaker = breaker or CircuitBreaker(GEMINI_COOLDOWN_SECONDS, GEMINI_QUOTA_COOLDOWN_SECONDS)
+        self._genai = genai_module
+        self._genai_loaded = genai_module is not None
+        self._genai_lock = threading.Lock()
+        self._clients = {}
+        self._configured = False
+        # model name -> (the history a kept chat session holds, the session)
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+        # Add system prompt to match Ollama behavior
+        self.system_prompt = (
+            "You are Ryo, a smart and efficient AI voice assistant. Keep responses brief and to the point.\n\n"
+            "Your personality:\n"
+            "- Helpful and friendly\n"
+            "- Concise in responses\n"
+            "- Good at math and problem solving\n"
+            "- Can manage todo lists\n"
+            "- Responds naturally to casual conversation\n\n"
+            "Important: If the user asks 'what model am I using right now', 'which model am I using', or 'what AI model am I using', always respond with 'You are currently using the Gemini model.'\n\n"
+            "Keep responses under 2-3 sentences unless the user asks for more detail."
+        )
+
+    def ask(self, question: str, history: list = None) -> str:
+        """Asks Gemini a question and returns the answer (or a spoken-friendly error).
+
+        history holds the earlier {"role", "content"} turns of the conversation, oldest first.
+        """
+        problem = self._setup_problem()
+        if problem:
+            return problem
+        try:
+            return self.generate(question, history)
+        except GeminiQuotaError:
+            return "Gemini API quota exceeded. Please try again later or check your Google AI Studio quota."
+        except GeminiError as e:
+            return f"Gemini API error: {e}"
+
+    def ask_stream(self, question: str, history: list = None):
+        """Like ask(), but yields text chunks as Gemini produces them.
+
+        The generator returns True if the whole answer was streamed, and False if it broke off
+        part way or failed.
+        """
+        problem = self._setup_problem()
+        if problem:
+            yield problem
+            return False
+        produced = False
+        try:
+            for chunk in self.generate_stream(question, history):
+                produced = True
+                yield chunk
+        except GeminiQuotaError:
+            if not produced:
+                yield "Gemini API quota exceeded. Please try again later or check your Google AI Studio quota."
+            return False
+        except GeminiError as e:
+            if not produced:
+                yield f"Gemini API error: {e}"
+            return False
+        return True
+
+    def generate(self, question: str, history: list = None) -> str:
+        """Returns Gemini's answer from the first healthy model. Raises a GeminiError if none works."""
+        last_error = None
+        for model_name in self._candidates():
+            started = time.monotonic()
+            try:
+                print(f"[DEBUG] Trying Gemini model: {model_name}")
+                chat = self._chat(model_name, history)
+                response = chat.send_message(question)
+                result = response.text.strip() if hasattr(response, 'text') else str(response)
+                self.breaker.record_success(model_name, time.monotonic() - started)
+                self._keep_chat(model_name, chat, history, question, result)
+                print(f"[DEBUG] Gemini response received: {result[:100]}...")
+                return result
+            except Exception as e:
+                last_error = e
+                print(f"[DEBUG] Gemini model {model_name} error: {e}")
+                self.breaker.record_failure(model_name, e, quota=_is_quota_error(e))
+        raise self._exhausted(last_error)
+
+    def generate_stream(self, question: str, history: list = None):
+        """
+        Yields Gemini's answer in chunks. Falls back to the next model only if nothing was produced
+        yet; a model failing part way through its answer raises a GeminiError after what it produced.
+        """
+        last_error = None
+        for model_name in self._candidates():
+            started = time.monotonic()
+            produced = False
+            try:
+                print(f"[DEBUG] Streaming from Gemini model: {model_name}")
+                chat = self._chat(model_name, history)
+                pieces = []
+                for chunk in chat.send_message(question, stream=True):
+                    text = getattr(chunk, "text", "")
+                    if text:
+                        produced = True
+                        pieces.append(text)
+                        yield text
+                self.breaker.record_success(model_name, time.monotonic() - started)
+                self._keep_chat(model_name, chat, history, question, "".join(pieces).strip())
+                return
+            except Exception as e:
+                last_error = e
+                print(f"[DEBUG] Gemini model {model_name} error: {e}")
+                self.breaker.record_failure(model_name, e, quota=_is_quota_error(e))
+                if produced:
+                    # Part of the answer is already out; switching models now would garble it.
+                    raise self._exhausted(e)
+        raise self._exhausted(last_error)
+
+    @property
+    def genai(self):
+        return self.load_library()
+
+    def load_library(self):
+        """Imports google.generativeai if that hasn't happened yet. Returns it, or None if it isn't installed."""
+        if not self._genai_loaded:
+            with self._genai_lock:
+                if not self._genai_loaded:
+                    self._genai = _import_genai()
+                    self._genai_loaded = True
+        return self._genai
+
+    def is_configured(self) -> bool:
+        """True if an API key is set and the library is installed."""
+        return bool(self.api_key) and self.genai is not None
+
+    def get_stats(self) -> dict:
+        """Per-model success count, average latency, failures and availability."""
+        return self.breaker.get_stats()
+
+    def _setup_problem(self):
+        """Returns a spoken-friendly message if Gemini can't be used at all, otherwise None."""
+        if not self.api_key:
+            print("[DEBUG] Gemini API key not found")
+            return "Gemini API key not found. Please set GEMINI_API_KEY in your .env file."
+        if self.genai is None:
+            print("[DEBUG] google-generativeai library not installed")
+            return "google-generativeai library not installed. Please install it."
+        return None
+
+    def _chat(self, model_name: str, history: list = None):
+        """
+        A chat session on the model's cached client holding the conversation so far: the one
+        kept from the previous question if it holds exactly this history, otherwise a new one
+        seeded with it. A kept session is taken out while in use, so two questions at once
+        never share one.
+        """
+        history = history or []
+        with self._sessions_lock:
+            kept = self._sessions.pop(model_name, None)
+        if kept is not None and kept[0] == history:
+            return kept[1]
+        turns = [
+            {"role": "model" if turn["role"] == "assistant" else "user", "parts": [turn["content"]]}
+            for turn in history
+        ]
+        return self._client(model_name).start_chat(history=turns)
+
+    def _keep_chat(self, model_name: str, chat, history: list, question: str, answer: str):
+        """Keeps a session that has just answered, for the conversation's next question."""
+        held = list(history or []) + [{"role": "user", "content": question}, {"role": "assistant", "content": answer}]
+        with self._sessions_lock:
+            self._sessions[model_name] = (held, chat)
+
+    def _client(self, model_name: str):
+        """Returns the configured client for a model, creating it on first use only."""
+        if not self._configured:
+            self.genai.configure(api_key=self.api_key)
+            self._configured = True
+        if model_name not in self._clients:
+            self._clients[model_name] = self.genai.GenerativeModel(model_name, system_instruction=self.system_prompt)
+        return self._clients[model_name]
+
+    def _candidates(self):
+        """Models to try, in preference order, skipping any whose circuit is open."""
+        candidates = [name for name in self.models if self.breaker.allow(name)]
+        if candidates:
+            return candidates
+        wait = min(self.breaker.seconds_until_available(name) for name in self.models)
+        print(f"[DEBUG] All Gemini models are cooling down ({wait:.0f}s left)")
+        return []
+
+    def _exhausted(self, last_error: Exception) -> GeminiError:
+        """Builds the error raised when no model produced an answer."""
+        if last_error is None:
+            # Nothing was tried: every model is cooling down. Report why the last one failed.
+            stats = self.breaker.get_stats()
+            reasons = [stats[name]['last_error'] or "" for name in self.models if name in stats]
+            if any(_is_quota_error(Exception(reason)) for reason in reasons):
+                return GeminiQuotaError("All Gemini models are out of quota")
+            return GeminiError("All models failed")
+        if _is_quota_error(last_error):
+            return GeminiQuotaError(str(last_error))
+        return GeminiError(str(last_error))
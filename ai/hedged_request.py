@@ -0,0 +1,183 @@
+# === Ryo AI Assistant - Hedged Requests ===
+# Sends one question to several AI backends and keeps whichever answers first.
+# In "race" mode every backend starts at once; in "hedge" mode the backup only
+# starts if the first backend hasn't produced anything after a short delay.
+# The backends that lose are cancelled, so they stop using the network and CPU. A backend
+# blocked waiting for its server can't notice that by itself; it registers with on_cancel()
+# how to break off its request (e.g. by closing the connection), and that is done at once.
+
+import queue
+import threading
+import time
+
+_CHUNK = "chunk"
+_DONE = "done"
+_running = threading.local()   # .attempt: the _Attempt whose backend runs on this thread
+
+
+def on_cancel(callback: callable) -> callable:
+    """
+    Registers callback() to run, on another thread, if the hedged attempt running on this
+    thread is cancelled; right away if it already has been. Does nothing outside an attempt.
+    Returns a function that unregisters the callback.
+    """
+    attempt = getattr(_running, "attempt", None)
+    if attempt is None:
+        return lambda: None
+    return attempt.add_cancel_callback(callback)
+
+
+class _Attempt:
+    """One backend's answer being produced on its own thread."""
+
+    def __init__(self, index: int, name: str, stream_factory: callable, events: queue.Queue):
+        self.index = index
+        self.name = name
+        self.stream_factory = stream_factory
+        self.events = events
+        self.cancelled = threading.Event()
+        self.thread = None
+        self._cancel_callbacks = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        with self._lock:
+            if self.cancelled.is_set():
+                return
+            self.cancelled.set()
+            callbacks, self._cancel_callbacks = self._cancel_callbacks, []
+        for callback in callbacks:
+            self._call(callback)
+
+    def add_cancel_callback(self, callback: callable) -> callable:
+        with self._lock:
+            if not self.cancelled.is_set():
+                self._cancel_callbacks.append(callback)
+                return lambda: self._remove_cancel_callback(callback)
+        self._call(callback)
+        return lambda: None
+
+    def _remove_cancel_callback(self, callback):
+        with self._lock:
+            if callback in self._cancel_callbacks:
+                self._cancel_callbacks.remove(callback)
+
+    def _call(self, callback):
+        try:
+            callback()
+        except Exception as e:
+            print(f"[Hedge] Cancelling {self.name} failed: {e}")
+
+    def _run(self):
+        _running.attempt = self
+        stream = None
+        complete = False
+        try:
+            stream = self.stream_factory()
+            while not self.cancelled.is_set():
+                try:
+                    chunk = next(stream)
+                except StopIteration as stop:
+                    # A backend's stream returns False when its answer broke off part way.
+                    complete = stop.value is not False
+                    break
+                if chunk:
+                    self.events.put((self.index, _CHUNK, chunk))
+        except Exception as e:
+            print(f"[Hedge] {self.name} failed: {e}")
+        finally:
+            # Closing the generator drops the backend's connection, which stops the generation server-side.
+            if stream is not None and hasattr(stream, "close"):
+                try:
+                    stream.close()
+                except Exception:
+                    pass
+            _running.attempt = None
+            self.events.put((self.index, _DONE, complete))
+
+
+def hedged_stream(backends, hedge_delay: float = 0.0, acceptable: callable = None, on_winner: callable = None):
+    """
+    Streams the answer of whichever backend is first to start a good answer.
+
+    Args:
+        backends (list): (name, stream_factory) pairs in order of preference. Each factory
+                         returns a fresh generator of text chunks for the question.
+        hedge_delay (float): 0 starts every backend at once ("race"). Otherwise each next backend
+                             is only started after waiting this many seconds without a good answer.
+        acceptable (callable, optional): Decides whether the start of a backend's answer (its chunks up to
+                                         the first one that isn't blank) is a real answer, e.g. not an
+                                         error message. Defaults to any non-blank text.
+        on_winner (callable, optional): Called with the winning backend's name.
+
+    The generator returns True if the winner streamed its whole answer, False otherwise.
+    """
+    acceptable = acceptable or (lambda text: bool(text and text.strip()))
+    events = queue.Queue()
+    attempts = [_Attempt(i, name, factory, events) for i, (name, factory) in enumerate(backends)]
+    first_chunks = {}   # index -> the start of the answer, up to its first non-blank chunk
+    leading = {}        # index -> blank chunks (e.g. a leading space) not yet followed by text
+    finished = set()
+    winner = None
+    started = 0
+    next_start = time.monotonic()
+
+    try:
+        # --- Step 1: Wait for the first backend whose answer starts well ---
+        while winner is None and len(finished) < len(attempts):
+            now = time.monotonic()
+            # Launch the next backend if it is due, or right away if everything started so far has failed.
+            if started < len(attempts) and (now >= next_start or len(finished) == started):
+                attempts[started].start()
+                print(f"[Hedge] Started {attempts[started].name}")
+                started += 1
+                next_start = now + hedge_delay
+                continue
+
+            timeout = None if started == len(attempts) else max(0.0, next_start - now)
+            try:
+                index, kind, chunk = events.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            if kind == _DONE:
+                finished.add(index)
+            elif index not in first_chunks:
+                if not chunk.strip():
+                    leading[index] = leading.get(index, "") + chunk   # too early to judge
+                    continue
+                first_chunks[index] = leading.pop(index, "") + chunk
+                if acceptable(first_chunks[index]):
+                    winner = attempts[index]
+
+        if winner is None:
+            # Nobody produced a good answer: fall back to what the most preferred backend said.
+            for attempt in attempts:
+                if attempt.index in first_chunks:
+                    yield first_chunks[attempt.index]
+                    return False
+            return False
+
+        # --- Step 2: Cancel the losers and stream the winner ---
+        print(f"[Hedge] {winner.name} won")
+        if on_winner:
+            on_winner(winner.name)
+        for attempt in attempts:
+            if attempt is not winner:
+                attempt.cancel()
+
+        yield first_chunks[winner.index]
+        while True:
+            index, kind, chunk = events.get()
+            if index != winner.index:
+                continue
+            if kind == _DONE:
+                return chunk
+            yield chunk
+    finally:
+        # Also reached when the caller stops listening half way: nothing may keep running.
+        for attempt in attempts:
+            attempt.cancel()
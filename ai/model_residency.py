@@ -0,0 +1,137 @@
+# === Ryo AI Assistant - Local Model Residency Manager ===
+# Loading a local model into RAM can take longer than answering the question itself.
+# This file keeps the Ollama model warm while the assistant is being used and gives
+# the memory back once it has been idle for a while.
+
+import threading
+import time
+from core.config import OLLAMA_KEEP_ALIVE_INTERVAL, OLLAMA_IDLE_UNLOAD_SECONDS
+
+
+class ModelResidencyManager:
+    """Preloads, keeps alive and unloads an Ollama model on a background thread."""
+
+    # Residency states, reported to the GUI through on_state_change.
+    UNLOADED = "unloaded"
+    WARMING = "warming up"
+    READY = "ready"
+    UNLOADING = "unloading"
+    ERROR = "error"
+
+    def __init__(
+        self,
+        handler,
+        keep_alive_interval: float = OLLAMA_KEEP_ALIVE_INTERVAL,
+        idle_unload_after: float = OLLAMA_IDLE_UNLOAD_SECONDS,
+        on_state_change: callable = None,
+    ):
+        """
+        Args:
+            handler (OllamaHandler): The handler whose model should be kept resident.
+            keep_alive_interval (float): Seconds between keep-alive pings while the model is in use.
+            idle_unload_after (float): Seconds without activity before the model is unloaded (0 = never).
+            on_state_change (callable, optional): Called with the new state string whenever it changes.
+        """
+        self.handler = handler
+        self.keep_alive_interval = keep_alive_interval
+        self.idle_unload_after = idle_unload_after
+        self.on_state_change = on_state_change
+        self.state = self.UNLOADED
+        # Ask the server to hold the model a little longer than the gap between our pings,
+        # so it never unloads on its own while we still consider the session active.
+        self.handler.keep_alive = f"{int(keep_alive_interval * 2 + 30)}s"
+
+        self._last_activity = time.monotonic()
+        self._last_ping = 0.0
+        self._warm_requested = False
+        self._wake = threading.Event()
+        self._running = False
+        self._thread = None
+
+    def start(self, preload: bool = True):
+        """Starts the background thread and (by default) preloads the model right away."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        if preload:
+            self.touch()
+
+    def stop(self, unload: bool = False):
+        """Stops the background thread, optionally unloading the model first."""
+        if not self._running:
+            return
+        self._running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if unload and self.state == self.READY:
+            self._unload()
+
+    def touch(self):
+        """Records user activity. Warms the model up again if it is not resident."""
+        self._last_activity = time.monotonic()
+        if self.state in (self.UNLOADED, self.ERROR):
+            self._warm_requested = True
+            self._wake.set()
+
+    def is_ready(self) -> bool:
+        return self.state == self.READY
+
+    def _set_state(self, state: str):
+        if state == self.state:
+            return
+        self.state = state
+        print(f"[ModelResidency] {self.handler.model}: {state}")
+        if self.on_state_change:
+            try:
+                self.on_state_change(state)
+            except Exception as e:
+                print(f"[ModelResidency] State callback error: {e}")
+
+    def _run(self):
+        """Background loop: serves warm-up requests, sends pings and unloads when idle."""
+        while self._running:
+            self._wake.clear()
+            now = time.monotonic()
+            if self._warm_requested:
+                self._warm_requested = False
+                self._load()
+            elif self.state == self.READY:
+                if self.idle_unload_after and now - self._last_activity >= self.idle_unload_after:
+                    self._unload()
+                elif now - self._last_ping >= self.keep_alive_interval:
+                    self._load()
+
+            self._wake.wait(timeout=self._seconds_until_next_job())
+
+    def _seconds_until_next_job(self) -> float:
+        if self.state != self.READY:
+            return 1.0
+        now = time.monotonic()
+        deadlines = [self._last_ping + self.keep_alive_interval]
+        if self.idle_unload_after:
+            deadlines.append(self._last_activity + self.idle_unload_after)
+        return max(0.05, min(deadlines) - now)
+
+    def _load(self):
+        """Loads the model (first time) or refreshes its keep-alive timer (every ping after that)."""
+        if self.state != self.READY:
+            self._set_state(self.WARMING)
+        try:
+            self.handler.load_model()
+            self._last_ping = time.monotonic()
+            self._set_state(self.READY)
+        except Exception as e:
+            print(f"[ModelResidency] Failed to load {self.handler.model}: {e}")
+            self._set_state(self.ERROR)
+
+    def _unload(self):
+        self._set_state(self.UNLOADING)
+        try:
+            self.handler.unload_model()
+        except Exception as e:
+            print(f"[ModelResidency] Failed to unload {self.handler.model}: {e}")
+        self._set_state(self.UNLOADED)
@@ -4,21 +4,126 @@
 
 # --- Step 1: Import Necessary Libraries ---
 
-# 'subprocess' is a standard Python library used to run external command-line programs.
-# We use it here to execute the 'ollama' command.
-import subprocess
+# 'http.client' gives us plain HTTP connections that we can keep open and reuse,
+# so each question doesn't pay for a new process or a new TCP handshake.
+import http.client
+import json
+import queue
+import socket
+from urllib.parse import urlparse
+from ai.hedged_request import on_cancel
+from core.config import (
+    OLLAMA_BASE_URL,
+    OLLAMA_MODEL,
+    OLLAMA_CONNECT_TIMEOUT,
+    OLLAMA_REQUEST_TIMEOUT,
+    OLLAMA_POOL_SIZE,
+)
 
-# --- Step 2: Define the OllamaHandler Class ---
+# --- Step 2: Define the Errors the Handler Can Raise ---
+
+class OllamaError(Exception):
+    """Base class for everything that can go wrong while talking to Ollama."""
+
+
+class OllamaConnectionError(OllamaError):
+    """The Ollama server could not be reached (not running, wrong URL, ...)."""
+
+
+class OllamaTimeoutError(OllamaError):
+    """The Ollama server did not answer within the configured timeout."""
+
+
+class OllamaModelNotFoundError(OllamaError):
+    """The requested model has not been pulled on the Ollama server."""
+
+
+class OllamaResponseError(OllamaError):
+    """The Ollama server answered with an error status or an unreadable body."""
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+# --- Step 3: Define the Connection Pool ---
+
+class _ConnectionPool:
+    """A small thread-safe pool of keep-alive HTTP connections to one Ollama server."""
+
+    def __init__(self, base_url: str, connect_timeout: float, request_timeout: float, max_size: int):
+        parsed = urlparse(base_url)
+        self.scheme = parsed.scheme or "http"
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or (443 if self.scheme == "https" else 80)
+        self.base_path = parsed.path.rstrip("/")
+        self.connect_timeout = connect_timeout
+        self.request_timeout = request_timeout
+        # Most recently used connections are handed out first; they are the least likely to be stale.
+        self._idle = queue.LifoQueue(maxsize=max(1, max_size))
+
+    def acquire(self):
+        """Returns (connection, reused) - an idle connection if there is one, otherwise a new one."""
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self._new_connection(), False
+
+    def release(self, conn, reusable: bool = True):
+        """Hands a connection back to the pool, or closes it if it can't be reused."""
+        if not reusable:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        """Closes every idle connection."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _new_connection(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        conn = connection_class(self.host, self.port, timeout=self.connect_timeout)
+        try:
+            conn.connect()
+        except socket.timeout as e:
+            conn.close()
+            raise OllamaTimeoutError(f"Timed out connecting to Ollama at {self.host}:{self.port}") from e
+        except OSError as e:
+            conn.close()
+            raise OllamaConnectionError(f"Could not connect to Ollama at {self.host}:{self.port} ({e})") from e
+        # Once connected, reads may legitimately take as long as the model needs to answer.
+        conn.sock.settimeout(self.request_timeout)
+        return conn
+
+# --- Step 4: Define the OllamaHandler Class ---
 
 class OllamaHandler:
-    """A client for interacting with a local Ollama LLM instance via the command line."""
+    """A client for a local Ollama LLM instance, using its REST API over pooled keep-alive connections."""
 
     # The constructor, called when a new OllamaHandler object is created.
-    def __init__(self, model: str = "mistral"):
-        """Initializes the handler with a specific Ollama model name."""
+    def __init__(
+        self,
+        model: str = OLLAMA_MODEL,
+        base_url: str = OLLAMA_BASE_URL,
+        connect_timeout: float = OLLAMA_CONNECT_TIMEOUT,
+        request_timeout: float = OLLAMA_REQUEST_TIMEOUT,
+        pool_size: int = OLLAMA_POOL_SIZE,
+    ):
+        """Initializes the handler with a specific Ollama model name and server address."""
         # The name of the Ollama model to use (e.g., 'mistral', 'llama3', 'phi3').
         # This model must be pulled first using 'ollama pull <model_name>'.
         self.model = model
+        self.base_url = base_url
+        # How long Ollama should keep the model in memory after each request (e.g. "5m" or seconds).
+        # None leaves it to the server's default; the residency manager sets this.
+        self.keep_alive = None
+        self._pool = _ConnectionPool(base_url, connect_timeout, request_timeout, pool_size)
         # A system prompt is a set of instructions given to the AI to define its persona and task.
         # This helps ensure its responses are consistent and aligned with its intended character.
         self.system_prompt = (
@@ -43,29 +148,202 @@ class OllamaHandler:
             "Remember: Keep it short and sweet. Don't ramble or over-explain."
         )
 
-    def ask(self, prompt: str) -> str:
-        """Sends a prompt to the local Ollama model and returns its response."""
-        # We construct the command-line arguments as a list of strings, without the prompt.
-        command = [
-            "/usr/local/bin/ollama", "run", self.model
-        ]
-        full_prompt = self.system_prompt + "\n\nUser: " + prompt
+    def ask(self, prompt: str, history: list = None) -> str:
+        """Sends a prompt to the local Ollama model and returns its response (or a spoken-friendly error)."""
         try:
-            # Execute the command, passing the prompt via stdin.
-            result = subprocess.run(
-                command,
-                input=full_prompt,
-                capture_output=True,  # Capture the command's standard output and standard error.
-                text=True,            # Decode stdout and stderr as text using the default encoding.
-                check=True,           # If the command returns a non-zero exit code (an error), raise a CalledProcessError.
-                timeout=60  # 60 seconds timeout
-            )
-            # If successful, the model's response is in 'stdout'. We strip any extra whitespace.
-            return result.stdout.strip()
-        except subprocess.CalledProcessError as e:
-            error_message = e.stderr.strip()
-            print(f"Ollama Error: {error_message}")
-            return f"I'm having trouble with Ollama right now. ({error_message})"
+            return self.chat(prompt, history)
+        except OllamaModelNotFoundError as e:
+            print(f"Ollama Error: {e}")
+            return f"The Ollama model '{self.model}' isn't installed. Run 'ollama pull {self.model}' first."
+        except OllamaError as e:
+            print(f"Ollama Error: {e}")
+            return f"I'm having trouble with Ollama right now. ({e})"
         except Exception as e:
             print(f"Unexpected error in OllamaHandler.ask: {e}")
             return f"I'm having trouble with Ollama right now. ({e})"
+
+    def ask_stream(self, prompt: str, history: list = None):
+        """Like ask(), but yields the reply piece by piece as the model generates it.
+
+        The generator returns True if the whole answer was streamed, and False if it broke off
+        part way (what was yielded is then only the start of an answer) or failed.
+        """
+        produced = False
+        try:
+            for token in self.chat_stream(prompt, history):
+                produced = True
+                yield token
+        except OllamaError as e:
+            print(f"Ollama Error: {e}")
+            if not produced:
+                if isinstance(e, OllamaModelNotFoundError):
+                    yield f"The Ollama model '{self.model}' isn't installed. Run 'ollama pull {self.model}' first."
+                else:
+                    yield f"I'm having trouble with Ollama right now. ({e})"
+            return False
+        return True
+
+    def chat(self, prompt: str, history: list = None) -> str:
+        """Sends a prompt to /api/chat and returns the reply text. Raises an OllamaError on failure.
+
+        history holds the earlier {"role", "content"} turns of the conversation, oldest first.
+        """
+        data = self._post_json("/api/chat", self._chat_payload(prompt, stream=False, history=history))
+        try:
+            return data["message"]["content"].strip()
+        except (KeyError, TypeError, AttributeError):
+            raise OllamaResponseError(f"Unexpected response from Ollama: {str(data)[:200]}")
+
+    def chat_stream(self, prompt: str, history: list = None):
+        """Sends a prompt to /api/chat with streaming on and yields each token as it arrives.
+
+        Raises an OllamaError on failure. If the caller stops iterating early, the
+        connection is closed instead of being returned to the pool. When the stream has lost
+        a race (ai/hedged_request.py), its connection is shut down at once, even while it is
+        still waiting for the model.
+        """
+        registrations = []
+        watch = lambda conn: registrations.append(on_cancel(lambda: self._abort(conn)))
+        conn, response = self._open("/api/chat", self._chat_payload(prompt, stream=True, history=history), watch)
+        finished = False
+        try:
+            if response.status != 200:
+                raw = self._read(conn, response)
+                finished = True   # the error body was read in full; the connection is fine
+                self._decode_response(response.status, raw)
+
+            while True:
+                line = self._readline(conn, response)
+                if not line:
+                    raise OllamaConnectionError("Ollama closed the stream before the answer was complete")
+                chunk = self._decode_response(200, line)
+                token = (chunk.get("message") or {}).get("content", "")
+                if token:
+                    yield token
+                if chunk.get("done"):
+                    # Drain the (normally empty) rest of the chunked body so the connection can be reused.
+                    self._read(conn, response)
+                    finished = True
+                    break
+        finally:
+            for unregister in registrations:
+                unregister()   # before the connection can go back to the pool
+            self._pool.release(conn, reusable=finished and not response.will_close)
+
+    def load_model(self, keep_alive=None):
+        """Loads the model into memory (or refreshes its keep-alive timer) without generating anything."""
+        payload = {"model": self.model, "stream": False}
+        keep_alive = keep_alive if keep_alive is not None else self.keep_alive
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        self._post_json("/api/generate", payload)
+
+    def unload_model(self):
+        """Asks Ollama to drop the model from memory right away."""
+        self._post_json("/api/generate", {"model": self.model, "keep_alive": 0, "stream": False})
+
+    def close(self):
+        """Closes all pooled connections to the Ollama server."""
+        self._pool.close()
+
+    def _chat_payload(self, prompt: str, stream: bool, history: list = None) -> dict:
+        # The system prompt and history always come first and unchanged, so while the model stays
+        # loaded Ollama reuses its cached evaluation of that prefix and only processes the new turn.
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.system_prompt},
+                *(history or []),
+                {"role": "user", "content": prompt},
+            ],
+            "stream": stream,
+        }
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+
+    def _post_json(self, path: str, payload: dict) -> dict:
+        """POSTs a JSON payload and returns the decoded JSON body, mapping failures to OllamaError types."""
+        conn, response = self._open(path, payload)
+        raw = self._read(conn, response)
+        self._pool.release(conn, reusable=not response.will_close)
+        return self._decode_response(response.status, raw)
+
+    def _open(self, path: str, payload: dict, opened=None):
+        """
+        Sends a POST request and returns (connection, response) once the response headers have arrived.
+        opened(connection), if given, is called before the request is sent.
+        """
+        body = json.dumps(payload).encode("utf-8")
+        url = self._pool.base_path + path
+        headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+
+        # A pooled connection may have been closed by the server while it sat idle.
+        # In that case we retry exactly once on a brand new connection.
+        for attempt in range(2):
+            conn, reused = self._pool.acquire()
+            if opened:
+                opened(conn)
+            try:
+                conn.request("POST", url, body=body, headers=headers)
+                return conn, conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                self._pool.release(conn, reusable=False)
+                if reused and attempt == 0:
+                    continue
+                raise OllamaConnectionError(f"Ollama closed the connection ({e})") from e
+            except BaseException as e:
+                self._pool.release(conn, reusable=False)
+                raise self._map_transport_error(e)
+
+    @staticmethod
+    def _abort(conn):
+        """Breaks off a request in flight, from another thread: whatever is blocked on it fails at once."""
+        sock = conn.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _read(self, conn, response) -> bytes:
+        try:
+            return response.read()
+        except BaseException as e:
+            self._pool.release(conn, reusable=False)
+            raise self._map_transport_error(e)
+
+    def _readline(self, conn, response) -> bytes:
+        try:
+            return response.readline()
+        except BaseException as e:
+            self._pool.release(conn, reusable=False)
+            raise self._map_transport_error(e)
+
+    def _map_transport_error(self, e: BaseException) -> BaseException:
+        """Translates a socket/HTTP exception into the matching OllamaError (other exceptions pass through)."""
+        if isinstance(e, socket.timeout):
+            error = OllamaTimeoutError(f"Ollama did not answer within {self._pool.request_timeout:g}s")
+        elif isinstance(e, (http.client.HTTPException, OSError)):
+            error = OllamaConnectionError(f"Error talking to Ollama ({e})")
+        else:
+            return e
+        error.__cause__ = e
+        return error
+
+    def _decode_response(self, status: int, raw: bytes) -> dict:
+        """Turns an HTTP status and body into a dict, or raises the matching OllamaError."""
+        try:
+            data = json.loads(raw.decode("utf-8")) if raw else {}
+        except ValueError:
+            data = {"error": raw.decode("utf-8", errors="replace").strip()}
+
+        if status == 200:
+            if "error" in data:
+                raise OllamaResponseError(data["error"], status)
+            return data
+        message = data.get("error") if isinstance(data, dict) else None
+        message = message or f"HTTP {status}"
+        if status == 404 and "not found" in message.lower():
+            raise OllamaModelNotFoundError(message)
+        raise OllamaResponseError(message, status)
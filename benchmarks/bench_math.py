@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: answering spoken maths with the local MathEngine versus asking the LLM.
+
+Usage:
+    python benchmarks/bench_math.py            # local engine + the Ollama server from the config
+    python benchmarks/bench_math.py --no-llm   # local engine only
+"""
+
+import os
+import statistics
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ai.ollama_handler import OllamaHandler, OllamaError
+from core.math_engine import MathEngine
+
+QUESTIONS = [
+    "What's 15 plus 27?",
+    "what is fifteen times twelve",
+    "20 percent of 80",
+    "2 to the power of 10",
+    "the square root of 144",
+    "ten divided by three",
+    "how many feet in a mile",
+    "convert 5 miles to km",
+    "what's 100 degrees fahrenheit in celsius",
+    "how many seconds are there in 3 hours",
+]
+
+
+def _report(name, timings):
+    timings = sorted(timings)
+    p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+    print(f"{name:<14} median {statistics.median(timings) * 1e3:10.3f} ms   p95 {p95 * 1e3:10.3f} ms")
+
+
+def bench_engine(rounds: int = 1000):
+    engine = MathEngine()
+    timings = []
+    for _ in range(rounds):
+        for question in QUESTIONS:
+            started = time.perf_counter()
+            engine.answer(question)
+            timings.append(time.perf_counter() - started)
+    _report("MathEngine", timings)
+    for question in QUESTIONS:
+        print(f"  {question!r:45} -> {engine.answer(question)}")
+
+
+def bench_llm():
+    handler = OllamaHandler()
+    timings = []
+    try:
+        handler.chat("warm up")
+        for question in QUESTIONS:
+            started = time.perf_counter()
+            answer = handler.chat(question)
+            timings.append(time.perf_counter() - started)
+            print(f"  {question!r:45} -> {answer[:60]}")
+    except OllamaError as e:
+        print(f"LLM path skipped: {e}")
+        return
+    finally:
+        handler.close()
+    _report(f"Ollama:{handler.model}", timings)
+
+
+if __name__ == "__main__":
+    bench_engine()
+    if "--no-llm" not in sys.argv:
+        bench_llm()
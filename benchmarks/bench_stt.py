@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Benchmark: speech-to-text backends on the WAV fixtures in benchmarks/fixtures/stt.
+
+Reports, per backend, the real-time factor (decode time / audio length, lower is better),
+the peak resident memory of the process and the word error rate against manifest.json.
+Each backend runs in its own process so memory numbers don't mix.
+
+Usage:
+    python benchmarks/bench_stt.py                          # every installed backend
+    python benchmarks/bench_stt.py --backend faster-whisper --model tiny
+    python benchmarks/bench_stt.py --make-fixtures          # (re)create the WAVs with edge-tts
+    python benchmarks/bench_stt.py --make-fixtures --offline   # ... or from assets/response.mp3
+
+Missing fixtures are cut from the speech sample in assets/response.mp3, so the benchmark
+also runs without a network. Their words don't match manifest.json, so no WER is reported
+for them; run --make-fixtures with a network connection for that.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import time
+import wave
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "stt")
+OFFLINE = os.path.join(FIXTURES, "offline.json")   # fixtures cut from the sample, whose words are unknown
+SAMPLE_MP3 = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assets", "response.mp3")
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """(substitutions + deletions + insertions) / reference words, on lowercase words without punctuation."""
+    ref = re.sub(r"[^\w\s']", " ", reference.lower()).split()
+    hyp = re.sub(r"[^\w\s']", " ", hypothesis.lower()).split()
+    distance = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        previous, distance[0] = distance[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            previous, distance[j] = distance[j], min(distance[j] + 1, distance[j - 1] + 1,
+                                                     previous + (ref_word != hyp_word))
+    return distance[-1] / max(1, len(ref))
+
+
+def load_wav(path: str) -> np.ndarray:
+    """Reads a 16 kHz mono 16-bit WAV as float32 (the format the backends take)."""
+    with wave.open(path, "rb") as f:
+        if f.getframerate() != 16000 or f.getnchannels() != 1 or f.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16 kHz mono 16-bit PCM")
+        pcm = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+    return pcm.astype(np.float32) / 32768.0
+
+
+def save_wav(path: str, pcm: np.ndarray):
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+        f.writeframes(pcm.astype(np.int16).tobytes())
+
+
+def load_manifest() -> list:
+    with open(os.path.join(FIXTURES, "manifest.json")) as f:
+        return json.load(f)
+
+
+def offline_fixtures() -> set:
+    """The fixture files that were cut from the speech sample instead of synthesised from their text."""
+    if not os.path.exists(OFFLINE):
+        return set()
+    with open(OFFLINE) as f:
+        return set(json.load(f))
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KiB on Linux
+
+
+def run_backend(name: str, model_size: str) -> dict:
+    """Runs in the child process: loads one backend and decodes every fixture."""
+    from voice.stt_backends import BACKENDS
+    manifest = load_manifest()
+    unscored = offline_fixtures()
+    started = time.perf_counter()
+    backend = BACKENDS[name](model_size=model_size)
+    load_seconds = time.perf_counter() - started
+
+    backend.transcribe(load_wav(os.path.join(FIXTURES, manifest[0]["file"])))  # warm-up
+    audio_seconds = decode_seconds = errors = 0.0
+    scored = 0
+    for item in manifest:
+        audio = load_wav(os.path.join(FIXTURES, item["file"]))
+        started = time.perf_counter()
+        text = backend.transcribe(audio)
+        decode_seconds += time.perf_counter() - started
+        audio_seconds += len(audio) / 16000
+        if item["file"] not in unscored:
+            errors += word_error_rate(item["text"], text)
+            scored += 1
+        print(f"  {item['file']:<14} {text!r}", file=sys.stderr)
+    return {
+        "backend": name,
+        "load_seconds": load_seconds,
+        "rtf": decode_seconds / audio_seconds,
+        "peak_rss_mb": peak_rss_mb(),
+        "wer": errors / scored if scored else None,
+    }
+
+
+def make_fixtures():
+    """Synthesises the manifest sentences with edge-tts and stores them as 16 kHz mono WAV."""
+    import edge_tts
+    import miniaudio
+    manifest = load_manifest()
+
+    async def synthesize(text):
+        audio = b""
+        async for chunk in edge_tts.Communicate(text, "en-US-JennyNeural").stream():
+            if chunk["type"] == "audio":
+                audio += chunk["data"]
+        return audio
+
+    unscored = offline_fixtures()
+    for item in manifest:
+        mp3 = asyncio.run(synthesize(item["text"]))
+        decoded = miniaudio.decode(mp3, output_format=miniaudio.SampleFormat.SIGNED16, nchannels=1, sample_rate=16000)
+        save_wav(os.path.join(FIXTURES, item["file"]), np.frombuffer(decoded.samples, dtype=np.int16))
+        unscored.discard(item["file"])
+        print(f"Wrote {item['file']}")
+    _save_offline(unscored)
+
+
+def make_offline_fixtures(only_missing: bool = False):
+    """
+    Cuts one WAV per manifest entry out of the speech in assets/response.mp3, about as long as
+    its sentence takes to say. Needs no network; decode speed and memory are measured on real
+    speech, but the words aren't the manifest's.
+    """
+    import miniaudio
+    decoded = miniaudio.decode_file(SAMPLE_MP3, output_format=miniaudio.SampleFormat.SIGNED16,
+                                    nchannels=1, sample_rate=16000)
+    speech = np.frombuffer(decoded.samples, dtype=np.int16)
+    unscored = offline_fixtures()
+    position = 0
+    for item in load_manifest():
+        path = os.path.join(FIXTURES, item["file"])
+        length = int((0.6 + len(item["text"].split()) / 2.5) * 16000)   # ~150 words a minute
+        if position + length > len(speech):
+            position = 0
+        if not (only_missing and os.path.exists(path)):
+            save_wav(path, speech[position:position + length])
+            unscored.add(item["file"])
+            print(f"Wrote {item['file']} (cut from {os.path.basename(SAMPLE_MP3)})")
+        position += length
+    _save_offline(unscored)
+
+
+def _save_offline(unscored: set):
+    if unscored:
+        with open(OFFLINE, "w") as f:
+            json.dump(sorted(unscored), f)
+    elif os.path.exists(OFFLINE):
+        os.remove(OFFLINE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", help="benchmark only this backend")
+    parser.add_argument("--model", default="base", help="model size (default: base)")
+    parser.add_argument("--make-fixtures", action="store_true", help="create the WAV fixtures with edge-tts")
+    parser.add_argument("--offline", action="store_true", help="with --make-fixtures: cut them from assets/response.mp3")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.make_fixtures:
+        if args.offline:
+            make_offline_fixtures()
+        else:
+            make_fixtures()
+        return
+    if args.child:
+        print(json.dumps(run_backend(args.backend, args.model)))
+        return
+
+    missing = [item["file"] for item in load_manifest() if not os.path.exists(os.path.join(FIXTURES, item["file"]))]
+    if missing:
+        print(f"Missing fixtures: {', '.join(missing)}. Cutting them from the speech sample (no WER for these).")
+        make_offline_fixtures(only_missing=True)
+
+    from voice.stt_backends import BACKENDS
+    names = [args.backend] if args.backend else list(BACKENDS)
+    print(f"{'backend':<16}{'load s':>8}{'RTF':>8}{'peak RSS MB':>14}{'WER':>8}")
+    for name in names:
+        child = subprocess.run([sys.executable, __file__, "--child", "--backend", name, "--model", args.model],
+                               capture_output=True, text=True)
+        if child.returncode != 0:
+            reason = (child.stderr.strip().splitlines() or ["failed"])[-1]
+            print(f"{name:<16}skipped: {reason}")
+            continue
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        wer = "n/a" if result["wer"] is None else f"{result['wer']:.1%}"
+        print(f"{name:<16}{result['load_seconds']:>8.1f}{result['rtf']:>8.3f}"
+              f"{result['peak_rss_mb']:>14.0f}{wer:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time to first audio of the text-to-speech backends.
+
+For each backend, every phrase is synthesised and decoded the way TTSSpeaker does it, and
+the time from the request to the first decoded samples is measured. The first request is
+reported on its own ("cold": for Edge it includes opening the connection); the rest are
+summarised by their median ("warm"). Also reported is the total synthesis time per second
+of speech (real-time factor, lower is better).
+
+Usage:
+    python benchmarks/bench_tts.py                     # every installed backend
+    python benchmarks/bench_tts.py --backend espeak
+    python benchmarks/bench_tts.py --espeak-command /opt/espeak-ng/bin/espeak-ng
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+PHRASES = [
+    "Added task: buy milk.",
+    "Session ended.",
+    "Your to-do list is empty.",
+    "It's 3:45 PM.",
+    "The capital of Australia is Canberra, not Sydney, although Sydney is the largest city.",
+    "Here's a quick summary: the meeting moved to Thursday at ten, and Anna will send the agenda tomorrow.",
+]
+VOICE = "en-US-AriaNeural"
+
+
+async def measure(backend, text: str) -> dict:
+    """Synthesises text and returns its time to first audio, synthesis time and audio length."""
+    from voice.audio_output import Playback, StreamDecoder
+
+    first_audio = []
+    decoded = []
+
+    class TimedPlayback(Playback):
+        # Nothing plays it; this only records when samples come out of the decoder.
+        def feed(self, samples):
+            if not first_audio:
+                first_audio.append(time.perf_counter())
+            decoded.append(len(samples))
+
+    playback = TimedPlayback(24000)
+    decoder = None
+    started = time.perf_counter()
+    async for chunk in backend.stream(text, VOICE):
+        if chunk["type"] == "audio":
+            if decoder is None:
+                decoder = StreamDecoder(playback, file_format=chunk.get("format", "mp3"))
+            decoder.feed(chunk["data"])
+    synthesis_seconds = time.perf_counter() - started
+    if decoder is None:
+        raise RuntimeError(f"no audio for {text!r}")
+    decoder.finish()
+    await asyncio.get_running_loop().run_in_executor(None, decoder._thread.join, 10)
+    audio_seconds = sum(decoded) / 24000
+    return {"ttfa": first_audio[0] - started, "synthesis": synthesis_seconds, "audio": audio_seconds}
+
+
+async def run_backend(backend) -> dict:
+    results = []
+    try:
+        for text in PHRASES:
+            results.append(await measure(backend, text))
+    finally:
+        await backend.close()
+    warm = [result["ttfa"] for result in results[1:]]
+    return {
+        "cold_ms": results[0]["ttfa"] * 1000,
+        "warm_ms": statistics.median(warm) * 1000,
+        "max_ms": max(warm) * 1000,
+        "rtf": sum(r["synthesis"] for r in results) / sum(r["audio"] for r in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", help="benchmark only this backend")
+    parser.add_argument("--espeak-command", help="how to run espeak-ng (default: TTS_ESPEAK_COMMAND)")
+    args = parser.parse_args()
+
+    from voice.tts_backends import BACKENDS, EspeakBackend
+    names = [args.backend] if args.backend else list(BACKENDS)
+    print(f"{'backend':<10}{'cold TTFA ms':>14}{'warm TTFA ms':>14}{'max ms':>9}{'RTF':>8}")
+    for name in names:
+        try:
+            if name == EspeakBackend.name and args.espeak_command:
+                backend = EspeakBackend(command=args.espeak_command)
+            else:
+                backend = BACKENDS[name]()
+            result = asyncio.run(run_backend(backend))
+        except Exception as e:
+            print(f"{name:<10}skipped: {e}")
+            continue
+        print(f"{name:<10}{result['cold_ms']:>14.0f}{result['warm_ms']:>14.0f}"
+              f"{result['max_ms']:>9.0f}{result['rtf']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -59,6 +59,42 @@ DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "Ollama")
 # Fetches the API key for the Google Gemini model from the .env file.
 # If not provided, this will be `None`, and the Gemini handler will be disabled.
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# Gemini models to try, in order of preference; later ones are fallbacks.
+GEMINI_MODELS = [m.strip() for m in os.getenv("GEMINI_MODELS", "gemini-2.5-pro,gemini-2.5-flash").split(",") if m.strip()]
+# After a model fails it is skipped for this many seconds (longer when it ran out of quota).
+GEMINI_COOLDOWN_SECONDS = float(os.getenv("GEMINI_COOLDOWN_SECONDS", "30"))
+GEMINI_QUOTA_COOLDOWN_SECONDS = float(os.getenv("GEMINI_QUOTA_COOLDOWN_SECONDS", "300"))
+
+# Connection settings for the local Ollama server. Ryo talks to its REST API
+# over a small pool of keep-alive HTTP connections instead of running the CLI.
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "mistral")
+# Seconds to wait for the TCP connection, and for the model to answer.
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "3"))
+OLLAMA_REQUEST_TIMEOUT = float(os.getenv("OLLAMA_REQUEST_TIMEOUT", "60"))
+# How many idle connections to keep open for reuse.
+OLLAMA_POOL_SIZE = int(os.getenv("OLLAMA_POOL_SIZE", "4"))
+# Keep the model resident in RAM: ping it this often (seconds) while the assistant is in use,
+# and unload it after this many seconds without any activity (0 = never unload).
+OLLAMA_KEEP_ALIVE_INTERVAL = float(os.getenv("OLLAMA_KEEP_ALIVE_INTERVAL", "120"))
+OLLAMA_IDLE_UNLOAD_SECONDS = float(os.getenv("OLLAMA_IDLE_UNLOAD_SECONDS", "900"))
+
+# Race mode sends each question to both backends so a slow one never holds up the answer:
+# "off" uses only the selected model, "race" asks both at once, and "hedge" asks the other
+# backend only if the selected one hasn't started answering after LLM_HEDGE_DELAY seconds.
+LLM_RACE_MODE = os.getenv("LLM_RACE_MODE", "off").lower()
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "1.5"))
+
+# Questions within one listening session share context. The history sent with each question is
+# kept under this many (estimated) tokens; the oldest exchanges are dropped first.
+CONVERSATION_MAX_TOKENS = int(os.getenv("CONVERSATION_MAX_TOKENS", "1500"))
+
+# Answers to repeated questions are cached on disk so they don't need another model round-trip.
+# Entries expire after RESPONSE_CACHE_TTL_SECONDS; only the most recent MAX_ENTRIES are kept.
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+RESPONSE_CACHE_FILE = os.path.join(BASE_DIR, "data", "response_cache.json")
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "500"))
 
 # --- Step 5: Voice System Configuration ---
 
@@ -67,11 +103,102 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 # will be disabled.
 PORCUPINE_ACCESS_KEY = os.getenv("PORCUPINE_ACCESS_KEY")
 
+# Voice activity detection: recording stops once the user has finished speaking instead of
+# after a fixed window. Audio is analysed in frames of VAD_FRAME_MS milliseconds.
+VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS", "30"))
+# A frame is speech when it is this many times louder than the learned background noise
+# (and louder than VAD_MIN_RMS, on a 0..1 scale).
+VAD_ENERGY_RATIO = float(os.getenv("VAD_ENERGY_RATIO", "3.0"))
+VAD_MIN_RMS = float(os.getenv("VAD_MIN_RMS", "0.01"))
+# The utterance ends after this much silence following speech, or when it reaches the maximum length.
+VAD_TRAILING_SILENCE_SECONDS = float(os.getenv("VAD_TRAILING_SILENCE_SECONDS", "0.8"))
+VAD_MAX_UTTERANCE_SECONDS = float(os.getenv("VAD_MAX_UTTERANCE_SECONDS", "15"))
+# Stop waiting if nobody starts speaking within this many seconds.
+VAD_NO_SPEECH_TIMEOUT_SECONDS = float(os.getenv("VAD_NO_SPEECH_TIMEOUT_SECONDS", "5"))
+
+# Speech-to-text engine: "whisper" (openai-whisper on PyTorch) or "faster-whisper"
+# (CTranslate2, int8-quantised on the CPU; much faster on machines without a GPU).
+STT_BACKEND = os.getenv("STT_BACKEND", "whisper")
+STT_MODEL_SIZE = os.getenv("STT_MODEL_SIZE", "base")
+# faster-whisper only: weight type and decoding threads (0 = let CTranslate2 decide)
+STT_COMPUTE_TYPE = os.getenv("STT_COMPUTE_TYPE", "int8")
+STT_CPU_THREADS = int(os.getenv("STT_CPU_THREADS", "0"))
+
+# Streaming transcription: decode while the user is still talking and show partial text.
+# A new partial decode runs for every STT_STREAM_STEP_SECONDS of new audio.
+STT_STREAMING = os.getenv("STT_STREAMING", "1") == "1"
+STT_STREAM_STEP_SECONDS = float(os.getenv("STT_STREAM_STEP_SECONDS", "1.0"))
+
 
 # --- Step 6: Audio Settings ---
 # A global flag to control whether the assistant's responses are spoken out loud.
 MUTE_AUDIO = False
 
+# The microphone is opened once and shared (see voice/audio_bus.py). Wake word detection and
+# Whisper both want 16 kHz mono. AUDIO_CHUNK_SIZE is the capture block size in samples and
+# AUDIO_BUFFER_SECONDS how much recent audio is kept for consumers that fall behind.
+AUDIO_SAMPLE_RATE = int(os.getenv("AUDIO_SAMPLE_RATE", "16000"))
+AUDIO_CHUNK_SIZE = int(os.getenv("AUDIO_CHUNK_SIZE", "512"))
+AUDIO_BUFFER_SECONDS = float(os.getenv("AUDIO_BUFFER_SECONDS", "10"))
+# Pre-roll: listening after the wake word starts from where the wake word ended, reaching back
+# at most this many seconds, so "Hey Ryo what time is it" said in one breath is heard in full.
+AUDIO_PREROLL_SECONDS = float(os.getenv("AUDIO_PREROLL_SECONDS", "3"))
+# Microphone to use (device name or index); empty means the system default.
+AUDIO_INPUT_DEVICE = os.getenv("AUDIO_INPUT_DEVICE") or None
+
+# Speech is played through one output stream that stays open (see voice/audio_output.py).
+# TTS_SAMPLE_RATE matches what Edge TTS produces, so its audio needs no resampling.
+TTS_SAMPLE_RATE = int(os.getenv("TTS_SAMPLE_RATE", "24000"))
+AUDIO_OUTPUT_BLOCK_SIZE = int(os.getenv("AUDIO_OUTPUT_BLOCK_SIZE", "1024"))
+# Speaker to use (device name or index); empty means the system default.
+AUDIO_OUTPUT_DEVICE = os.getenv("AUDIO_OUTPUT_DEVICE") or None
+# If the speaker stream stops asking for audio for this many seconds (e.g. the device went
+# away), whatever is playing is given up and the stream is reopened on the next utterance.
+AUDIO_OUTPUT_STALL_SECONDS = float(os.getenv("AUDIO_OUTPUT_STALL_SECONDS", "2.0"))
+
+# Speech is synthesised over one websocket to the Edge TTS service that is kept open between
+# utterances; after this many idle seconds a fresh connection is opened instead.
+TTS_CONNECTION_IDLE_SECONDS = float(os.getenv("TTS_CONNECTION_IDLE_SECONDS", "30"))
+
+# Which synthesiser speaks (see voice/tts_backends.py): "edge" (online neural voices) or "espeak"
+# (espeak-ng, offline and near-instant). Texts of at most TTS_SHORT_TEXT_CHARS characters, such as
+# confirmations, go to TTS_SHORT_TEXT_BACKEND instead (empty: TTS_BACKEND as well). If the chosen
+# backend fails, or has produced no audio after TTS_FALLBACK_AFTER_SECONDS, TTS_FALLBACK_BACKEND
+# speaks instead (empty: none).
+TTS_BACKEND = os.getenv("TTS_BACKEND", "edge")
+TTS_SHORT_TEXT_BACKEND = os.getenv("TTS_SHORT_TEXT_BACKEND", "")
+TTS_SHORT_TEXT_CHARS = int(os.getenv("TTS_SHORT_TEXT_CHARS", "60"))
+TTS_FALLBACK_BACKEND = os.getenv("TTS_FALLBACK_BACKEND", "espeak")
+TTS_FALLBACK_AFTER_SECONDS = float(os.getenv("TTS_FALLBACK_AFTER_SECONDS", "3"))
+# How to run espeak-ng, and which of its voices to use ("espeak-ng --voices" lists them).
+TTS_ESPEAK_COMMAND = os.getenv("TTS_ESPEAK_COMMAND", "espeak-ng")
+TTS_ESPEAK_VOICE = os.getenv("TTS_ESPEAK_VOICE", "en-us")
+
+# Unmuting continues what was being said from where it was cut off, repeating this many
+# seconds before that point so the listener can pick up the thread.
+TTS_RESUME_REWIND_SECONDS = float(os.getenv("TTS_RESUME_REWIND_SECONDS", "0.5"))
+
+# Synthesised speech for short phrases is cached on disk (see voice/tts_cache.py) so repeats
+# play instantly and offline. The directory is capped at TTS_CACHE_MAX_MB, and the most recently
+# used TTS_CACHE_MEMORY_ENTRIES phrases are also kept in memory. Texts longer than
+# TTS_CACHE_MAX_TEXT_CHARS (typically AI answers, which rarely repeat) are not cached.
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "1") == "1"
+TTS_CACHE_DIR = os.path.join(BASE_DIR, "data", "tts_cache")
+TTS_CACHE_MAX_MB = float(os.getenv("TTS_CACHE_MAX_MB", "50"))
+TTS_CACHE_MEMORY_ENTRIES = int(os.getenv("TTS_CACHE_MEMORY_ENTRIES", "32"))
+TTS_CACHE_MAX_TEXT_CHARS = int(os.getenv("TTS_CACHE_MAX_TEXT_CHARS", "200"))
+# Fixed phrases synthesised into the cache in the background at startup.
+TTS_PREWARM_PHRASES = [
+    "Session ended.",
+    "Your to-do list is empty.",
+    "I didn't catch what to add.",
+    "I didn't catch what to remove.",
+    "I didn't catch what task to add. Please try again.",
+    "I didn't catch what task to remove. Please try again.",
+    "I'm sorry, I didn't get a response from the AI model.",
+    "Hello! I'm Ryo, your AI assistant. How can I help you today?",
+]
+
 # --- GUI Theme and Font Settings ---
 # Centralized theme for a consistent look and feel.
 THEME = {
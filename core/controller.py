@@ -6,7 +6,12 @@ from pynput import keyboard
 from voice.wake_word_detector import WakeWordDetector
 from voice.whisper_listener import WhisperListener
 from voice.tts_speaker import TTSSpeaker
+from voice.sentence_chunker import iter_sentences
+from voice.audio_bus import AudioBus
+from voice.audio_device_manager import AudioDeviceManager
 from core.model_switcher import ModelSwitcher
+from core.startup import SubsystemLoader
+from core.config import TTS_PREWARM_PHRASES
 import difflib
 
 class AssistantController:
@@ -21,15 +26,26 @@ class AssistantController:
         self.status_callback = None
         self.transcription_callback = None
         self.gui_refresh_callback = None
+        self.model_state_callback = None
+        self.subsystem_state_callback = None
         self._gui_root = None
-        # Voice integration
-        self.wake_word_detector = WakeWordDetector(on_wake_word=self._on_wake_word)
-        self.whisper_listener = WhisperListener()
         # AI and TTS integration
         self.model_switcher = ModelSwitcher()
         self.tts_speaker = TTSSpeaker()
+        # One microphone stream shared by the wake word detector, the listener and the GUI mic meter
+        self.audio_bus = AudioBus()
+        # Watches the microphone and reopens it as soon as a device is usable again
+        # Rescanning for devices holds the speaker closed too, so it needs to know about it.
+        self.device_manager = AudioDeviceManager(self.audio_bus, on_health_change=self._on_audio_health,
+                                                 outputs=[self.tts_speaker.output])
+        self.device_manager.on_restored(self._on_microphone_restored)
+        # Voice integration: the speech model, wake-word engine and Gemini library load in
+        # parallel in the background so the GUI can be built meanwhile.
+        self.loader = SubsystemLoader(on_state_change=self._on_subsystem_state)
+        self.loader.add("wake word", lambda: WakeWordDetector(on_wake_word=self._on_wake_word, audio_bus=self.audio_bus))
+        self.loader.add("speech recognition", lambda: WhisperListener(audio_bus=self.audio_bus))
+        self.loader.add("gemini", self.model_switcher.gemini_handler.load_library)
         # Placeholders for future integration:
-        self.voice = self.wake_word_detector
         self.tts = self.tts_speaker
         self.ai = self.model_switcher
         self.todo_plugin = None
@@ -38,16 +54,55 @@ class AssistantController:
         # Initialize todo manager
         from core.todo_manager import TodoManager
         self.todo_manager = TodoManager()
+        # Preload the local model in the background so the first question doesn't pay for it
+        self.model_switcher.start_residency(on_state_change=self._on_model_state)
+        # Synthesise the fixed phrases into the speech cache so they play instantly later
+        self.tts_speaker.prewarm(TTS_PREWARM_PHRASES)
+        try:
+            self.audio_bus.start()
+        except Exception as e:
+            print(f"[ERROR] Could not open the microphone: {e}")
+        self.device_manager.start()
         # Start hotkey listener for mute
         self._start_hotkey_listener()
         # Start wake word detection by default
         self.start_wake_word()
 
+    @property
+    def wake_word_detector(self):
+        """Waits for the detector if it is still being created."""
+        return self.loader.get("wake word")
+
+    @property
+    def whisper_listener(self):
+        """Waits for the speech model if it is still loading."""
+        return self.loader.get("speech recognition")
+
+    @property
+    def voice(self):
+        return self.wake_word_detector
+
     def set_status(self, status):
         self.status = status
         if self.status_callback:
             self.status_callback(status)
 
+    def get_audio_health(self):
+        """Microphone health: state ('ok', 'lost', 'no device', 'busy'), input devices, last error, recoveries."""
+        return self.device_manager.get_health()
+
+    def _on_audio_health(self, state):
+        # Called from the device manager thread; shown next to the subsystem loading states
+        self._on_subsystem_state("microphone", state)
+
+    def _on_microphone_restored(self):
+        if self.loader.is_ready("wake word") and self.wake_word_detector.state == WakeWordDetector.SUSPENDED:
+            self.wake_word_detector.resume()
+
+    def get_mic_level(self):
+        """Loudness of the latest microphone block, 0..1."""
+        return self.audio_bus.level
+
     def get_status(self):
         return self.status
 
@@ -74,6 +129,24 @@ class AssistantController:
     def set_gui_refresh_callback(self, callback):
         self.gui_refresh_callback = callback
 
+    def set_model_state_callback(self, callback):
+        self.model_state_callback = callback
+        callback(self.model_switcher.ollama_residency.state)
+
+    def set_subsystem_state_callback(self, callback):
+        self.subsystem_state_callback = callback
+        self.loader.set_state_callback(self._on_subsystem_state)
+
+    def _on_subsystem_state(self, name, state):
+        # Called from the startup threads as each subsystem starts loading, is ready or fails
+        if self.subsystem_state_callback:
+            self.subsystem_state_callback(name, state)
+
+    def _on_model_state(self, state):
+        # Called from the residency thread when the local model is warming up, ready, unloaded...
+        if self.model_state_callback:
+            self.model_state_callback(state)
+
     def _start_hotkey_listener(self):
         def on_press(key):
             try:
@@ -97,20 +170,37 @@ class AssistantController:
 
     # --- Voice/Wake Word Integration ---
     def start_wake_word(self):
+        if not self.loader.is_ready("wake word"):
+            # Still starting up: start detection as soon as the detector exists.
+            print(f"[DEBUG] Wake word detection queued until the detector is ready")
+            self.loader.when_ready("wake word", lambda detector: self.start_wake_word())
+            return
+        # Starts the detector the first time; afterwards this only resumes the paused detector.
         print(f"[DEBUG] Starting wake word detection")
         self.wake_word_detector.start()
         print(f"[DEBUG] Wake word detection started")
     def stop_wake_word(self):
-        self.wake_word_detector.stop()
+        if self.loader.is_ready("wake word"):
+            self.wake_word_detector.stop()
 
     def _on_wake_word(self):
         # Called from background thread
         self.set_status("Listening (Active)")
+        self.model_switcher.note_activity()
         if self.transcription_callback:
             self.transcription_callback("[Wake word detected: Listening...]")
-        self.whisper_listener.start_listening()
-        # After a short delay, stop and transcribe
-        threading.Timer(5.0, self._stop_and_transcribe).start()
+        # Transcribe as soon as the listener hears the user stop talking
+        self.whisper_listener.start_listening(
+            on_utterance_end=self._stop_and_transcribe,
+            on_partial=self._on_partial_transcription,
+            # Start from the end of the wake word so nothing said right after it is lost
+            start_position=self.wake_word_detector.detected_at,
+        )
+
+    def _on_partial_transcription(self, text):
+        # Called from the transcription thread while the user is still speaking
+        if self.transcription_callback and text:
+            self.transcription_callback(f"You said: {text}...")
 
     def _stop_and_transcribe(self):
         self.set_status("Thinking")
@@ -131,11 +221,20 @@ class AssistantController:
 
     def _get_and_speak(self, text):
         try:
-            response = self.model_switcher.ask(text)
-            if self.transcription_callback:
-                self.transcription_callback(f"Ryo: {response}")
-            self.set_status("Speaking")
-            self.tts_speaker.speak(response, on_finish=self._on_tts_finish)
+            tokens = self.model_switcher.ask_stream(text)
+            reply = []
+
+            def sentences():
+                # Each sentence is shown and spoken as soon as the model has finished it.
+                for sentence in iter_sentences(tokens):
+                    if not reply:
+                        self.set_status("Speaking")
+                    reply.append(sentence)
+                    if self.transcription_callback:
+                        self.transcription_callback(f"Ryo: {' '.join(reply)}")
+                    yield sentence
+
+            self.tts_speaker.speak_stream(sentences(), on_finish=self._on_tts_finish)
         except Exception as e:
             if self.transcription_callback:
                 self.transcription_callback(f"[Error: {e}]")
@@ -146,35 +245,13 @@ class AssistantController:
         print(f"[DEBUG] _on_tts_finish callback triggered")
         print(f"[DEBUG] TTS finished, restarting wake word detection")
         self.set_status("Idle")
-        
-        # Force stop TTS to ensure audio device is released
-        self.tts_speaker.stop()
-        
-        # Add a longer delay and more robust audio device handling
-        import threading
-        def delayed_start():
-            import time
-            time.sleep(1.5)  # Wait 1.5 seconds for audio system to fully settle
-            print(f"[DEBUG] Delayed wake word restart")
-            try:
-                self.start_wake_word()
-            except Exception as e:
-                print(f"[ERROR] Failed to restart wake word detection: {e}")
-                # Try again after another delay
-                time.sleep(1.0)
-                try:
-                    self.start_wake_word()
-                except Exception as e2:
-                    print(f"[ERROR] Second attempt failed: {e2}")
-        threading.Thread(target=delayed_start, daemon=True).start()
-        print(f"[DEBUG] Wake word detection restart scheduled")
+        # The microphone stays open between turns, so detection resumes immediately.
+        self.start_wake_word()
 
     def force_restart_wake_word(self):
         """Manual method to force restart wake word detection"""
         print(f"[DEBUG] Force restarting wake word detection")
         self.stop_wake_word()
-        import time
-        time.sleep(0.5)
         self.start_wake_word()
 
     def _process_todo_command(self, text: str) -> bool:
@@ -455,10 +532,17 @@ class AssistantController:
         return []
     def stop(self):
         try:
-            self.tts_speaker.stop()
+            self.tts_speaker.close()
         except Exception:
             pass
         try:
             self.stop_wake_word()
         except Exception:
-            pass 
\ No newline at end of file
+            pass
+        try:
+            self.model_switcher.stop_residency()
+        except Exception:
+            pass
+        self.device_manager.stop()
+        self.audio_bus.stop()
+        self.loader.shutdown() 
\ No newline at end of file
@@ -0,0 +1,54 @@
+import threading
+from typing import Dict, List
+from core.config import CONVERSATION_MAX_TOKENS
+
+
+class Conversation:
+    """
+    The turns of one listening session, so follow-up questions ("and what about Mars?") make sense.
+    History is kept within a token budget; the oldest exchanges are dropped first.
+    """
+
+    def __init__(self, max_tokens: int = CONVERSATION_MAX_TOKENS):
+        """
+        Args:
+            max_tokens (int): Rough upper bound on the tokens of history sent with each question.
+        """
+        self.max_tokens = max_tokens
+        # [{"role": "user" | "assistant", "content": str}, ...] oldest first
+        self._turns = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """A cheap estimate (about four characters per token for English) that needs no tokenizer."""
+        return len(text) // 4 + 1
+
+    def messages(self) -> List[Dict[str, str]]:
+        """A snapshot of the history, safe to hand to a backend on another thread."""
+        with self._lock:
+            return [dict(turn) for turn in self._turns]
+
+    def is_empty(self) -> bool:
+        return not self._turns
+
+    def token_count(self) -> int:
+        with self._lock:
+            return sum(self.estimate_tokens(turn["content"]) for turn in self._turns)
+
+    def add_exchange(self, question: str, answer: str):
+        """Records a question and its answer, then trims the oldest exchanges to fit the budget."""
+        with self._lock:
+            self._turns.append({"role": "user", "content": question})
+            self._turns.append({"role": "assistant", "content": answer})
+            self._trim()
+
+    def clear(self):
+        with self._lock:
+            self._turns = []
+
+    def _trim(self):
+        # Drop whole exchanges (question + answer) so the history never starts with an answer.
+        # The latest exchange is always kept, even if it alone is over the budget.
+        while len(self._turns) > 2 and sum(self.estimate_tokens(t["content"]) for t in self._turns) > self.max_tokens:
+            del self._turns[:2]
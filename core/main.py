@@ -26,7 +26,12 @@ from core.model_switcher import ModelSwitcher
 from voice.wake_word_detector import WakeWordDetector
 from voice.whisper_listener import WhisperListener
 from voice.tts_speaker import TTSSpeaker
+from voice.audio_bus import AudioBus
+from voice.audio_device_manager import AudioDeviceManager
+from voice.sentence_chunker import iter_sentences
 from core.todo_manager import TodoManager
+from core.startup import SubsystemLoader
+from core.config import TTS_PREWARM_PHRASES
 
 # --- Step 3: Define the Hotkey Listener Class ---
 
@@ -74,11 +79,23 @@ class RyoCore:
         """Constructor that initializes all the modules and the application state."""
         self.model_switcher = ModelSwitcher()
         self.speaker = TTSSpeaker()
-        self.listener = WhisperListener()
-        self.wake_word_detector = WakeWordDetector(on_wake_word=self.handle_wake_word)
+        # One microphone stream shared by the wake word detector, the listener and the level meter.
+        self.audio_bus = AudioBus()
+        # Reopens the microphone within a second when it disappears (unplugged, taken by a call...).
+        # Rescanning for devices holds the speaker closed too, so it needs to know about it.
+        self.device_manager = AudioDeviceManager(self.audio_bus, on_health_change=self.update_audio_health,
+                                                 outputs=[self.speaker.output])
+        self.device_manager.on_restored(self._on_microphone_restored)
+        # The slow parts (speech model, wake-word engine, Gemini library) load in parallel in the
+        # background, so the window comes up right away. See the listener/wake_word_detector properties.
+        self.loader = SubsystemLoader()
+        self.loader.add("speech recognition", lambda: WhisperListener(audio_bus=self.audio_bus))
+        self.loader.add("wake word", lambda: WakeWordDetector(on_wake_word=self.handle_wake_word, audio_bus=self.audio_bus))
+        self.loader.add("gemini", self.model_switcher.gemini_handler.load_library)
         self.hotkey_listener = HotkeyListener(on_toggle_mute=self.toggle_mute)
         self.todo_manager = TodoManager()
         self.app = RyoApp(assistant_core=self)
+        self.loader.set_state_callback(self.update_subsystem_state)
         self.state = "idle" # Possible states: idle, listening, thinking, speaking
         self.listening_mode = False
         self.session_timer = None
@@ -86,10 +103,32 @@ class RyoCore:
         self.interrupt_listening = False
         self.interrupt_thread = None
 
+    @property
+    def listener(self) -> WhisperListener:
+        """The speech listener; waits for the speech model if it is still loading."""
+        return self.loader.get("speech recognition")
+
+    @property
+    def wake_word_detector(self) -> WakeWordDetector:
+        """The wake-word detector; waits for it if it is still being created."""
+        return self.loader.get("wake word")
+
     def run(self):
         """Starts the application's main loop."""
         self.update_status("Idle")
-        self.wake_word_detector.start()
+        # Preload the local model in the background so the first question doesn't pay for it.
+        self.model_switcher.start_residency(on_state_change=self.update_model_state)
+        # Synthesise the fixed phrases into the speech cache so they play instantly later.
+        self.speaker.prewarm(TTS_PREWARM_PHRASES)
+        # Open the microphone once; it stays open until shutdown. If it can't be opened now,
+        # the device manager keeps trying and resumes wake word detection once it works.
+        try:
+            self.audio_bus.start()
+        except Exception as e:
+            print(f"[ERROR] Could not open the microphone: {e}")
+        self.device_manager.start()
+        # Starts listening for the wake word as soon as the detector has been created.
+        self.loader.when_ready("wake word", lambda detector: detector.start())
         self.hotkey_listener.start()
         self.app.mainloop()
 
@@ -99,21 +138,41 @@ class RyoCore:
             return
         self.listening_mode = True
         self._start_session_timer()
+        # Questions in this listening session share context until it ends (see reset_to_idle).
+        self.model_switcher.start_conversation()
+        # A question is on its way; make sure the model is (or starts getting) loaded.
+        self.model_switcher.note_activity()
         threading.Thread(target=self._activate_listening_sequence, daemon=True).start()
 
-    def restart_listening_window(self):
+    def restart_listening_window(self, start_position=None):
         if getattr(self.listener, 'is_recording', False):
             print("[DEBUG] Stopping previous recording before starting new one.")
             self.listener.stop_and_transcribe()
-        self.listener.start_listening()
-        self.app.after(5000, self.process_recorded_audio)
+        # The listener tells us when the user has stopped talking; transcription starts right then.
+        self.listener.start_listening(
+            on_utterance_end=lambda: self.app.after(0, self.process_recorded_audio),
+            on_partial=lambda text: self.app.after(0, self.app.update_response, f'You said: "{text}..."'),
+            start_position=start_position,
+        )
 
     def _activate_listening_sequence(self):
         """The actual sequence of events to run after the wake word is detected."""
-        self.wake_word_detector.stop()
+        # Already paused by the detector itself; pausing again is a no-op flag check.
+        self.wake_word_detector.pause()
         self.speaker.stop()
+        if not self.loader.is_ready("speech recognition"):
+            # Only at startup: the question is held until the speech model has loaded.
+            self.update_status("Loading speech model...")
+            try:
+                self.listener
+            except Exception as e:
+                self.app.after(0, self.app.update_response, f"Speech recognition is unavailable: {e}")
+                self.listening_mode = False
+                self.reset_to_idle()
+                return
         self.update_status("Listening (Active)")
-        self.restart_listening_window()
+        # Start from the end of the wake word, so a question said in the same breath isn't cut off.
+        self.restart_listening_window(start_position=self.wake_word_detector.detected_at)
 
     def process_recorded_audio(self):
         print(f"[DEBUG] process_recorded_audio called. self.state={self.state}")
@@ -171,22 +230,32 @@ class RyoCore:
         def ai_worker():
             try:
                 self._start_interrupt_listening()
-                print(f"[DEBUG] Sending to AI model: {text}")
-                response = self.model_switcher.ask(text)
-                print(f"[DEBUG] AI model response: {response}")
-                self._stop_interrupt_listening()
-                self.app.after(0, self.app.update_response, response)
-                self.app.after(0, self.update_status, "Speaking")
-                # If the response is a prompting question, end session after TTS
-                if self.is_prompting_response(response):
-                    def end_after_tts():
+                print(f"[DEBUG] Streaming from AI model: {text}")
+                tokens = self.model_switcher.ask_stream(text)
+                reply = []
+
+                def sentences():
+                    # Runs on the speaker's synthesis thread: every finished sentence is shown
+                    # right away and handed to TTS while the model keeps generating.
+                    for sentence in iter_sentences(tokens):
+                        if not reply:
+                            self.app.after(0, self.update_status, "Speaking")
+                        reply.append(sentence)
+                        self.app.after(0, self.app.update_response, " ".join(reply))
+                        yield sentence
+
+                def on_speech_finished():
+                    response = " ".join(reply)
+                    print(f"[DEBUG] AI model response: {response}")
+                    # If the response is a prompting question, end session after TTS
+                    if self.is_prompting_response(response):
                         self._stop_interrupt_listening()
                         self.listening_mode = False
                         self.reset_to_idle()
-                    self.speaker.speak(response, on_finish=end_after_tts)
-                else:
-                    self._start_interrupt_listening()
-                    self.speaker.speak(response, on_finish=self._on_tts_finish)
+                    else:
+                        self._on_tts_finish()
+
+                self.speaker.speak_stream(sentences(), on_finish=on_speech_finished)
             except Exception as e:
                 print(f"Error during AI processing or speech: {e}")
                 self._stop_interrupt_listening()
@@ -204,8 +273,11 @@ class RyoCore:
         self.interrupt_listening = True
         def interrupt_worker():
             # Listen for up to 3 seconds for an interrupt command
-            self.listener.start_listening()
-            self.app.after(3000, self._process_interrupt_audio)
+            self.listener.start_listening(
+                on_utterance_end=lambda: self.app.after(0, self._process_interrupt_audio),
+                max_utterance=3.0,
+                no_speech_timeout=3.0,
+            )
         self.interrupt_thread = threading.Thread(target=interrupt_worker, daemon=True)
         self.interrupt_thread.start()
 
@@ -264,6 +336,23 @@ class RyoCore:
         self.state = new_status.lower()
         self.app.after(0, self.app.update_status, new_status)
 
+    def update_model_state(self, state: str):
+        """A thread-safe method to show the local model's residency state (e.g. 'warming up') in the GUI."""
+        self.app.after(0, self.app.update_model_state, state)
+
+    def update_audio_health(self, state: str):
+        """A thread-safe method to show the microphone's health ('ok', 'lost', 'busy'...) in the GUI."""
+        self.app.after(0, self.app.update_subsystem_state, "microphone", state)
+
+    def _on_microphone_restored(self):
+        """Called by the device manager when the microphone works again after being lost."""
+        if self.loader.is_ready("wake word") and self.wake_word_detector.state == WakeWordDetector.SUSPENDED:
+            self.wake_word_detector.resume()
+
+    def update_subsystem_state(self, name: str, state: str):
+        """A thread-safe method to show whether a subsystem is still loading, ready or failed in the GUI."""
+        self.app.after(0, self.app.update_subsystem_state, name, state)
+
     def _extract_task(self, command: str, intent: str) -> str:
         """Extracts the core task from a command by stripping away action phrases and unnecessary suffixes/punctuation. Adds debug prints for diagnosis."""
         import re
@@ -385,55 +474,38 @@ class RyoCore:
         print("Shutting down Ryo Core...")
         if hasattr(self, 'hotkey_listener') and self.hotkey_listener.is_alive():
             self.hotkey_listener.stop()
-        if hasattr(self, 'wake_word_detector') and self.wake_word_detector.is_running():
+        if self.loader.is_ready("wake word"):
+            print(f"[WakeWordDetector] Stats: {self.wake_word_detector.get_stats()}")
             self.wake_word_detector.stop()
         if self.speaker:
-            self.speaker.stop()
+            self.speaker.close()
+        self.model_switcher.stop_residency()
+        self.device_manager.stop()
+        self.audio_bus.stop()
+        self.loader.shutdown()
         # No self.app.quit() here, it causes issues. The main loop will exit naturally.
 
     def reset_to_idle(self):
         """Resets the application to the idle state and restarts wake word detection."""
         self.update_status("Idle")
+        # The listening session is over; the next wake word starts a fresh conversation.
+        self.model_switcher.end_conversation()
         
         # Force stop TTS and whisper listener to ensure audio device is released
         self.speaker.stop()
-        self.listener.stop()
-        
-        # Add a delay and more robust audio device handling
-        def delayed_start():
-            import time
-            time.sleep(1.5)  # Wait 1.5 seconds for audio system to fully settle
-            print(f"[DEBUG] Delayed wake word restart")
-            try:
-                if not self.wake_word_detector.is_running():
-                    # Use retry mechanism for better handling of audio device conflicts
-                    self.wake_word_detector.start_with_retry(max_retries=3, retry_delay=5)
-            except Exception as e:
-                print(f"[ERROR] Failed to restart wake word detection: {e}")
-                # Try again after another delay
-                time.sleep(1.0)
-                try:
-                    if not self.wake_word_detector.is_running():
-                        self.wake_word_detector.start_with_retry(max_retries=2, retry_delay=3)
-                except Exception as e2:
-                    print(f"[ERROR] Second attempt failed: {e2}")
-                    # Final attempt with force restart
-                    time.sleep(0.5)
-                    try:
-                        self.wake_word_detector.force_restart()
-                    except Exception as e3:
-                        print(f"[ERROR] Force restart also failed: {e3}")
+        if self.loader.is_ready("speech recognition"):
+            self.listener.stop()
         
-        threading.Thread(target=delayed_start, daemon=True).start()
-        print(f"[DEBUG] Wake word detection restart scheduled")
+        # The detector was only paused and the microphone stayed open, so this takes milliseconds.
+        # (If the detector is still loading, run() starts it once it is ready.)
+        if self.loader.is_ready("wake word"):
+            self.wake_word_detector.resume()
 
     def force_restart_wake_word(self):
         """Manual method to force restart wake word detection - useful for debugging"""
         print(f"[DEBUG] Force restarting wake word detection from main core")
         self.speaker.stop()
         self.listener.stop()
-        import time
-        time.sleep(0.5)
         self.wake_word_detector.force_restart()
 
 # --- Step 5: SSL Context and Application Entry Point ---
@@ -0,0 +1,367 @@
+import math
+import re
+from typing import List, Optional
+
+# --- Step 1: Vocabulary ---
+
+_SMALL_NUMBERS = {
+    "zero": 0, "oh": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+    "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+}
+_SCALES = {"thousand": 1e3, "million": 1e6, "billion": 1e9, "trillion": 1e12}
+_FRACTIONS = {"half": 0.5, "quarter": 0.25}
+
+# Spoken operators and the symbols they become before tokenising. When two phrases start with the
+# same word, the longer one comes first ("percent of" before "percent").
+_OPERATOR_PHRASES = [
+    ("to the power of", " ^ "), ("raised to the power of", " ^ "), ("raised to", " ^ "), ("to the power", " ^ "),
+    ("multiplied by", " * "), ("divided by", " / "), ("square root of", " sqrt "), ("the square root of", " sqrt "),
+    ("percent of", " % of "), ("per cent of", " % of "), ("percent", " % "), ("per cent", " % "),
+    ("plus", " + "), ("added to", " + "), ("minus", " - "), ("take away", " - "), ("times", " * "),
+    ("over", " / "), ("modulo", " mod "), ("squared", " ^ 2 "), ("cubed", " ^ 3 "), ("negative", " neg "),
+    ("x", " * "),
+]
+_OPERATOR_PATTERN = re.compile(
+    r"\b(" + "|".join(re.escape(phrase) for phrase, _ in _OPERATOR_PHRASES) + r")\b"
+)
+_OPERATOR_SYMBOLS = dict(_OPERATOR_PHRASES)
+
+# Leading/trailing words that carry no maths: "hey ryo, what's 15 plus 27 please?"
+_LEAD_IN = re.compile(
+    r"^(?:(?:hey|ok|okay|ryo|please|can you|could you|tell me|calculate|compute|work out|what's|whats|"
+    r"what is|how much is|how much are|what do you get if you|what are|is)\s+)+"
+)
+_TRAIL_OFF = re.compile(r"(?:\s+(?:equals?|equal to|is|please|ryo))+$")
+_TOKEN = re.compile(r"\d+(?:,\d{3})*(?:\.\d+)?|\.\d+|[-+*/^()%×÷]|[a-z]+")
+
+_MAX_EXPONENT = 1000
+_MAX_DEPTH = 50   # nested brackets/signs/roots; far more than anyone says, far less than Python's recursion limit
+
+
+class _ParseError(Exception):
+    pass
+
+
+# --- Step 2: Units ---
+
+# unit -> (dimension, factor to the dimension's base unit). Temperatures are handled separately.
+_UNITS = {}
+
+
+def _add_unit(dimension: str, factor: float, *names: str):
+    for name in names:
+        _UNITS[name] = (dimension, factor)
+
+
+_add_unit("length", 0.001, "mm", "millimeter", "millimeters", "millimetre", "millimetres")
+_add_unit("length", 0.01, "cm", "centimeter", "centimeters", "centimetre", "centimetres")
+_add_unit("length", 1.0, "m", "meter", "meters", "metre", "metres")
+_add_unit("length", 1000.0, "km", "kilometer", "kilometers", "kilometre", "kilometres")
+_add_unit("length", 0.0254, "inch", "inches")
+_add_unit("length", 0.3048, "ft", "foot", "feet")
+_add_unit("length", 0.9144, "yd", "yard", "yards")
+_add_unit("length", 1609.344, "mi", "mile", "miles")
+_add_unit("mass", 1e-6, "mg", "milligram", "milligrams")
+_add_unit("mass", 0.001, "g", "gram", "grams")
+_add_unit("mass", 1.0, "kg", "kilo", "kilos", "kilogram", "kilograms")
+_add_unit("mass", 1000.0, "tonne", "tonnes", "ton", "tons")
+_add_unit("mass", 0.45359237, "lb", "lbs", "pound", "pounds")
+_add_unit("mass", 0.028349523125, "oz", "ounce", "ounces")
+_add_unit("mass", 6.35029318, "stone", "stones")
+_add_unit("volume", 0.001, "ml", "milliliter", "milliliters", "millilitre", "millilitres")
+_add_unit("volume", 1.0, "l", "liter", "liters", "litre", "litres")
+_add_unit("volume", 3.785411784, "gallon", "gallons")
+_add_unit("volume", 0.946352946, "quart", "quarts")
+_add_unit("volume", 0.473176473, "pint", "pints")
+_add_unit("volume", 0.2365882365, "cup", "cups")
+_add_unit("time", 0.001, "ms", "millisecond", "milliseconds")
+_add_unit("time", 1.0, "s", "sec", "secs", "second", "seconds")
+_add_unit("time", 60.0, "min", "mins", "minute", "minutes")
+_add_unit("time", 3600.0, "h", "hr", "hrs", "hour", "hours")
+_add_unit("time", 86400.0, "day", "days")
+_add_unit("time", 604800.0, "week", "weeks")
+_add_unit("time", 31536000.0, "year", "years")
+_add_unit("speed", 1 / 3.6, "kph", "kmh", "kilometers per hour", "kilometres per hour")
+_add_unit("speed", 0.44704, "mph", "miles per hour")
+
+_TEMPERATURES = {
+    "c": "celsius", "celsius": "celsius", "centigrade": "celsius",
+    "f": "fahrenheit", "fahrenheit": "fahrenheit",
+    "k": "kelvin", "kelvin": "kelvin", "kelvins": "kelvin",
+}
+
+_UNIT_NAME = "|".join(
+    re.escape(name) for name in sorted(list(_UNITS) + list(_TEMPERATURES), key=len, reverse=True)
+)
+# "convert 5 miles to km", "5 miles in kilometers", "what's 100 f in celsius"
+_CONVERT = re.compile(
+    rf"^(?:convert\s+)?(?P<amount>.+?)\s*(?:degrees?\s+)?(?P<src>{_UNIT_NAME})\s+(?:to|in|into|as)\s+"
+    rf"(?:degrees?\s+)?(?P<dst>{_UNIT_NAME})$"
+)
+# "how many feet in a mile", "how many seconds are there in 3 hours"
+_HOW_MANY = re.compile(
+    rf"^how many\s+(?:degrees?\s+)?(?P<dst>{_UNIT_NAME})\s+(?:are\s+)?(?:there\s+)?(?:in|is|are)\s+"
+    rf"(?:(?P<amount>.+?)\s+)?(?:degrees?\s+)?(?P<src>{_UNIT_NAME})$"
+)
+
+
+def _to_celsius(value: float, scale: str) -> float:
+    if scale == "fahrenheit":
+        return (value - 32) * 5 / 9
+    if scale == "kelvin":
+        return value - 273.15
+    return value
+
+
+def _from_celsius(value: float, scale: str) -> float:
+    if scale == "fahrenheit":
+        return value * 9 / 5 + 32
+    if scale == "kelvin":
+        return value + 273.15
+    return value
+
+
+def format_number(value: float) -> str:
+    """Formats a result the way it should be spoken: whole numbers without decimals, others rounded."""
+    if abs(value - round(value)) < 1e-9 and abs(value) < 1e15:
+        return str(int(round(value)))
+    if abs(value) >= 1:
+        return f"{value:.2f}".rstrip("0").rstrip(".")
+    return f"{value:.3g}"
+
+
+# --- Step 3: The engine ---
+
+class MathEngine:
+    """
+    Answers spoken arithmetic and unit conversions locally ("what's fifteen plus twenty seven",
+    "20 percent of 80", "how many feet in a mile"). Nothing is ever passed to eval(): questions
+    are tokenised and evaluated by a small recursive-descent parser.
+    """
+
+    def answer(self, question: str) -> Optional[str]:
+        """Returns the spoken answer, or None if the question isn't maths this engine understands."""
+        text = self._clean(question)
+        if not text:
+            return None
+        try:
+            reply = self._convert(text)
+            if reply is None:
+                reply = self._calculate(text)
+            return reply
+        except ZeroDivisionError:
+            return "You can't divide by zero."
+        except (_ParseError, OverflowError, ValueError):
+            return None
+
+    @staticmethod
+    def _clean(question: str) -> str:
+        text = question.lower().replace("’", "'")
+        text = re.sub(r"[?!,]+(?=\s|$)|[?!]", " ", text)
+        text = text.strip().rstrip(".")
+        text = " ".join(text.split())
+        text = _LEAD_IN.sub("", text)
+        return _TRAIL_OFF.sub("", text).strip()
+
+    def _convert(self, text: str) -> Optional[str]:
+        found = _CONVERT.match(text)
+        how_many = False
+        if not found:
+            found = _HOW_MANY.match(text)
+            how_many = True
+        if not found:
+            return None
+        amount_text = found.group("amount") or "one"
+        if amount_text in ("a", "an"):
+            amount_text = "one"
+        amount = self._evaluate(_tokenize(amount_text))
+        src, dst = found.group("src"), found.group("dst")
+        result = self._convert_units(amount, src, dst)
+        if result is None:
+            return None
+        if how_many:
+            quantity = found.group("amount") or "one"
+            return f"There are {format_number(result)} {dst} in {quantity} {src}."
+        return f"{format_number(amount)} {src} is {format_number(result)} {dst}."
+
+    @staticmethod
+    def _convert_units(amount: float, src: str, dst: str) -> Optional[float]:
+        if src in _TEMPERATURES and dst in _TEMPERATURES:
+            return _from_celsius(_to_celsius(amount, _TEMPERATURES[src]), _TEMPERATURES[dst])
+        if src in _UNITS and dst in _UNITS:
+            src_dimension, src_factor = _UNITS[src]
+            dst_dimension, dst_factor = _UNITS[dst]
+            if src_dimension == dst_dimension:
+                return amount * src_factor / dst_factor
+        return None
+
+    def _calculate(self, text: str) -> Optional[str]:
+        tokens = _tokenize(text)
+        if not any(token in _OPERATORS for token in tokens):
+            return None  # a bare number ("2018") is not a calculation
+        result = self._evaluate(tokens)
+        return f"{text} is {format_number(result)}."
+
+    @staticmethod
+    def _evaluate(tokens: List[str]) -> float:
+        parser = _Parser(tokens)
+        value = parser.expression()
+        if parser.peek() is not None:
+            raise _ParseError(f"Unexpected '{parser.peek()}'")
+        if math.isnan(value) or math.isinf(value):
+            raise OverflowError("Result is not a finite number")
+        return value
+
+
+_OPERATORS = {"+", "-", "*", "/", "^", "%", "mod", "sqrt", "neg", "of", "(", ")"}
+
+
+def _tokenize(text: str) -> List[str]:
+    """Turns 'fifteen plus twenty seven' into ['15', '+', '27']: operators become symbols, number words numbers."""
+    text = text.replace("×", " * ").replace("÷", " / ")
+    text = _OPERATOR_PATTERN.sub(lambda m: _OPERATOR_SYMBOLS[m.group(1)], text)
+    raw = _TOKEN.findall(text)
+    tokens, words = [], []
+    for token in raw:
+        if token in _SMALL_NUMBERS or token in _SCALES or token in _FRACTIONS or token in ("hundred", "point", "a", "an") \
+                or (token == "and" and words):
+            words.append(token)
+            continue
+        if words:
+            tokens.append(_words_to_number(words))
+            words = []
+        tokens.append(token.replace(",", ""))
+    if words:
+        tokens.append(_words_to_number(words))
+    return tokens
+
+
+def _words_to_number(words: List[str]) -> str:
+    """'two hundred and five point three' -> '205.3'; 'a half' -> '0.5'."""
+    words = [word for word in words if word != "and"]
+    if words and words[0] in ("a", "an"):
+        words = words[1:] or ["one"]
+    if len(words) == 1 and words[0] in _FRACTIONS:
+        return str(_FRACTIONS[words[0]])
+    if "point" in words:
+        index = words.index("point")
+        whole = _words_to_number(words[:index]) if index else "0"
+        digits = "".join(str(_SMALL_NUMBERS.get(word, "")) for word in words[index + 1:])
+        if not digits or any(_SMALL_NUMBERS.get(word, 10) > 9 for word in words[index + 1:]):
+            raise _ParseError("Bad decimal")
+        return f"{whole}.{digits}"
+    total, current = 0.0, 0.0
+    for word in words:
+        if word in _SMALL_NUMBERS:
+            current += _SMALL_NUMBERS[word]
+        elif word == "hundred":
+            current = (current or 1) * 100
+        elif word in _SCALES:
+            total += (current or 1) * _SCALES[word]
+            current = 0
+        else:
+            raise _ParseError(f"Unknown number word '{word}'")
+    return str(int(total + current))
+
+
+class _Parser:
+    """
+    expression := term (('+' | '-') term)*
+    term       := unary (('*' | '/' | 'mod' | 'of') unary)*
+    unary      := ('-' | 'neg') unary | 'sqrt' unary | power
+    power      := percent ('^' unary)?
+    percent    := primary '%'*
+    primary    := number | '(' expression ')'
+    """
+
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+        self.position = 0
+        self.depth = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self) -> str:
+        token = self.peek()
+        if token is None:
+            raise _ParseError("Unexpected end of expression")
+        self.position += 1
+        return token
+
+    def expression(self) -> float:
+        value = self.term()
+        while self.peek() in ("+", "-"):
+            if self.take() == "+":
+                value += self.term()
+            else:
+                value -= self.term()
+        return value
+
+    def term(self) -> float:
+        value = self.unary()
+        while self.peek() in ("*", "/", "mod", "of"):
+            operator = self.take()
+            right = self.unary()
+            if operator in ("*", "of"):
+                value *= right
+            elif operator == "/":
+                value /= right
+            else:
+                if not right:
+                    raise ZeroDivisionError("Modulo by zero")
+                value = math.fmod(value, right)
+        return value
+
+    def unary(self) -> float:
+        # Every nested bracket, sign, root and exponent comes back through here.
+        if self.depth >= _MAX_DEPTH:
+            raise _ParseError("Expression nested too deeply")
+        self.depth += 1
+        try:
+            return self._unary()
+        finally:
+            self.depth -= 1
+
+    def _unary(self) -> float:
+        if self.peek() in ("-", "neg"):
+            self.take()
+            return -self.unary()
+        if self.peek() == "sqrt":
+            self.take()
+            value = self.unary()
+            if value < 0:
+                raise ValueError("Square root of a negative number")
+            return math.sqrt(value)
+        return self.power()
+
+    def power(self) -> float:
+        base = self.percent()
+        if self.peek() == "^":
+            self.take()
+            exponent = self.unary()
+            if abs(exponent) > _MAX_EXPONENT:
+                raise OverflowError("Exponent too large")
+            return math.pow(base, exponent)
+        return base
+
+    def percent(self) -> float:
+        value = self.primary()
+        while self.peek() == "%":
+            self.take()
+            value /= 100
+        return value
+
+    def primary(self) -> float:
+        token = self.take()
+        if token == "(":
+            value = self.expression()
+            if self.take() != ")":
+                raise _ParseError("Missing ')'")
+            return value
+        try:
+            return float(token)
+        except ValueError:
+            raise _ParseError(f"Not a number: '{token}'")
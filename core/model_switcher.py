@@ -1,13 +1,48 @@
+import hashlib
 import os
 import sys
 import threading
 from typing import Optional
 from ai.ollama_handler import OllamaHandler
-from core.config import GEMINI_API_KEY
-try:
-    import google.generativeai as genai
-except ImportError:
-    genai = None
+from ai.model_residency import ModelResidencyManager
+from ai.gemini_handler import GeminiHandler
+from ai.hedged_request import hedged_stream
+from core.config import LLM_HEDGE_DELAY, LLM_RACE_MODE, OLLAMA_MODEL, RESPONSE_CACHE_ENABLED
+from core.conversation import Conversation
+from core.response_cache import ResponseCache
+from core.skills import SkillRegistry, register_default_skills
+
+# Replies the backends give when something went wrong. These must never be cached.
+ERROR_REPLY_PREFIXES = (
+    "I'm having trouble",
+    "I'm sorry, I didn't get a response",
+    "The Ollama model '",
+    "Gemini API",
+    "google-generativeai library not installed",
+    "Error: ",
+)
+
+
+def is_error_reply(reply: str) -> bool:
+    """Checks whether a backend reply is one of the error messages above rather than a real answer."""
+    return not reply or not reply.strip() or reply.strip().startswith(ERROR_REPLY_PREFIXES)
+
+
+def _stream_into(stream, pieces: list):
+    """
+    Yields the pieces of a backend's answer stream, also appending them to `pieces`. Returns
+    whether the answer was complete: a backend stream returns False when it broke off part way.
+    """
+    try:
+        while True:
+            try:
+                piece = next(stream)
+            except StopIteration as stop:
+                return stop.value is not False
+            pieces.append(piece)
+            yield piece
+    finally:
+        stream.close()   # the listener stopped early: stop the backend too
 
 class ModelSwitcher:
     """
@@ -15,66 +50,186 @@ class ModelSwitcher:
     This is a simplified implementation that can be enhanced later.
     """
     
-    def __init__(self):
+    def __init__(self, response_cache: Optional[ResponseCache] = None,
+                 race_mode: str = LLM_RACE_MODE, hedge_delay: float = LLM_HEDGE_DELAY):
         self.active_model_name = "Ollama"  # Default model
-        self.ollama_handler = OllamaHandler(model="mistral")
+        # "off", "race" or "hedge" (see LLM_RACE_MODE in the config)
+        self.race_mode = race_mode
+        self.hedge_delay = hedge_delay
+        # Answers to repeated questions; pass a cache in to share one, or disable it in the config.
+        if response_cache is None and RESPONSE_CACHE_ENABLED:
+            response_cache = ResponseCache()
+        self.response_cache = response_cache
+        # Time, date, greetings... are answered locally, whichever backend is selected.
+        self.skills = SkillRegistry()
+        register_default_skills(self.skills, active_model=lambda: self.active_model_name)
+        # History of the current listening session (None outside a session); see start_conversation.
+        self.conversation = None
+        self.ollama_handler = OllamaHandler(model=OLLAMA_MODEL)
+        # Keeps the local model loaded while Ryo is in use; started by the app (see start_residency).
+        self.ollama_residency = ModelResidencyManager(self.ollama_handler)
+        # Reuses configured Gemini clients and skips models that are out of quota.
+        self.gemini_handler = GeminiHandler()
         self.models = {
             "Ollama": self._ollama_ask,
             "Gemini": self._gemini_ask
         }
+        # Streaming versions of the same backends, used by ask_stream.
+        self.stream_models = {
+            "Ollama": self._ollama_ask_stream,
+            "Gemini": self._gemini_ask_stream
+        }
         
     def set_active_model(self, model_name: str):
         """Switch to a different AI model"""
         if model_name in self.models:
             self.active_model_name = model_name
             print(f"[ModelSwitcher] Switched to {model_name}")
+            self.note_activity()
         else:
             print(f"[ModelSwitcher] Unknown model: {model_name}")
     
+    def start_residency(self, on_state_change: callable = None):
+        """Starts keeping the local model warm. The callback receives residency states like 'warming up'."""
+        self.ollama_residency.on_state_change = on_state_change
+        self.ollama_residency.start(preload=self.active_model_name == "Ollama")
+
+    def stop_residency(self):
+        """Stops the keep-alive thread and gives the local model's memory back."""
+        self.ollama_residency.stop(unload=True)
+
+    def note_activity(self):
+        """Tells the active backend a question is probably coming (e.g. the wake word was heard)."""
+        if self.active_model_name == "Ollama":
+            self.ollama_residency.touch()
+
+    def start_conversation(self):
+        """Begins a new listening session: following questions are answered with its history."""
+        self.conversation = Conversation()
+
+    def end_conversation(self):
+        """Ends the listening session; the next question starts from a clean slate."""
+        self.conversation = None
+
     def ask(self, question: str) -> str:
         """Ask a question to the active AI model"""
-        if self.active_model_name in self.models:
-            return self.models[self.active_model_name](question)
-        else:
+        if self.active_model_name not in self.models:
             return f"Error: Unknown model {self.active_model_name}"
+        skill_reply = self.skills.match(question)
+        if skill_reply is not None:
+            return skill_reply
+        history = self._history()
+        cached = self._cached_reply(question, history)
+        if cached is not None:
+            return cached
+        if self._racing():
+            return "".join(self._race_stream(question, history)).strip()
+        reply = self.models[self.active_model_name](question, history)
+        self._remember_reply(question, reply, history=history)
+        return reply
+
+    def ask_stream(self, question: str):
+        """Ask a question to the active AI model, yielding the answer in pieces as it is generated"""
+        if self.active_model_name not in self.stream_models:
+            yield f"Error: Unknown model {self.active_model_name}"
+            return
+        skill_reply = self.skills.match(question)
+        if skill_reply is not None:
+            yield skill_reply
+            return
+        history = self._history()
+        cached = self._cached_reply(question, history)
+        if cached is not None:
+            yield cached
+            return
+        if self._racing():
+            yield from self._race_stream(question, history)
+            return
+        pieces = []
+        complete = yield from _stream_into(self.stream_models[self.active_model_name](question, history), pieces)
+        # Not when the listener stopped early, nor when the answer broke off part way.
+        if complete:
+            self._remember_reply(question, "".join(pieces).strip(), history=history)
+
+    def _racing(self) -> bool:
+        """Race mode only makes sense when a second backend is actually usable."""
+        return self.race_mode in ("race", "hedge") and len(self._race_backends()) > 1
+
+    def _race_backends(self) -> list:
+        """The active backend first, then every other backend that is set up."""
+        names = [self.active_model_name] + [name for name in self.stream_models if name != self.active_model_name]
+        if not self.gemini_handler.is_configured():
+            names.remove("Gemini")
+        return names
+
+    def _race_stream(self, question: str, history: list):
+        """Streams the answer of whichever backend starts a real (non-error) answer first."""
+        winner = []
+        backends = [
+            (name, lambda name=name: self.stream_models[name](question, history)) for name in self._race_backends()
+        ]
+        pieces = []
+        complete = yield from _stream_into(hedged_stream(
+            backends,
+            hedge_delay=self.hedge_delay if self.race_mode == "hedge" else 0.0,
+            acceptable=lambda text: not is_error_reply(text),
+            on_winner=winner.append,
+        ), pieces)
+        if winner and complete:
+            # Stored under the active backend, which is what _cached_reply looks up: whoever wins,
+            # it is the answer the user gets for this question in race mode.
+            self._remember_reply(question, "".join(pieces).strip(), history=history)
+
+    def get_skill_stats(self) -> dict:
+        """How many questions each built-in skill answered without an AI call."""
+        return self.skills.get_stats()
+
+    def get_gemini_stats(self) -> dict:
+        """Per-model Gemini success/latency/error statistics."""
+        return self.gemini_handler.get_stats()
+
+    def get_cache_stats(self) -> dict:
+        """Hit/miss counters of the response cache (empty if caching is disabled)."""
+        return self.response_cache.get_stats() if self.response_cache else {}
+
+    def _cache_identity(self):
+        """The (model, prompt version) pair a cached answer is tied to for the active backend."""
+        if self.active_model_name == "Ollama":
+            model = f"Ollama:{self.ollama_handler.model}"
+            system_prompt = self.ollama_handler.system_prompt
+        else:
+            model = self.active_model_name
+            system_prompt = self.gemini_handler.system_prompt
+        prompt_version = hashlib.sha1(system_prompt.encode("utf-8")).hexdigest()[:12]
+        return model, prompt_version
+
+    def _history(self) -> list:
+        return self.conversation.messages() if self.conversation else []
+
+    def _cached_reply(self, question: str, history: list) -> Optional[str]:
+        # Follow-up questions ("and how tall is it?") depend on the conversation, so they never hit the cache.
+        if not self.response_cache or history:
+            return None
+        reply = self.response_cache.get(question, *self._cache_identity())
+        if reply is not None:
+            print(f"[ModelSwitcher] Cache hit for: '{question}' ({self.response_cache.get_stats()['hit_rate']:.0f}% hit rate)")
+        return reply
+
+    def _remember_reply(self, question: str, reply: str, history: list = None):
+        """Adds a real answer to the session history, and to the cache if it didn't depend on earlier turns."""
+        if is_error_reply(reply):
+            return
+        if self.conversation:
+            self.conversation.add_exchange(question, reply)
+        if self.response_cache and not history:
+            self.response_cache.put(question, *self._cache_identity(), reply)
     
-    def _ollama_ask(self, question: str) -> str:
-        """Handle basic AI queries and calculations, otherwise call Ollama LLM"""
-        question_lower = question.lower().strip()
-        
-        # Handle specific system queries only - be very specific
-        if question_lower in ["what time is it", "what's the time", "time"]:
-            from datetime import datetime
-            return f"The current time is {datetime.now().strftime('%H:%M:%S')}"
-        elif question_lower in ["what date is it", "what's the date", "date", "what day is it"]:
-            from datetime import datetime
-            return f"Today's date is {datetime.now().strftime('%B %d, %Y')}"
-        elif question_lower in ["what model am i using right now", "which model am i using", "what ai model am i using"]:
-            return f"You are currently using the Ollama model."
-        elif "weather" in question_lower and ("what" in question_lower or "how" in question_lower):
-            return "I don't have access to real-time weather data, but you can check your local weather app or website."
-        elif question_lower in ["hello", "hi", "hey", "greetings", "good morning", "good afternoon", "good evening"]:
-            return "Hello! I'm Ryo, your AI assistant. How can I help you today?"
-        elif question_lower in ["help", "what can you do", "what can you help with"]:
-            return """I can help you with:
-- Math calculations and problem solving
-- Managing your todo list (add, remove, list tasks)
-- Telling time and date
-- Answering general questions
-- Basic conversations
-
-Try saying things like:
-- \"What's 15 plus 27?\"
-- \"Add groceries to my list\"
-- \"What time is it?\"
-- \"Hello\" or \"How are you?\" """
-        elif question_lower in ["how are you", "how are you doing"]:
-            return "I'm doing well, thank you for asking! I'm ready to help you with tasks and questions."
-        
-        # For ALL other queries (including math, general knowledge, etc.), call the real Ollama LLM
+    def _ollama_ask(self, question: str, history: list = None) -> str:
+        """Call the local Ollama LLM"""
+        self.ollama_residency.touch()
         try:
             print(f"[ModelSwitcher] Calling Ollama with: '{question}'")
-            response = self.ollama_handler.ask(question)
+            response = self.ollama_handler.ask(question, history)
             if response and response.strip():
                 return response.strip()
             else:
@@ -82,66 +237,29 @@ Try saying things like:
         except Exception as e:
             print(f"[ModelSwitcher] Ollama error: {e}")
             return f"I'm having trouble reaching the Ollama model right now. ({e})"
-    
-    def _gemini_ask(self, question: str) -> str:
+
+    def _ollama_ask_stream(self, question: str, history: list = None):
+        """Streaming version of _ollama_ask, yielding the answer token by token"""
+        print(f"[ModelSwitcher] Streaming from Ollama with: '{question}'")
+        self.ollama_residency.touch()
+        pieces = []
+        try:
+            complete = yield from _stream_into(self.ollama_handler.ask_stream(question, history), pieces)
+        except Exception as e:
+            print(f"[ModelSwitcher] Ollama error: {e}")
+            if not pieces:
+                yield f"I'm having trouble reaching the Ollama model right now. ({e})"
+            return False
+        if not "".join(pieces):
+            yield "I'm sorry, I didn't get a response from the AI model."
+            return False
+        return complete
+
+    def _gemini_ask(self, question: str, history: list = None) -> str:
         """Call Gemini API for text generation."""
         print(f"[DEBUG] Gemini API called with: '{question}'")
-        
-        if not GEMINI_API_KEY:
-            print("[DEBUG] Gemini API key not found")
-            return "Gemini API key not found. Please set GEMINI_API_KEY in your .env file."
-        if genai is None:
-            print("[DEBUG] google-generativeai library not installed")
-            return "google-generativeai library not installed. Please install it."
-        
-        # Try gemini-2.5-pro first (latest stable), then fallback to gemini-2.5-flash
-        models_to_try = ["gemini-2.5-pro", "gemini-2.5-flash"]
-        
-        for model_name in models_to_try:
-            try:
-                print(f"[DEBUG] Trying Gemini model: {model_name}")
-                genai.configure(api_key=GEMINI_API_KEY)
-                model = genai.GenerativeModel(model_name)
-                
-                # Add system prompt to match Ollama behavior
-                system_prompt = (
-                    "You are Ryo, a smart and efficient AI voice assistant. Keep responses brief and to the point.\n\n"
-                    "Your personality:\n"
-                    "- Helpful and friendly\n"
-                    "- Concise in responses\n"
-                    "- Good at math and problem solving\n"
-                    "- Can manage todo lists\n"
-                    "- Responds naturally to casual conversation\n\n"
-                    "Important: If the user asks 'what model am I using right now', 'which model am I using', or 'what AI model am I using', always respond with 'You are currently using the Gemini model.'\n\n"
-                    "Keep responses under 2-3 sentences unless the user asks for more detail."
-                )
-                
-                # Create the full prompt with system instruction
-                full_prompt = f"{system_prompt}\n\nUser: {question}\nRyo:"
-                
-                response = model.generate_content(full_prompt)
-                
-                if hasattr(response, 'text'):
-                    result = response.text.strip()
-                    print(f"[DEBUG] Gemini response received: {result[:100]}...")
-                    return result
-                else:
-                    result = str(response)
-                    print(f"[DEBUG] Gemini response (no text attr): {result[:100]}...")
-                    return result
-                    
-            except Exception as e:
-                error_str = str(e).lower()
-                print(f"[DEBUG] Gemini model {model_name} error: {e}")
-                
-                if "quota" in error_str or "exceeded" in error_str:
-                    if model_name == models_to_try[-1]:  # Last model tried
-                        return f"Gemini API quota exceeded. Please try again later or check your Google AI Studio quota."
-                    continue  # Try next model
-                elif model_name == models_to_try[-1]:  # Last model tried
-                    return f"Gemini API error: {e}"
-                else:
-                    continue  # Try next model
-        
-        print("[DEBUG] All Gemini models failed")
-        return "Gemini API error: All models failed" 
\ No newline at end of file
+        return self.gemini_handler.ask(question, history)
+
+    def _gemini_ask_stream(self, question: str, history: list = None):
+        """Streaming version of _gemini_ask, yielding text chunks as Gemini produces them."""
+        return (yield from self.gemini_handler.ask_stream(question, history))
@@ -0,0 +1,142 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from core.config import (
+    RESPONSE_CACHE_FILE,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_TTL_SECONDS,
+)
+
+# Questions whose answer depends on when they are asked (or on live data) are never cached.
+_TIME_SENSITIVE = re.compile(
+    r"\b(time|date|day|today|tonight|tomorrow|yesterday|now|current|currently|latest|recent|news|"
+    r"weather|forecast|temperature|score|scores|stock|stocks|price|prices|this (week|month|year)|"
+    r"remind|reminder|todo|to do|list|joke|random|another)\b"
+)
+_CONTRACTIONS = {
+    "what's": "what is", "whats": "what is", "who's": "who is", "where's": "where is",
+    "how's": "how is", "it's": "it is", "that's": "that is", "there's": "there is",
+    "i'm": "i am", "you're": "you are", "can't": "cannot", "don't": "do not",
+}
+# Words that don't change the meaning of a spoken question.
+_FILLERS = {"hey", "ryo", "please", "um", "uh", "so", "okay", "ok"}
+
+
+class ResponseCache:
+    """An LRU cache of AI answers with per-entry expiry, persisted to a JSON file between runs."""
+
+    def __init__(self, file_path: str = RESPONSE_CACHE_FILE,
+                 max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS):
+        self.file_path = file_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        # Least recently used entries first: key -> {"answer": str, "expires": epoch seconds}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._ensure_data_dir()
+        self.load()
+
+    @staticmethod
+    def normalize(question: str) -> str:
+        """Reduces a spoken question to a canonical form, so small wording differences share an entry."""
+        text = question.lower().strip()
+        for contraction, expansion in _CONTRACTIONS.items():
+            text = re.sub(rf"\b{re.escape(contraction)}\b", expansion, text)
+        text = re.sub(r"[^\w\s+*/%.-]", " ", text)
+        text = re.sub(r"(?<!\d)\.|\.(?!\d)", " ", text)  # keep decimal points only
+        words = [word for word in text.split() if word not in _FILLERS]
+        return " ".join(words)
+
+    @staticmethod
+    def is_cacheable(question: str) -> bool:
+        """Time-sensitive or live-data questions must always go to the model."""
+        return not _TIME_SENSITIVE.search(ResponseCache.normalize(question))
+
+    def make_key(self, question: str, model: str, prompt_version: str) -> str:
+        return f"{model}|{prompt_version}|{self.normalize(question)}"
+
+    def get(self, question: str, model: str, prompt_version: str) -> Optional[str]:
+        """Returns the cached answer, or None on a miss, an expired entry or a time-sensitive question."""
+        if not self.is_cacheable(question):
+            self.bypassed += 1
+            return None
+        key = self.make_key(question, model, prompt_version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["expires"] < time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["answer"]
+
+    def put(self, question: str, model: str, prompt_version: str, answer: str):
+        """Stores an answer, evicting the least recently used entries beyond max_entries."""
+        if not answer or not self.is_cacheable(question):
+            return
+        key = self.make_key(question, model, prompt_version)
+        with self._lock:
+            self._entries[key] = {"answer": answer, "expires": time.time() + self.ttl_seconds}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self.save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self.save()
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'bypassed': self.bypassed,
+            'hit_rate': (self.hits / lookups * 100) if lookups > 0 else 0
+        }
+
+    def _ensure_data_dir(self):
+        dir_path = os.path.dirname(self.file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+    def load(self):
+        """Load unexpired entries from file, keeping their LRU order"""
+        try:
+            if os.path.exists(self.file_path):
+                with open(self.file_path, 'r') as f:
+                    stored = json.load(f)
+                now = time.time()
+                with self._lock:
+                    self._entries = OrderedDict(
+                        (item["key"], {"answer": item["answer"], "expires": item["expires"]})
+                        for item in stored if item["expires"] >= now
+                    )
+        except Exception as e:
+            print(f"[ERROR] Failed to load response cache: {e}")
+            self._entries = OrderedDict()
+
+    def save(self):
+        """Save entries to file. Writes a temp file first so a crash never leaves a half-written cache."""
+        try:
+            with self._lock:
+                stored = [{"key": key, **entry} for key, entry in self._entries.items()]
+            tmp_path = self.file_path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, self.file_path)
+        except Exception as e:
+            print(f"[ERROR] Failed to save response cache: {e}")
@@ -0,0 +1,162 @@
+import re
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, Optional
+from core.math_engine import MathEngine
+
+
+class SkillRegistry:
+    """
+    Answers simple requests (time, date, greetings...) without calling any AI model.
+    Exact phrases live in a dictionary and all patterns are compiled into a single regular
+    expression, so matching costs the same however many skills are registered.
+    """
+
+    def __init__(self):
+        self._phrases = {}     # normalised phrase -> skill name
+        self._patterns = []    # (skill name, pattern source)
+        self._handlers = {}    # skill name -> handler(question) -> reply
+        self._hits = {}
+        self._compiled = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase, no surrounding punctuation, single spaces: 'What's the time?' -> "what's the time"."""
+        text = re.sub(r"[?!.,;:\"]+", " ", text.lower())
+        return " ".join(text.split())
+
+    def register(self, name: str, handler: Callable[[str], str], phrases: Iterable[str] = (),
+                 patterns: Iterable[str] = ()):
+        """
+        Registers a skill.
+
+        Args:
+            name (str): Skill name, used for the hit counters.
+            handler (callable): Called with the user's question; returns the spoken reply, or None
+                                to pass the question on to the AI model after all.
+            phrases (iterable): Whole questions that trigger the skill (matched after normalize()).
+            patterns (iterable): Regular expressions searched in the normalised question.
+        """
+        with self._lock:
+            self._handlers[name] = handler
+            self._hits.setdefault(name, 0)
+            for phrase in phrases:
+                self._phrases[self.normalize(phrase)] = name
+            for pattern in patterns:
+                self._patterns.append((name, pattern))
+            self._compiled = None
+
+    def match(self, question: str) -> Optional[str]:
+        """
+        Returns the reply of the skill that handles the question, or None if no skill does.
+        A skill whose handler declines (returns None) passes the question on to the next
+        skill that matches it.
+        """
+        tried = set()
+        for name in self._candidates(self.normalize(question)):
+            if name in tried:
+                continue
+            tried.add(name)
+            reply = self._handlers[name](question)
+            if reply is None:
+                continue
+            with self._lock:
+                self._hits[name] += 1
+            print(f"[Skills] '{question}' answered by the {name} skill")
+            return reply
+        return None
+
+    def _candidates(self, text: str) -> Iterator[str]:
+        """The skills matching the text, best first: an exact phrase, then the first pattern found."""
+        name = self._phrases.get(text)
+        if name is not None:
+            yield name
+        found = self._pattern_table().search(text) if self._patterns else None
+        if found is None:
+            return
+        yield self._patterns[int(found.lastgroup[1:])][0]
+        # Only reached when the skills so far declined: every other pattern, in registration order.
+        for name, pattern in self._patterns:
+            if re.search(pattern, text):
+                yield name
+
+    def get_stats(self) -> Dict[str, int]:
+        """How many questions each skill answered (each one an AI call saved)."""
+        with self._lock:
+            return dict(self._hits)
+
+    def _pattern_table(self):
+        # One alternation with a named group per pattern; lastgroup tells which pattern matched.
+        if self._compiled is None:
+            with self._lock:
+                self._compiled = re.compile(
+                    "|".join(f"(?P<p{i}>{pattern})" for i, (_, pattern) in enumerate(self._patterns))
+                )
+        return self._compiled
+
+
+HELP_TEXT = """I can help you with:
+- Math calculations and problem solving
+- Managing your todo list (add, remove, list tasks)
+- Telling time and date
+- Answering general questions
+- Basic conversations
+
+Try saying things like:
+- \"What's 15 plus 27?\"
+- \"Add groceries to my list\"
+- \"What time is it?\"
+- \"Hello\" or \"How are you?\" """
+
+
+def register_default_skills(registry: SkillRegistry, active_model: Callable[[], str]):
+    """
+    Registers Ryo's built-in skills.
+
+    Args:
+        registry (SkillRegistry): The registry to fill.
+        active_model (callable): Returns the name of the selected AI model, for "which model" questions.
+    """
+    registry.register(
+        "time",
+        lambda q: f"The current time is {datetime.now().strftime('%H:%M:%S')}",
+        phrases=["what time is it", "what's the time", "time"],
+    )
+    registry.register(
+        "date",
+        lambda q: f"Today's date is {datetime.now().strftime('%B %d, %Y')}",
+        phrases=["what date is it", "what's the date", "date", "what day is it"],
+    )
+    registry.register(
+        "model",
+        lambda q: f"You are currently using the {active_model()} model.",
+        phrases=["what model am i using right now", "which model am i using", "what ai model am i using"],
+    )
+    registry.register(
+        "weather",
+        lambda q: "I don't have access to real-time weather data, but you can check your local weather app or website.",
+        patterns=[r"(?=.*\bweather\b)(?=.*\b(?:what|how)\b)"],
+    )
+    registry.register(
+        "greeting",
+        lambda q: "Hello! I'm Ryo, your AI assistant. How can I help you today?",
+        phrases=["hello", "hi", "hey", "greetings", "good morning", "good afternoon", "good evening"],
+    )
+    registry.register(
+        "help",
+        lambda q: HELP_TEXT,
+        phrases=["help", "what can you do", "what can you help with"],
+    )
+    registry.register(
+        "how are you",
+        lambda q: "I'm doing well, thank you for asking! I'm ready to help you with tasks and questions.",
+        phrases=["how are you", "how are you doing"],
+    )
+    # Only questions with a digit or a maths word reach the parser; if it can't parse one, the model gets it.
+    registry.register(
+        "math",
+        MathEngine().answer,
+        patterns=[r"^(?=.*(?:\d|\b(?:plus|minus|times|divided|multiplied|percent|squared|cubed|power|root|"
+                  r"modulo|over|convert|how many)\b))"],
+    )
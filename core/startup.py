@@ -0,0 +1,143 @@
+# === Ryo AI Assistant - Background Startup ===
+# Loading the speech model, creating the wake-word engine and importing the Gemini library
+# each take from a fraction of a second to several seconds. Doing them one after another
+# on the main thread kept the window from appearing until all of them were done.
+# SubsystemLoader builds them in parallel on worker threads; the rest of the app asks for
+# a subsystem when it needs it and waits (or queues a callback) only if it isn't ready yet.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Optional
+
+
+class SubsystemLoader:
+    """Builds named subsystems concurrently and hands them out once they are ready."""
+
+    # Subsystem states, passed to on_state_change
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self, max_workers: int = 4, on_state_change: Callable[[str, str], None] = None):
+        """
+        Args:
+            max_workers (int): How many subsystems may load at the same time.
+            on_state_change (callable, optional): Called as (name, state) from the loading thread.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="startup")
+        self._futures: Dict[str, Future] = {}
+        self._states: Dict[str, str] = {}
+        self._timings: Dict[str, float] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._lock = threading.Lock()
+        self._started_at = time.perf_counter()
+        self._reported = False
+        self.on_state_change = on_state_change
+
+    def add(self, name: str, factory: Callable[[], object]) -> Future:
+        """Starts building a subsystem in the background. Returns the future of the built object."""
+        with self._lock:
+            self._states[name] = self.LOADING
+            future = self._executor.submit(self._load, name, factory)
+            self._futures[name] = future
+        self._notify(name, self.LOADING)
+        return future
+
+    def get(self, name: str, timeout: Optional[float] = None):
+        """Returns the subsystem, waiting for it to finish loading. Re-raises the error if loading failed."""
+        return self._futures[name].result(timeout=timeout)
+
+    def is_ready(self, name: str) -> bool:
+        return self._states.get(name) == self.READY
+
+    def state(self, name: str) -> Optional[str]:
+        return self._states.get(name)
+
+    def when_ready(self, name: str, callback: Callable[[object], None]):
+        """
+        Calls callback(subsystem) once the subsystem is ready: right away if it already is,
+        otherwise from the loading thread when it finishes. Nothing is called if loading fails.
+        """
+        def deliver(future: Future):
+            if future.exception() is None:
+                try:
+                    callback(future.result())
+                except Exception as e:
+                    print(f"[ERROR] Queued request for {name} failed: {e}")
+        self._futures[name].add_done_callback(deliver)
+
+    def set_state_callback(self, callback: Callable[[str, str], None]):
+        """Sets on_state_change and immediately reports the current state of every subsystem."""
+        self.on_state_change = callback
+        for name, state in self.states().items():
+            callback(name, state)
+
+    def states(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._states)
+
+    def timings(self) -> Dict[str, float]:
+        """Seconds each subsystem took to build, for the ones that have finished."""
+        with self._lock:
+            return dict(self._timings)
+
+    def wait_all(self, timeout: Optional[float] = None) -> bool:
+        """Waits for every subsystem to finish loading (or fail). Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for future in list(self._futures.values()):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                future.exception(timeout=remaining)
+            except FutureTimeoutError:
+                return False
+        return True
+
+    def report(self) -> str:
+        """A startup timing report: how long each subsystem took and whether it loaded."""
+        with self._lock:
+            lines = ["Startup timing:"]
+            for name, state in self._states.items():
+                took = self._timings.get(name)
+                took = f"{took:6.2f}s" if took is not None else "   ..."
+                error = f" ({self._errors[name]})" if name in self._errors else ""
+                lines.append(f"  {name:<20} {took}  {state}{error}")
+            if self._timings:
+                lines.append(f"  {'all ready after':<20} {self._ready_after:6.2f}s")
+        return "\n".join(lines)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _load(self, name: str, factory: Callable[[], object]):
+        started = time.perf_counter()
+        try:
+            subsystem = factory()
+        except Exception as e:
+            print(f"[ERROR] Failed to load {name}: {e}")
+            self._finish(name, self.FAILED, started, error=e)
+            raise
+        self._finish(name, self.READY, started)
+        return subsystem
+
+    def _finish(self, name: str, state: str, started: float, error: Exception = None):
+        finished = time.perf_counter()
+        with self._lock:
+            self._states[name] = state
+            self._timings[name] = finished - started
+            if error is not None:
+                self._errors[name] = error
+            self._ready_after = finished - self._started_at
+            all_done = len(self._timings) == len(self._states) and not self._reported
+            if all_done:
+                self._reported = True
+        self._notify(name, state)
+        if all_done:
+            print(self.report())
+
+    def _notify(self, name: str, state: str):
+        if self.on_state_change:
+            try:
+                self.on_state_change(name, state)
+            except Exception as e:
+                print(f"[ERROR] Startup state callback failed: {e}")
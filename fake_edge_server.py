@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+A tiny stand-in for the Edge read-aloud websocket service, used by the tests so they can
+run offline. It speaks the same message format as the real service: each SSML request
+gets a turn.start, the mp3 as binary audio messages, and a turn.end.
+
+    with FakeEdgeServer() as server:
+        edge_tts.communicate.WSS_URL = server.url
+        ...
+"""
+
+import asyncio
+import os
+import re
+import threading
+from aiohttp import web, WSMsgType
+
+SAMPLE_MP3 = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "response.mp3")
+
+
+class FakeEdgeServer:
+    """Serves the websocket on a random localhost port from a background thread."""
+
+    def __init__(self, audio_bytes=16384, chunk_size=2048, chunk_delay=0.0):
+        """
+        Args:
+            audio_bytes (int): How much of the sample mp3 to send per request (~6 KB per second of speech).
+            chunk_size (int): Bytes of audio per binary message.
+            chunk_delay (float): Seconds between audio messages.
+        """
+        with open(SAMPLE_MP3, "rb") as f:
+            self.audio = f.read()[:audio_bytes]
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.connections = 0      # websockets accepted
+        self.configs = 0          # speech.config messages received
+        self.texts = []           # the text of every SSML request, in order
+        self._websockets = set()
+        self._loop = asyncio.new_event_loop()
+        self._thread = None
+        self._runner = None
+        self.port = None
+
+    @property
+    def url(self) -> str:
+        """Drop-in for edge_tts.communicate.WSS_URL."""
+        return f"ws://127.0.0.1:{self.port}/consumer/speech/synthesize/readaloud/edge/v1?TrustedClientToken=test"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result(5)
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._stop(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+    def drop_connections(self):
+        """Closes every open websocket from the server side, like the service does with idle ones."""
+        async def close_all():
+            for websocket in list(self._websockets):
+                await websocket.close()
+        asyncio.run_coroutine_threadsafe(close_all(), self._loop).result(5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def _stop(self):
+        for websocket in list(self._websockets):
+            await websocket.close()
+        await self._runner.cleanup()
+
+    async def _handle(self, request):
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        self.connections += 1
+        self._websockets.add(websocket)
+        try:
+            async for message in websocket:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                if "Path:speech.config" in message.data:
+                    self.configs += 1
+                elif "Path:ssml" in message.data:
+                    request_id = re.search(r"X-RequestId:(\w+)", message.data).group(1)
+                    self.texts.append(re.search(r"<prosody[^>]*>(.*)</prosody>", message.data).group(1))
+                    await self._reply(websocket, request_id)
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self._websockets.discard(websocket)
+        return websocket
+
+    async def _reply(self, websocket, request_id):
+        await websocket.send_str(f"X-RequestId:{request_id}\r\nPath:turn.start\r\n\r\n{{}}")
+        headers = f"X-RequestId:{request_id}\r\nContent-Type:audio/mpeg\r\nPath:audio\r\n".encode()
+        for offset in range(0, len(self.audio), self.chunk_size):
+            if websocket.closed:
+                return
+            if self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+            await websocket.send_bytes(len(headers).to_bytes(2, "big") + headers
+                                       + self.audio[offset:offset + self.chunk_size])
+        await websocket.send_str(f"X-RequestId:{request_id}\r\nPath:turn.end\r\n\r\n{{}}")
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+A stand-in for the espeak-ng command line, used by the tests so they can run without
+espeak-ng installed. Like `espeak-ng --stdout`, it reads the text from stdin and writes a
+22050 Hz WAV to stdout in pieces while it "synthesises" (a tone, 60 ms per character).
+If FAKE_ESPEAK_LOG is set, it appends its arguments and the text to that file.
+
+    backend = EspeakBackend(command=f"{sys.executable} fake_espeak.py")
+"""
+
+import json
+import os
+import struct
+import sys
+import time
+import numpy as np
+
+SAMPLE_RATE = 22050
+
+
+def main():
+    text = sys.stdin.buffer.read().decode("utf-8")
+    if os.getenv("FAKE_ESPEAK_LOG"):
+        with open(os.environ["FAKE_ESPEAK_LOG"], "a") as f:
+            f.write(json.dumps({"args": sys.argv[1:], "text": text}) + "\n")
+
+    t = np.arange(int(SAMPLE_RATE * 0.06 * max(1, len(text)))) / SAMPLE_RATE
+    pcm = (np.sin(2 * np.pi * 220 * t) * 8000).astype(np.int16).tobytes()
+    # Writing to a pipe, espeak-ng can't go back to fill in the sizes, so it leaves them at the maximum.
+    header = (b"RIFF" + struct.pack("<I", 0x7FFFFFFF) + b"WAVEfmt "
+              + struct.pack("<IHHIIHH", 16, 1, 1, SAMPLE_RATE, SAMPLE_RATE * 2, 2, 16)
+              + b"data" + struct.pack("<I", 0x7FFFFFFF))
+    out = sys.stdout.buffer
+    out.write(header)
+    for offset in range(0, len(pcm), 8192):
+        out.write(pcm[offset:offset + 8192])
+        out.flush()
+        time.sleep(0.002)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+A local stand-in for the google.generativeai module, used by the tests.
+It records how often clients are configured and created, and lets each model
+answer or fail on demand without touching the network.
+"""
+
+import time
+
+
+class FakeQuotaError(Exception):
+    """Looks like the 429 error the real library raises when a model runs out of quota."""
+
+    def __init__(self, model_name):
+        super().__init__(f"429 Quota exceeded for {model_name}")
+
+
+class _FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class _FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenAI:
+    """Pass an instance as GeminiHandler(genai_module=...)."""
+
+    def __init__(self, reply="Fake Gemini answer.", failing=(), delay=0.0, break_after=None):
+        """
+        Args:
+            reply (str or callable): The answer, or a function (model_name, prompt) -> answer.
+            failing (iterable): Model names that currently fail with a quota error.
+            delay (float): Seconds each generate call takes.
+            break_after (int, optional): Streamed answers fail with a connection error after this many chunks.
+        """
+        self.reply = reply
+        self.failing = set(failing)
+        self.delay = delay
+        self.break_after = break_after
+        self.configure_calls = 0
+        self.models_created = []
+        self.calls = []  # (model_name, prompt, stream)
+        self.histories = []  # chat history each call was made with
+        self.chats_started = 0
+
+    def configure(self, api_key=None):
+        self.configure_calls += 1
+
+    def GenerativeModel(self, model_name, **kwargs):
+        self.models_created.append(model_name)
+        return _FakeModel(self, model_name, kwargs)
+
+    def _answer(self, model_name, prompt, stream, history=()):
+        self.calls.append((model_name, prompt, stream))
+        self.histories.append(list(history))
+        if self.delay:
+            time.sleep(self.delay)
+        if model_name in self.failing:
+            raise FakeQuotaError(model_name)
+        return self.reply(model_name, prompt) if callable(self.reply) else self.reply
+
+
+class _FakeModel:
+    def __init__(self, fake, model_name, options):
+        self._fake = fake
+        self.model_name = model_name
+        self.options = options
+
+    def generate_content(self, prompt, stream=False):
+        return _respond(self._fake._answer(self.model_name, prompt, stream), stream, self._fake.break_after)
+
+    def start_chat(self, history=None):
+        self._fake.chats_started += 1
+        return _FakeChat(self, list(history or []))
+
+
+class _FakeChat:
+    def __init__(self, model, history):
+        self._model = model
+        self.history = history
+
+    def send_message(self, content, stream=False):
+        # Like the real ChatSession, the session's history grows by the exchange once it succeeds.
+        answer = self._model._fake._answer(self._model.model_name, content, stream, self.history)
+        self.history += [{"role": "user", "parts": [content]}, {"role": "model", "parts": [answer]}]
+        return _respond(answer, stream, self._model._fake.break_after)
+
+
+def _respond(answer, stream, break_after=None):
+    if not stream:
+        return _FakeResponse(answer)
+    chunks = [_FakeChunk(word + " ") for word in answer.split()]
+    if break_after is None:
+        return iter(chunks)
+
+    def broken():
+        yield from chunks[:break_after]
+        raise ConnectionError("Connection reset by peer")
+    return broken()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+A stand-in for the sounddevice input stream, used by the tests.
+It plays a prepared int16 signal into an AudioBus block by block from a background
+thread (faster than real time by default), and counts how often it was opened.
+"""
+
+import threading
+import time
+import numpy as np
+
+
+def tone(seconds, amplitude=0.3, rate=16000, frequency=220):
+    """Int16 sine wave that the energy VAD treats as speech."""
+    t = np.arange(int(seconds * rate)) / rate
+    return (np.sin(2 * np.pi * frequency * t) * amplitude * 32767).astype(np.int16)
+
+
+def silence(seconds, rate=16000):
+    """Very quiet int16 noise."""
+    return (np.random.default_rng(0).standard_normal(int(seconds * rate)) * 30).astype(np.int16)
+
+
+class FakeMicrophone:
+    """Pass FakeMicrophone(signal).factory as AudioBus(stream_factory=...)."""
+
+    def __init__(self, signal=None, speed=10.0, loop=False, fail_with=None):
+        """
+        Args:
+            signal (np.ndarray): Int16 samples to play; silence is played once they run out.
+            speed (float): How many times faster than real time blocks are delivered.
+            loop (bool): Start the signal over when it ends.
+            fail_with (Exception, optional): Raised by start(), like a busy or missing device.
+        """
+        self.signal = signal if signal is not None else np.zeros(0, dtype=np.int16)
+        self.speed = speed
+        self.loop = loop
+        self.fail_with = fail_with
+        self.unplugged = False   # set to stop delivering audio (and fail to open), like a removed device
+        self.opened = 0
+        self.closed = 0
+        self.played = 0
+
+    def factory(self, bus):
+        return _FakeStream(self, bus)
+
+
+class _FakeStream:
+    def __init__(self, microphone, bus):
+        self.microphone = microphone
+        self.bus = bus
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.microphone.fail_with:
+            raise self.microphone.fail_with
+        if self.microphone.unplugged:
+            raise OSError("Error opening InputStream: Device unavailable")
+        self.microphone.opened += 1
+        self._thread = threading.Thread(target=self._play, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def close(self):
+        self.microphone.closed += 1
+
+    def _play(self):
+        microphone = self.microphone
+        block = self.bus.blocksize
+        interval = block / self.bus.samplerate / microphone.speed
+        quiet = np.zeros(block, dtype=np.int16)
+        while not self._stop.is_set():
+            if microphone.unplugged:
+                time.sleep(interval)
+                continue
+            signal = microphone.signal
+            start = microphone.played % len(signal) if microphone.loop and len(signal) else microphone.played
+            chunk = signal[start:start + block]
+            if len(chunk) < block:
+                chunk = np.concatenate([chunk, quiet[:block - len(chunk)]])
+            microphone.played += block
+            self.bus.push(chunk)
+            time.sleep(interval)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+A tiny stand-in for the Ollama REST API, used by the tests so they can run
+offline and without a model installed.
+
+    with FakeOllamaServer(reply="Four.") as server:
+        handler = OllamaHandler(base_url=server.url)
+        handler.ask("What's two plus two?")
+"""
+
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOllamaServer:
+    """Serves /api/chat and /api/generate (streaming or not) on a random localhost port in a background thread."""
+
+    def __init__(self, reply="Hello from the fake Ollama.", models=("mistral",), delay=0.0, token_delay=0.0,
+                 drop_after=None):
+        # 'reply' is either a fixed string or a function that receives the request payload.
+        self.reply = reply
+        self.models = set(models)
+        self.delay = delay
+        self.token_delay = token_delay    # pause between streamed tokens
+        self.drop_after = drop_after      # close the connection after this many streamed tokens
+        self.requests = []        # (path, payload) for every request received
+        self.connections = 0      # number of TCP connections accepted
+        self._sockets = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        # Also drop open keep-alive connections, like a real server going away would.
+        for sock in self._sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _reply_for(self, payload: dict) -> str:
+        return self.reply(payload) if callable(self.reply) else self.reply
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 keeps the connection open between requests, like the real server.
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with fake._lock:
+                    fake.connections += 1
+                    fake._sockets.append(self.connection)
+
+            def handle(self):
+                try:
+                    super().handle()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up on us, e.g. in a timeout test
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with fake._lock:
+                    fake.requests.append((self.path, payload))
+
+                if fake.delay:
+                    time.sleep(fake.delay)
+
+                if self.path not in ("/api/chat", "/api/generate"):
+                    return self._send_json(404, {"error": "404 page not found"})
+                if payload.get("model") not in fake.models:
+                    return self._send_json(404, {"error": f"model '{payload.get('model')}' not found, try pulling it first"})
+
+                text = fake._reply_for(payload)
+                if payload.get("stream", True):
+                    return self._send_stream(payload, text)
+                if self.path == "/api/chat":
+                    body = {"model": payload["model"], "message": {"role": "assistant", "content": text}, "done": True}
+                else:
+                    body = {"model": payload["model"], "response": text, "done": True}
+                self._send_json(200, body)
+
+            def _send_stream(self, payload, text):
+                # Stream one NDJSON line per word using chunked transfer encoding, like Ollama does.
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                words = text.split(" ")
+                for i, word in enumerate(words):
+                    if fake.drop_after is not None and i >= fake.drop_after:
+                        # The server went away mid-answer: no final chunk, the connection just ends.
+                        self.close_connection = True
+                        self.connection.shutdown(socket.SHUT_RDWR)
+                        return
+                    token = word if i == 0 else " " + word
+                    if self.path == "/api/chat":
+                        chunk = {"message": {"role": "assistant", "content": token}, "done": False}
+                    else:
+                        chunk = {"response": token, "done": False}
+                    self._write_chunk(json.dumps(chunk).encode("utf-8") + b"\n")
+                    if fake.token_delay:
+                        time.sleep(fake.token_delay)
+                self._write_chunk(json.dumps({"model": payload["model"], "done": True}).encode("utf-8") + b"\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, data):
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send_json(self, status, body):
+                raw = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+        return Handler
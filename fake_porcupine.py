@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+A stand-in for a pvporcupine.Porcupine instance, used by the tests.
+It "hears" the wake word at chosen sample positions of the audio it is fed. Like the
+real library it exposes both process() and the C-level _process_func it wraps.
+"""
+
+import time
+from enum import Enum
+
+
+class FakePorcupine:
+    sample_rate = 16000
+    frame_length = 512
+
+    class PicovoiceStatuses(Enum):
+        SUCCESS = 0
+        INVALID_ARGUMENT = 3
+
+    def __init__(self, wake_word_ends=(), frame_delay=0.0):
+        """
+        Args:
+            wake_word_ends (iterable): Sample positions (counted over all audio processed) at which
+                                       a wake word ends; the frame containing one returns 0.
+            frame_delay (float): Seconds each frame takes to process, to simulate a slow CPU.
+        """
+        self.wake_word_ends = sorted(wake_word_ends)
+        self.frame_delay = frame_delay
+        self.processed = 0
+        self.buffers_seen = set()   # ids of the buffers passed to _process_func
+        self._handle = object()
+
+    def process(self, pcm):
+        if len(pcm) != self.frame_length:
+            raise ValueError("Invalid frame length")
+        return self._detect()
+
+    def _process_func(self, handle, pcm, result):
+        self.buffers_seen.add(id(pcm))
+        result._obj.value = self._detect()
+        return self.PicovoiceStatuses.SUCCESS
+
+    def delete(self):
+        pass
+
+    def _detect(self):
+        if self.frame_delay:
+            time.sleep(self.frame_delay)
+        before = self.processed
+        self.processed += self.frame_length
+        return 0 if any(before < end <= self.processed for end in self.wake_word_ends) else -1
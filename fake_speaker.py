@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+A stand-in for the sounddevice output stream, used by the tests.
+It pulls blocks from an AudioOutput on a background thread (faster than real time by
+default), the way the audio callback would, and keeps everything it was given to play.
+"""
+
+import threading
+import time
+import numpy as np
+
+
+class FakeSpeaker:
+    """Pass FakeSpeaker().factory as AudioOutput(stream_factory=...)."""
+
+    def __init__(self, speed=10.0):
+        """
+        Args:
+            speed (float): How many times faster than real time blocks are pulled.
+        """
+        self.speed = speed
+        self.blocks = []          # every block pulled, silence included
+        self.opened = 0
+        self.closed = 0
+        self.first_sound_at = None   # time.perf_counter() of the first non-silent block
+        self.dead = False         # set to make open streams stop pulling blocks, like a terminated PortAudio
+        self._streams = []
+
+    def factory(self, output):
+        stream = _FakeStream(self, output)
+        self._streams.append(stream)
+        return stream
+
+    def running(self) -> int:
+        """How many streams are still pulling blocks (each one a thread)."""
+        return sum(1 for stream in self._streams if stream._thread and stream._thread.is_alive())
+
+    def stop(self):
+        """Stops every stream that is still running; for test teardown."""
+        for stream in self._streams:
+            stream.stop()
+
+    def audio(self) -> np.ndarray:
+        """Everything played so far, with the silence between playbacks removed."""
+        blocks = [block for block in self.blocks if block.any()]
+        return np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.int16)
+
+
+class _FakeStream:
+    def __init__(self, speaker, output):
+        self.speaker = speaker
+        self.output = output
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def active(self):
+        return not self.speaker.dead
+
+    def start(self):
+        self.speaker.opened += 1
+        self._thread = threading.Thread(target=self._play, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def close(self):
+        self.speaker.closed += 1
+
+    def _play(self):
+        speaker = self.speaker
+        interval = self.output.blocksize / self.output.samplerate / speaker.speed
+        while not self._stop.is_set():
+            if speaker.dead:
+                time.sleep(interval)
+                continue
+            block = np.empty(self.output.blocksize, dtype=np.int16)
+            self.output.fill(block)
+            if speaker.first_sound_at is None and block.any():
+                speaker.first_sound_at = time.perf_counter()
+            speaker.blocks.append(block)
+            time.sleep(interval)
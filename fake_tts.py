@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+A stand-in for the speaker's TTS connection (voice/edge_connection.py), used by the tests.
+stream() yields the sample mp3 in assets/ in small pieces with a delay between them, the
+way the Edge service sends audio while it is still synthesising, and records how far it got.
+"""
+
+import asyncio
+import os
+import time
+
+SAMPLE_MP3 = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "response.mp3")
+
+
+class FakeEdgeTTS:
+    """Pass as TTSSpeaker(synthesizer=FakeEdgeTTS())."""
+
+    name = "edge"
+    local = False
+
+    def __init__(self, chunk_size=2048, chunk_delay=0.01, seconds=None):
+        """
+        Args:
+            chunk_size (int): Bytes per audio message.
+            chunk_delay (float): Seconds between messages.
+            seconds (float, optional): Only send about this much audio (the sample mp3 is ~23 s).
+        """
+        with open(SAMPLE_MP3, "rb") as f:
+            self.mp3 = f.read()
+        if seconds is not None:
+            self.mp3 = self.mp3[:int(len(self.mp3) * seconds / 23.4)]
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.texts = []           # every text synthesised, in order
+        self.chunks_sent = 0
+        self.finished_at = None   # time.perf_counter() when the last stream ended
+        self.closed_early = 0     # streams that were abandoned before the end
+
+    def stream(self, text, voice="en-US-AriaNeural", rate="+0%", volume="+0%"):
+        self.texts.append(text)
+        return self._stream(text)
+
+    async def _stream(self, text):
+        complete = False
+        try:
+            for offset in range(0, len(self.mp3), self.chunk_size):
+                await asyncio.sleep(self.chunk_delay)
+                self.chunks_sent += 1
+                yield {"type": "audio", "data": self.mp3[offset:offset + self.chunk_size]}
+            yield {"type": "WordBoundary", "offset": 0, "duration": 0, "text": text}
+            complete = True
+        finally:
+            self.finished_at = time.perf_counter()
+            if not complete:
+                self.closed_early += 1
@@ -56,14 +56,23 @@ class DisplayOrb(ctk.CTkCanvas):
         self.after(40, self.animate)
 
 class MicVisualizer(ctk.CTkCanvas):
-    def __init__(self, master, **kwargs):
+    def __init__(self, master, level_source=None, **kwargs):
         super().__init__(master, width=120, height=30, bg=BG, highlightthickness=0, **kwargs)
+        # level_source() returns the current microphone loudness (0..1). Without one the bars just idle.
+        self.level_source = level_source
+        self.levels = [0.0] * 20
         self.animate()
 
     def animate(self):
         self.delete("all")
+        if self.level_source:
+            # Scrolling history of the real mic level; speech is roughly 0.02-0.2 RMS.
+            self.levels = self.levels[1:] + [min(1.0, (self.level_source() or 0.0) * 8)]
         for i in range(20):
-            h = 10 + 10 * random.random() * (0.5 + 0.5 * math.sin(time.time()*2 + i))
+            if self.level_source:
+                h = 2 + 18 * self.levels[i]
+            else:
+                h = 10 + 10 * random.random() * (0.5 + 0.5 * math.sin(time.time()*2 + i))
             x = 5 + i*5
             self.create_rectangle(x, 25-h, x+3, 25, fill=CYAN, outline="")
         self.after(60, self.animate)
@@ -131,7 +140,7 @@ class RyoApp(ctk.CTk):
         ctk.CTkLabel(self.main_frame, text="AI CORE", font=FONT_FUTURE, text_color=CYAN, fg_color=BG).pack(pady=(0, 10))
 
         # Mic Visualizer
-        self.mic_viz = MicVisualizer(self.main_frame)
+        self.mic_viz = MicVisualizer(self.main_frame, level_source=self._mic_level)
         self.mic_viz.pack(pady=(0, 10))
         ctk.CTkLabel(self.main_frame, text="Listening Status", font=FONT_LABEL, text_color=TEAL).pack(pady=(0, 10))
 
@@ -183,6 +192,27 @@ class RyoApp(ctk.CTk):
         )
         self.status_label.pack(side="left", padx=10)
 
+        # Shows whether the local model is loaded, so a cold start reads "warming up" instead of looking frozen.
+        self.model_state_var = ctk.StringVar(value="")
+        self.model_state_label = ctk.CTkLabel(
+            self.control_frame,
+            textvariable=self.model_state_var,
+            font=ctk.CTkFont(family=THEME["FONT_NAME"], size=11),
+            text_color=THEME["TEXT_COLOR_MUTED"]
+        )
+        self.model_state_label.pack(side="left", padx=(0, 10))
+
+        # Startup progress: which subsystems are still loading in the background (or failed to).
+        self.subsystem_states = {}
+        self.subsystem_var = ctk.StringVar(value="")
+        self.subsystem_label = ctk.CTkLabel(
+            self.control_frame,
+            textvariable=self.subsystem_var,
+            font=ctk.CTkFont(family=THEME["FONT_NAME"], size=11),
+            text_color=THEME["TEXT_COLOR_MUTED"]
+        )
+        self.subsystem_label.pack(side="left", padx=(0, 10))
+
         # --- Model Switcher Dropdown ---
         self.model_switcher = ctk.CTkOptionMenu(
             self.control_frame,
@@ -218,6 +248,11 @@ class RyoApp(ctk.CTk):
         )
         self.keybind_label.pack(side="bottom", pady=(5, 0))
 
+    def _mic_level(self):
+        """Loudness of the shared microphone stream, for the mic visualizer."""
+        audio_bus = getattr(self.assistant_core, "audio_bus", None)
+        return audio_bus.level if audio_bus else 0.0
+
     def toggle_mute(self):
         """Delegates the mute action to the assistant core and updates the button text."""
         is_muted = self.assistant_core.toggle_mute()
@@ -242,6 +277,23 @@ class RyoApp(ctk.CTk):
 
         self.status_var.set(f"Status: {status}")
 
+    def update_model_state(self, state: str):
+        """Updates the label that shows the local model's residency state."""
+        self.model_state_var.set(f"Model: {state}")
+
+    def update_subsystem_state(self, name: str, state: str):
+        """Updates the startup label; it goes blank once every subsystem has loaded."""
+        self.subsystem_states[name] = state
+        loading = [n for n, s in self.subsystem_states.items() if s == "loading"]
+        # "failed" for subsystems; the microphone reports "lost", "busy" or "no device" until it is back.
+        failed = [n for n, s in self.subsystem_states.items() if s not in ("loading", "ready", "ok")]
+        parts = []
+        if loading:
+            parts.append(f"Loading {', '.join(loading)}...")
+        if failed:
+            parts.append(f"Unavailable: {', '.join(failed)}")
+        self.subsystem_var.set("  ".join(parts))
+
     def _create_assistant_tab(self):
         """Creates and configures the widgets for the 'Assistant' tab."""
         assistant_tab = self.tab_view.tab("Assistant")
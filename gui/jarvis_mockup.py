@@ -92,14 +92,23 @@ class DisplayOrb(ctk.CTkCanvas):
         self.after(40, self.animate)
 
 class MicVisualizer(ctk.CTkCanvas):
-    def __init__(self, master, **kwargs):
+    def __init__(self, master, level_source=None, **kwargs):
         super().__init__(master, width=140, height=32, bg=BG, highlightthickness=0, **kwargs)
+        # level_source() returns the current microphone loudness (0..1). Without one the bars just idle.
+        self.level_source = level_source
+        self.levels = [0.0] * 24
         self.animate()
 
     def animate(self):
         self.delete("all")
+        if self.level_source:
+            # Scrolling history of the real mic level; speech is roughly 0.02-0.2 RMS.
+            self.levels = self.levels[1:] + [min(1.0, (self.level_source() or 0.0) * 8)]
         for i in range(24):
-            h = 10 + 12 * random.random() * (0.5 + 0.5 * math.sin(time.time()*2 + i))
+            if self.level_source:
+                h = 2 + 20 * self.levels[i]
+            else:
+                h = 10 + 12 * random.random() * (0.5 + 0.5 * math.sin(time.time()*2 + i))
             x = 6 + i*5
             self.create_rectangle(x, 28-h, x+3, 28, fill=CYAN, outline="")
         self.after(60, self.animate)
@@ -131,6 +140,17 @@ class JarvisUI(ctk.CTk, DraggablePanel):
             text_color=BG
         )
         self.model_switcher.place(x=160, y=20)
+        # Local model residency ("warming up", "ready", ...), fed by the controller
+        self.model_state_var = ctk.StringVar(value="")
+        self.model_state_label = ctk.CTkLabel(self, textvariable=self.model_state_var, font=("Orbitron", 12), text_color=MUTED, fg_color=BG)
+        self.model_state_label.place(x=290, y=24)
+        self.controller.set_model_state_callback(self._on_model_state)
+        # Subsystems still loading in the background at startup, fed by the controller
+        self.subsystem_states = {}
+        self.subsystem_var = ctk.StringVar(value="")
+        self.subsystem_label = ctk.CTkLabel(self, textvariable=self.subsystem_var, font=("Orbitron", 11), text_color=MUTED, fg_color=BG)
+        self.subsystem_label.place(x=290, y=44)
+        self.controller.set_subsystem_state_callback(self._on_subsystem_state)
         
         # --- Transparency Options ---
         # Option 1: Semi-transparent background (0.0 = fully transparent, 1.0 = fully opaque)
@@ -223,7 +243,7 @@ class JarvisUI(ctk.CTk, DraggablePanel):
         ctk.CTkLabel(self, text="Hello, Hieu", font=("Orbitron", 32, "bold"), text_color=CYAN, fg_color=BG).place(x=center_x, y=400, anchor="center")
 
         # Mic Visualizer
-        self.mic_viz = MicVisualizer(self)
+        self.mic_viz = MicVisualizer(self, level_source=self.controller.get_mic_level)
         self.mic_viz.place(x=center_x-60, y=260)  # visualizer is 120px wide
         ctk.CTkLabel(self, text="Listening Status", font=FONT_LABEL, text_color=TEAL, fg_color=BG).place(x=center_x, y=300, anchor="center")
 
@@ -443,6 +463,18 @@ class JarvisUI(ctk.CTk, DraggablePanel):
         # Called from backend thread, so use after for thread safety
         self.after(0, lambda: self.status_var.set(f"Status: {status}"))
 
+    def _on_model_state(self, state):
+        # Called from the residency thread, so use after for thread safety
+        self.after(0, lambda: self.model_state_var.set(f"MODEL: {state.upper()}"))
+
+    def _on_subsystem_state(self, name, state):
+        # Called from the startup threads, so use after for thread safety
+        def update():
+            self.subsystem_states[name] = state
+            pending = [f"{n.upper()}: {s.upper()}" for n, s in self.subsystem_states.items() if s not in ("ready", "ok")]
+            self.subsystem_var.set("  ".join(pending))
+        self.after(0, update)
+
     def toggle_mute(self):
         print(f"[DEBUG] GUI toggle_mute called")
         muted = self.controller.toggle_mute()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that TTS runs on one long-lived event loop thread, and that one
+websocket to the (locally faked) Edge service is reused across utterances.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from edge_tts import communicate as edge_communicate
+from voice.async_worker import AsyncWorker
+from voice.audio_output import AudioOutput
+from voice.edge_connection import EdgeConnection
+from voice.tts_cache import TTSCache
+from voice.tts_speaker import TTSSpeaker
+from fake_edge_server import FakeEdgeServer
+from fake_speaker import FakeSpeaker
+
+
+def test_worker_runs_everything_on_one_loop():
+    worker = AsyncWorker("test worker")
+
+    async def where(n):
+        await asyncio.sleep(0.01)
+        return n, threading.current_thread().name, id(asyncio.get_running_loop())
+
+    async def fail():
+        raise ValueError("boom")
+
+    try:
+        futures = []
+        submitters = [threading.Thread(target=lambda i=i: futures.append(worker.submit(where(i)))) for i in range(8)]
+        for thread in submitters:
+            thread.start()
+        for thread in submitters:
+            thread.join()
+        results = [future.result(timeout=2) for future in futures]
+        assert sorted(n for n, _, _ in results) == list(range(8))
+        assert {name for _, name, _ in results} == {"test worker"}
+        assert len({loop for _, _, loop in results}) == 1
+
+        try:
+            worker.run(fail(), timeout=2)
+            assert False, "the exception should reach the caller"
+        except ValueError:
+            pass
+        assert worker.is_running()
+    finally:
+        worker.stop()
+    assert not worker.is_running()
+
+
+def _say(worker, connection, text):
+    async def collect():
+        audio = b""
+        async for chunk in connection.stream(text, "en-US-AriaNeural"):
+            audio += chunk["data"]
+        return audio
+    return worker.run(collect(), timeout=5)
+
+
+def test_connection_is_reused_across_utterances():
+    worker = AsyncWorker()
+    real_url = edge_communicate.WSS_URL
+    with FakeEdgeServer() as server:
+        edge_communicate.WSS_URL = server.url
+        connection = EdgeConnection()
+        try:
+            for text in ["Added task: buy milk", "Session ended.", "Your to-do list is empty."]:
+                assert _say(worker, connection, text) == server.audio
+            assert server.texts == ["Added task: buy milk", "Session ended.", "Your to-do list is empty."]
+            print(f"3 utterances over {server.connections} connection(s)")
+            assert server.connections == 1 and server.configs == 1
+        finally:
+            edge_communicate.WSS_URL = real_url
+            worker.run(connection.close())
+            worker.stop()
+
+
+def test_reconnects_when_dropped_or_interrupted():
+    worker = AsyncWorker()
+    real_url = edge_communicate.WSS_URL
+    with FakeEdgeServer(chunk_delay=0.01) as server:
+        edge_communicate.WSS_URL = server.url
+        connection = EdgeConnection()
+        try:
+            assert _say(worker, connection, "one") == server.audio
+
+            # The service closes idle connections; the next utterance just opens a new one.
+            server.drop_connections()
+            time.sleep(0.05)
+            assert _say(worker, connection, "two") == server.audio
+            assert server.connections == 2
+
+            # Stopped mid-utterance: the rest of that audio must not leak into the next one.
+            async def interrupted():
+                stream = connection.stream("three", "en-US-AriaNeural")
+                async for _ in stream:
+                    break
+                await stream.aclose()
+            worker.run(interrupted(), timeout=5)
+            assert _say(worker, connection, "four") == server.audio
+            assert server.connections == 3
+
+            # Idle too long by our own limit: reconnect rather than risk a dead connection.
+            connection.idle_timeout = 0
+            assert _say(worker, connection, "five") == server.audio
+            assert server.connections == 4
+        finally:
+            edge_communicate.WSS_URL = real_url
+            worker.run(connection.close())
+            worker.stop()
+
+
+def test_speaker_keeps_its_loop_and_connection():
+    real_url = edge_communicate.WSS_URL
+    with FakeEdgeServer() as server:
+        edge_communicate.WSS_URL = server.url
+        fake = FakeSpeaker(speed=50)
+        speaker = TTSSpeaker(output=AudioOutput(stream_factory=fake.factory), cache=TTSCache(tempfile.mkdtemp()))
+        try:
+            assert isinstance(speaker.synthesizer.select("First answer."), EdgeConnection)
+            loops = set()
+            for text in ["First answer.", "Second answer.", "Third answer."]:
+                finished = threading.Event()
+                utterance = speaker.speak(text, on_finish=finished.set)
+                assert utterance.wait(timeout=10) and utterance.state == "done"
+                assert finished.wait(timeout=2)
+                loops.add(id(speaker.worker.loop))
+            assert len(loops) == 1
+            assert server.connections == 1 and len(server.texts) == 3
+            assert len(fake.audio()) > 0
+        finally:
+            edge_communicate.WSS_URL = real_url
+            speaker.close()
+    assert not speaker.worker.is_running()
+
+
+if __name__ == "__main__":
+    test_worker_runs_everything_on_one_loop()
+    test_connection_is_reused_across_utterances()
+    test_reconnects_when_dropped_or_interrupted()
+    test_speaker_keeps_its_loop_and_connection()
+    print("\n✅ Async worker tests completed successfully!")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the shared microphone bus: one capture stream, fanned out to
+several consumers that each read every sample in order at their own pace.
+"""
+
+import os
+import sys
+import time
+import threading
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from voice.audio_bus import AudioBus, RingBuffer
+from voice.stt_backends import STTBackend
+from voice.whisper_listener import WhisperListener
+from fake_microphone import FakeMicrophone, tone, silence
+
+
+class _RecordingBackend(STTBackend):
+    name = "fake"
+
+    def __init__(self):
+        self.heard = []
+
+    def transcribe_segments(self, audio, prompt=None):
+        self.heard.append(len(audio))
+        return [(0.0, len(audio) / 16000, "what time is it")]
+
+
+def test_ring_buffer_wraps_and_keeps_order():
+    ring = RingBuffer(capacity=10)
+    out = np.empty(4, dtype=np.int16)
+    ring.write(np.arange(0, 7, dtype=np.int16))
+    ring.write(np.arange(7, 13, dtype=np.int16))   # wraps around
+    assert ring.written == 13 and ring.oldest() == 3
+    assert ring.copy(8, out) and list(out) == [8, 9, 10, 11]
+    assert not ring.copy(1, out), "samples 1-2 have been overwritten"
+
+
+class _ReadDuringStore:
+    """Stands in for a ring's storage: runs reader() once, right after the writer's first store."""
+
+    def __init__(self, data, reader):
+        self.data = data
+        self.reader = reader
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+        reader, self.reader = self.reader, lambda: None
+        reader()
+
+
+def test_ring_buffer_copy_detects_a_write_in_progress():
+    ring = RingBuffer(capacity=10)
+    ring.write(np.arange(0, 10, dtype=np.int16))
+    out = np.empty(4, dtype=np.int16)
+    results = []
+    ring._data = _ReadDuringStore(ring._data, lambda: results.append((ring.copy(0, out), list(out))))
+    ring.write(np.array([10, 11], dtype=np.int16))   # overwrites samples 0-1
+    print(f"Copy during the store: {results}")
+    assert results[0][0] is False, "samples 0-1 were being overwritten"
+    assert ring.copy(2, out) and list(out) == [2, 3, 4, 5]
+
+
+def test_consumers_share_one_stream():
+    bus = AudioBus(blocksize=160, buffer_seconds=1)
+    fast = bus.subscribe("wake word")
+    slow = bus.subscribe("level meter")
+    for block in range(5):
+        bus.push(np.arange(block * 160, (block + 1) * 160, dtype=np.int16))
+
+    # Each consumer gets every sample, in its own frame size.
+    first = fast.read(512, timeout=1).copy()
+    assert list(first[:3]) == [0, 1, 2] and first[-1] == 511
+    assert list(slow.read(480, timeout=1)[-2:]) == [478, 479]
+    assert fast.position == 512 and slow.position == 480
+    assert sorted(bus.consumers()) == ["level meter", "wake word"]
+    assert bus.level > 0
+
+
+def test_slow_consumer_drops_oldest_audio_without_blocking_capture():
+    bus = AudioBus(blocksize=1600, buffer_seconds=0.5)   # 8000-sample ring
+    lagging = bus.subscribe("listener")
+    started = time.perf_counter()
+    for _ in range(10):                                  # 16000 samples, twice the ring
+        bus.push(np.ones(1600, dtype=np.int16))
+    assert time.perf_counter() - started < 0.1, "capture waited for a reader"
+    assert lagging.read(100, timeout=1) is not None
+    print(f"Lagging consumer dropped {lagging.dropped} samples")
+    assert lagging.dropped == 8000
+
+
+def test_closing_wakes_waiting_consumer():
+    bus = AudioBus()
+    subscription = bus.subscribe("wake word")
+    result = []
+    reader = threading.Thread(target=lambda: result.append(subscription.read(512, timeout=5)))
+    reader.start()
+    time.sleep(0.1)
+    started = time.perf_counter()
+    subscription.close()
+    reader.join(timeout=1)
+    assert result == [None]
+    assert time.perf_counter() - started < 0.5
+    assert bus.consumers() == []
+
+
+def test_listener_records_from_the_shared_stream_without_reopening():
+    signal = np.concatenate([silence(0.5), tone(1.0), silence(1.5)] * 2)
+    microphone = FakeMicrophone(signal, speed=10)
+    bus = AudioBus(stream_factory=microphone.factory)
+    backend = _RecordingBackend()
+    listener = WhisperListener(backend=backend, streaming=False, audio_bus=bus)
+    bus.start()
+    try:
+        for turn in range(2):
+            done = threading.Event()
+            listener.start_listening(on_utterance_end=done.set)
+            assert done.wait(timeout=5), "utterance never ended"
+            texts = []
+            listener.stop_and_transcribe(on_finish=texts.append)
+            assert texts == ["what time is it"]
+            assert listener.end_reason == "silence"
+        # Two listening turns, one microphone open.
+        assert microphone.opened == 1
+        assert len(backend.heard) == 2
+    finally:
+        bus.stop()
+    assert microphone.closed == 1
+
+
+if __name__ == "__main__":
+    test_ring_buffer_wraps_and_keeps_order()
+    test_ring_buffer_copy_detects_a_write_in_progress()
+    test_consumers_share_one_stream()
+    test_slow_consumer_drops_oldest_audio_without_blocking_capture()
+    test_closing_wakes_waiting_consumer()
+    test_listener_records_from_the_shared_stream_without_reopening()
+    print("\n✅ Audio bus tests completed successfully!")
@@ -12,6 +12,7 @@ import time
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(project_root)
 
+from voice.audio_device_manager import AudioDeviceManager
 from voice.wake_word_detector import WakeWordDetector
 
 def test_audio_device_busy_detection():
@@ -24,6 +25,7 @@ def test_audio_device_busy_detection():
     
     # Initialize the detector
     detector = WakeWordDetector(on_wake_word=dummy_callback)
+    device_manager = AudioDeviceManager(detector.audio_bus)
     
     try:
         print("1. Testing normal start...")
@@ -38,7 +40,8 @@ def test_audio_device_busy_detection():
             time.sleep(1)
             
             print("4. Testing retry mechanism...")
-            detector.start_with_retry(max_retries=3, retry_delay=2)
+            device_manager.start()
+            detector.start_with_retry(device_manager, max_retries=3, retry_delay=2)
             time.sleep(3)
             
             print(f"5. Wake word detector running after retry: {detector.is_running()}")
@@ -57,6 +60,7 @@ def test_audio_device_busy_detection():
         traceback.print_exc()
     finally:
         print("6. Cleaning up...")
+        device_manager.stop()
         detector.stop()
         print("Test completed.")
 
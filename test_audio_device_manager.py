@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that a lost microphone is noticed, reopened as soon as a device is
+usable again, and that wake word detection resumes on its own.
+"""
+
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from voice.audio_bus import AudioBus
+from voice.audio_output import AudioOutput
+from voice.audio_device_manager import AudioDeviceManager
+from voice.wake_word_detector import WakeWordDetector
+from fake_microphone import FakeMicrophone, silence, tone
+from fake_speaker import FakeSpeaker
+from fake_porcupine import FakePorcupine
+
+USB_MIC = (0, "USB Microphone")
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_unplugged_microphone_is_reattached():
+    microphone = FakeMicrophone(silence(1.0), speed=10, loop=True)
+    bus = AudioBus(stream_factory=microphone.factory)
+    devices = [USB_MIC]
+    states, changes = [], []
+    manager = AudioDeviceManager(bus, poll_interval=0.05, stall_timeout=0.2, rescan_interval=0.1,
+                                 list_devices=lambda refresh: list(devices), on_health_change=states.append)
+    manager.on_device_change(lambda added, removed: changes.append((added, removed)))
+    detector = WakeWordDetector(on_wake_word=lambda: None, audio_bus=bus)
+    detector.porcupine = FakePorcupine()
+    manager.on_restored(lambda: detector.state == "suspended" and detector.resume())
+    try:
+        detector.start()
+        manager.start()
+        assert _wait_for(lambda: detector.frames_processed > 0)
+
+        # Unplug: the stream goes quiet and the device disappears from the list.
+        microphone.unplugged = True
+        devices.clear()
+        assert _wait_for(lambda: manager.state == "no device")
+        assert detector.state == "suspended"
+        assert states[-2:] == ["lost", "no device"]
+        assert changes == [([], [USB_MIC])]
+
+        # Plug it back in.
+        plugged_at = time.monotonic()
+        microphone.unplugged = False
+        devices.append(USB_MIC)
+        assert _wait_for(lambda: manager.state == "ok")
+        assert _wait_for(lambda: detector.state == "listening")
+        print(f"Microphone back and wake word listening after {time.monotonic() - plugged_at:.2f}s")
+        assert time.monotonic() - plugged_at < 1.0
+        processed = detector.frames_processed
+        assert _wait_for(lambda: detector.frames_processed > processed)
+
+        health = manager.get_health()
+        assert health["state"] == "ok" and health["devices"] == ["USB Microphone"]
+        assert health["recoveries"] == 1
+        assert changes[-1] == ([USB_MIC], [])
+    finally:
+        manager.stop()
+        detector.stop()
+        bus.stop()
+
+
+def test_busy_device_is_retried_until_it_opens():
+    microphone = FakeMicrophone(silence(1.0), speed=10, loop=True,
+                                fail_with=OSError("Error starting stream: Device busy"))
+    bus = AudioBus(stream_factory=microphone.factory)
+    manager = AudioDeviceManager(bus, poll_interval=0.05, list_devices=lambda refresh: [USB_MIC])
+    try:
+        manager.start()
+        assert _wait_for(lambda: manager.state == "busy")
+        assert "busy" in manager.get_health()["last_error"]
+        microphone.fail_with = None   # the call ended
+        assert _wait_for(lambda: manager.state == "ok", timeout=1.0)
+        assert bus.is_running()
+    finally:
+        manager.stop()
+        bus.stop()
+
+
+def test_rescans_only_with_every_stream_closed():
+    microphone = FakeMicrophone(silence(1.0), speed=10, loop=True)
+    microphone.unplugged = True
+    bus = AudioBus(stream_factory=microphone.factory)
+    fake = FakeSpeaker(speed=1)
+    output = AudioOutput(samplerate=16000, stream_factory=fake.factory)
+    rescans = []
+
+    def list_devices(refresh):
+        if refresh:
+            # PortAudio is re-initialised here: nothing may be open.
+            assert not bus.is_running() and not output.is_running()
+            rescans.append(time.monotonic())
+        return []
+
+    manager = AudioDeviceManager(bus, poll_interval=0.02, rescan_interval=0.2,
+                                 list_devices=list_devices, outputs=[output])
+    try:
+        playback = output.play(tone(0.5, rate=16000))
+        manager.start()
+        time.sleep(0.3)
+        assert rescans == []   # speech is playing; it isn't cut off for a rescan
+        assert playback.wait(timeout=2) and not playback.cancelled
+
+        # Idle: the speaker is closed for the rescan, and reopens when next used.
+        assert _wait_for(lambda: len(rescans) >= 3)
+        assert not output.is_running()
+        gaps = [b - a for a, b in zip(rescans, rescans[1:])]
+        print(f"Rescans {min(gaps):.2f}s apart at the closest")
+        assert min(gaps) >= 0.2
+        assert output.play(tone(0.1, rate=16000)).wait(timeout=2)
+        assert fake.opened >= 2
+    finally:
+        manager.stop()
+        output.close()
+        bus.stop()
+
+
+def test_start_with_retry_waits_for_the_microphone():
+    microphone = FakeMicrophone(silence(1.0), speed=10, loop=True)
+    microphone.unplugged = True
+    bus = AudioBus(stream_factory=microphone.factory)
+    manager = AudioDeviceManager(bus, poll_interval=0.05, rescan_interval=0.1,
+                                 list_devices=lambda refresh: [] if microphone.unplugged else [USB_MIC])
+    detector = WakeWordDetector(on_wake_word=lambda: None, audio_bus=bus)
+    detector.porcupine = FakePorcupine()
+    try:
+        manager.start()
+        detector.start_with_retry(manager, max_retries=2, retry_delay=10)
+        time.sleep(0.2)
+        assert not detector.is_running()
+        plugged_at = time.monotonic()
+        microphone.unplugged = False
+        # Started as soon as the manager reports the microphone back, not after retry_delay.
+        assert _wait_for(lambda: detector.is_running(), timeout=2)
+        print(f"Wake word listening {time.monotonic() - plugged_at:.2f}s after the microphone came back")
+    finally:
+        manager.stop()
+        detector.stop()
+        bus.stop()
+
+
+if __name__ == "__main__":
+    test_unplugged_microphone_is_reattached()
+    test_busy_device_is_retried_until_it_opens()
+    test_rescans_only_with_every_stream_closed()
+    test_start_with_retry_waits_for_the_microphone()
+    print("\n✅ Audio device manager tests completed successfully!")
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Test script to verify captured audio is converted to Whisper's float32 input without needless copies.
+"""
+
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from voice.audio_format import to_float32_mono
+
+
+def test_float32_capture_is_not_copied():
+    captured = np.linspace(-0.5, 0.5, 1600, dtype=np.float32).reshape(-1, 1)  # what sd.rec returns
+    audio = to_float32_mono(captured)
+    print(f"Shape {captured.shape} -> {audio.shape}, dtype {audio.dtype}")
+    assert audio.shape == (1600,)
+    assert audio.dtype == np.float32
+    assert np.shares_memory(audio, captured)
+
+
+def test_int16_and_stereo_are_normalised():
+    pcm = np.array([0, 16384, -32768, 32767], dtype=np.int16)
+    audio = to_float32_mono(pcm)
+    assert audio.dtype == np.float32
+    assert np.allclose(audio, [0.0, 0.5, -1.0, 32767 / 32768])
+
+    stereo = np.array([[0.2, 0.4], [-0.2, -0.4]], dtype=np.float32)
+    assert np.allclose(to_float32_mono(stereo), [0.3, -0.3])
+
+
+if __name__ == "__main__":
+    test_float32_capture_is_not_copied()
+    test_int16_and_stereo_are_normalised()
+    print("\n✅ Audio format tests completed successfully!")
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that speech is played through one output stream that stays open:
+decoded audio plays from memory, starting playback is cheap, and stop, flush and volume
+take effect straight away.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import threading
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from voice.audio_output import AudioOutput, decode_mp3
+from voice.tts_speaker import TTSSpeaker
+from voice.tts_cache import TTSCache
+from fake_speaker import FakeSpeaker
+from fake_microphone import tone
+from fake_tts import FakeEdgeTTS, SAMPLE_MP3
+
+RATE = 24000
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_decode_mp3():
+    with open(SAMPLE_MP3, "rb") as f:
+        samples = decode_mp3(f.read(), RATE)
+    print(f"Decoded {len(samples) / RATE:.1f}s of speech")
+    assert samples.dtype == np.int16
+    assert len(samples) > RATE and np.abs(samples).max() > 1000
+
+
+def test_plays_samples_in_order_on_one_stream():
+    speaker = FakeSpeaker(speed=20)
+    output = AudioOutput(samplerate=RATE, blocksize=1024, stream_factory=speaker.factory)
+    first, second = tone(0.3, rate=RATE), tone(0.2, rate=RATE, frequency=440)
+    try:
+        a = output.play(first)
+        b = output.play(second)
+        assert a.wait(timeout=3) and b.wait(timeout=3)
+        played = speaker.audio()
+        assert np.array_equal(played[:len(first) + len(second)], np.concatenate([first, second]))
+        assert a.played == len(first) and not a.cancelled
+        assert speaker.opened == 1
+    finally:
+        output.close()
+        speaker.stop()
+    assert speaker.closed == 1
+
+
+def test_starting_playback_is_cheap():
+    speaker = FakeSpeaker(speed=1)
+    output = AudioOutput(samplerate=RATE, stream_factory=speaker.factory)
+    samples = tone(1.0, rate=RATE)
+    try:
+        output.start()
+        started = time.perf_counter()
+        for _ in range(100):
+            output.play(samples)
+        took = (time.perf_counter() - started) / 100
+        print(f"play() took {took * 1e6:.1f} us")
+        assert took < 0.001
+    finally:
+        output.close()
+        speaker.stop()
+
+
+def test_stop_flush_and_volume():
+    speaker = FakeSpeaker(speed=10)
+    output = AudioOutput(samplerate=RATE, blocksize=1024, stream_factory=speaker.factory)
+    try:
+        # flush() lets the current playback finish but drops what is queued behind it.
+        current = output.play(tone(0.5, rate=RATE))
+        queued = output.play(tone(0.5, rate=RATE))
+        output.flush()
+        assert queued.cancelled and current.wait(timeout=3) and not current.cancelled
+
+        # stop() cuts the current one off within a block.
+        long = output.play(tone(10.0, rate=RATE))
+        assert _wait_for(lambda: long.played > 0)
+        output.stop()
+        assert long.wait(timeout=0) and long.cancelled
+        assert not output.is_playing()
+        blocks = len(speaker.blocks)
+        time.sleep(0.1)
+        assert len(speaker.blocks) > blocks and not any(block.any() for block in speaker.blocks[blocks + 1:])
+
+        output.set_volume(0.5)
+        loud = tone(0.2, rate=RATE, amplitude=0.8)
+        speaker.blocks.clear()
+        assert output.play(loud).wait(timeout=3)
+        played = speaker.audio()
+        assert abs(int(np.abs(played).max()) - int(np.abs(loud).max()) // 2) <= 1
+    finally:
+        output.close()
+        speaker.stop()
+
+
+def test_waits_for_audio_that_is_still_coming():
+    speaker = FakeSpeaker(speed=10)
+    output = AudioOutput(samplerate=RATE, blocksize=1024, stream_factory=speaker.factory)
+    part1, part2 = tone(0.1, rate=RATE), tone(0.1, rate=RATE, frequency=440)
+    try:
+        streaming = output.play()
+        after = output.play(tone(0.1, rate=RATE, frequency=880))
+        streaming.feed(part1)
+        time.sleep(0.1)   # the synthesiser is slow; the next playback must not jump the queue
+        assert streaming.underruns > 0 and after.played == 0
+        streaming.feed(part2)
+        streaming.finish()
+        assert after.wait(timeout=3)
+        # Silence fills the gap, then part2 carries on where part1 stopped.
+        played, expected = speaker.audio(), np.concatenate([part1, part2])
+        played, expected = played[played != 0], expected[expected != 0]
+        assert np.array_equal(played[:len(expected)], expected)
+    finally:
+        output.close()
+        speaker.stop()
+
+
+def test_speaker_plays_from_memory():
+    fake = FakeSpeaker(speed=50)
+    speaker = TTSSpeaker(output=AudioOutput(samplerate=RATE, stream_factory=fake.factory),
+                         cache=TTSCache(tempfile.mkdtemp()), synthesizer=FakeEdgeTTS(chunk_delay=0))
+    finished = threading.Event()
+    try:
+        speaker.speak("Session ended.", on_finish=finished.set)
+        assert _wait_for(lambda: speaker.playback is not None and speaker.playback.played > 0)
+        speaker.stop()
+        assert speaker.output.is_playing() is False
+        assert finished.wait(timeout=3)
+        assert fake.opened == 1
+    finally:
+        speaker.close()
+        fake.stop()
+
+
+def test_dead_stream_is_given_up_and_reopened():
+    fake = FakeSpeaker(speed=5)
+    output = AudioOutput(samplerate=RATE, stream_factory=fake.factory, stall_timeout=0.3)
+    speaker = TTSSpeaker(output=output, cache=TTSCache(tempfile.mkdtemp()),
+                         synthesizer=FakeEdgeTTS(chunk_delay=0, seconds=3.0))
+    try:
+        answer = speaker.speak("A long answer.")
+        assert _wait_for(lambda: speaker.playback is not None and speaker.playback.played > 0)
+        fake.dead = True   # e.g. PortAudio was re-initialised under the open stream
+        # The utterance ends instead of waiting forever for a callback that never comes.
+        assert answer.wait(timeout=3)
+        assert not output.is_running()
+
+        fake.dead = False
+        again = speaker.speak("Session ended.")
+        assert again.wait(timeout=10) and again.state == "done"
+        assert fake.opened == 2
+    finally:
+        speaker.close()
+    assert fake.running() == 0
+
+    # Died while idle: the next play() opens a new stream rather than queueing on the dead one.
+    fake = FakeSpeaker(speed=50)
+    output = AudioOutput(samplerate=RATE, stream_factory=fake.factory)
+    try:
+        output.start()
+        fake.dead = True
+        playback = output.play(tone(0.1, rate=RATE))
+        assert fake.opened == 2 and fake.closed == 1   # the dead stream was closed, not left running
+        fake.dead = False
+        assert playback.wait(timeout=3) and not playback.cancelled
+        assert fake.running() == 1
+    finally:
+        output.close()
+    assert fake.running() == 0
+
+
+if __name__ == "__main__":
+    test_decode_mp3()
+    test_plays_samples_in_order_on_one_stream()
+    test_starting_playback_is_cheap()
+    test_stop_flush_and_volume()
+    test_waits_for_audio_that_is_still_coming()
+    test_speaker_plays_from_memory()
+    test_dead_stream_is_given_up_and_reopened()
+    print("\n✅ Audio output tests completed successfully!")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script to verify multi-turn conversation history within a listening session.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from ai.gemini_handler import GeminiHandler
+from ai.ollama_handler import OllamaHandler
+from core.conversation import Conversation
+from core.model_switcher import ModelSwitcher
+from fake_gemini import FakeGenAI
+from fake_ollama_server import FakeOllamaServer
+
+
+def test_history_is_trimmed_to_budget():
+    conversation = Conversation(max_tokens=40)
+    for i in range(10):
+        conversation.add_exchange(f"question number {i}", f"answer number {i} " * 3)
+    messages = conversation.messages()
+    print(f"Kept {len(messages)} turns, ~{conversation.token_count()} tokens")
+    assert conversation.token_count() <= 40
+    assert messages[0]["role"] == "user"
+    assert messages[-1]["content"].startswith("answer number 9")
+    assert "question number 0" not in [m["content"] for m in messages]
+
+    # The latest exchange survives even when it alone is over budget.
+    conversation.add_exchange("long " * 100, "short")
+    assert len(conversation.messages()) == 2
+
+
+def _switcher():
+    switcher = ModelSwitcher()
+    switcher.response_cache = None
+    return switcher
+
+
+def test_ollama_receives_session_history():
+    with FakeOllamaServer(reply=lambda payload: f"reply to {payload['messages'][-1]['content']}") as server:
+        switcher = _switcher()
+        switcher.ollama_handler = OllamaHandler(model="mistral", base_url=server.url)
+        switcher.start_conversation()
+        switcher.ask("who wrote hamlet")
+        "".join(switcher.ask_stream("when was he born"))
+
+        messages = server.requests[1][1]["messages"]
+        print(f"Second request roles: {[m['role'] for m in messages]}")
+        assert [m["role"] for m in messages] == ["system", "user", "assistant", "user"]
+        assert messages[0]["content"] == switcher.ollama_handler.system_prompt
+        assert messages[2]["content"] == "reply to who wrote hamlet"
+
+        # A new session starts from a clean slate.
+        switcher.end_conversation()
+        switcher.ask("who wrote hamlet")
+        assert len(server.requests[2][1]["messages"]) == 2
+
+
+def test_gemini_chat_session_gets_history():
+    fake = FakeGenAI(reply=lambda model, prompt: f"gemini on {prompt}")
+    switcher = _switcher()
+    switcher.gemini_handler = GeminiHandler(api_key="test-key", models=["gemini-2.5-flash"], genai_module=fake)
+    switcher.set_active_model("Gemini")
+    switcher.start_conversation()
+    switcher.ask("first question")
+    switcher.ask("second question")
+    print(f"Gemini histories: {fake.histories}")
+    assert fake.histories[0] == []
+    assert fake.histories[1] == [
+        {"role": "user", "parts": ["first question"]},
+        {"role": "model", "parts": ["gemini on first question"]},
+    ]
+    # Error replies are not remembered as part of the conversation.
+    fake.failing.add("gemini-2.5-flash")
+    switcher.ask("third question")
+    assert len(switcher.conversation.messages()) == 4
+
+
+def test_gemini_chat_session_is_kept_for_the_conversation():
+    fake = FakeGenAI(reply=lambda model, prompt: f"gemini on {prompt}")
+    switcher = _switcher()
+    switcher.gemini_handler = GeminiHandler(api_key="test-key", models=["gemini-2.5-flash"], genai_module=fake)
+    switcher.set_active_model("Gemini")
+    switcher.start_conversation()
+    switcher.ask("first question")
+    "".join(switcher.ask_stream("second question"))
+    switcher.ask("third question")
+    print(f"Chat sessions started: {fake.chats_started}")
+    assert fake.chats_started == 1
+    assert len(fake.histories[2]) == 4   # the one session carries the whole conversation
+
+    # Trimmed: the kept session holds turns the conversation has dropped, so a new one starts.
+    switcher.conversation.max_tokens = 1
+    switcher.ask("fourth question")
+    switcher.ask("fifth question")
+    assert fake.chats_started == 2
+    assert fake.histories[4] == [
+        {"role": "user", "parts": ["fourth question"]},
+        {"role": "model", "parts": ["gemini on fourth question"]},
+    ]
+
+    # A new listening session starts from a clean slate.
+    switcher.end_conversation()
+    switcher.start_conversation()
+    switcher.ask("who are you")
+    assert fake.chats_started == 3 and fake.histories[-1] == []
+
+
+if __name__ == "__main__":
+    test_history_is_trimmed_to_budget()
+    test_ollama_receives_session_history()
+    test_gemini_chat_session_gets_history()
+    test_gemini_chat_session_is_kept_for_the_conversation()
+    print("\n✅ Conversation tests completed successfully!")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script to verify Gemini client reuse and the quota circuit breaker, using a local fake of the API.
+"""
+
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from ai.circuit_breaker import CircuitBreaker
+from ai.gemini_handler import GeminiHandler, GeminiQuotaError
+from fake_gemini import FakeGenAI
+
+MODELS = ["gemini-2.5-pro", "gemini-2.5-flash"]
+
+
+def test_clients_are_reused():
+    """configure() runs once and each model's client is built once, however many questions are asked."""
+    fake = FakeGenAI(reply=lambda model, prompt: f"{model} says hi")
+    handler = GeminiHandler(api_key="test-key", models=MODELS, genai_module=fake)
+    for _ in range(5):
+        assert handler.ask("hello") == "gemini-2.5-pro says hi"
+    print(f"configure calls: {fake.configure_calls}, models created: {fake.models_created}")
+    assert fake.configure_calls == 1
+    assert fake.models_created == ["gemini-2.5-pro"]
+    # The system prompt goes in once, as the client's system instruction, not in every question.
+    assert fake.calls[0][1] == "hello"
+
+    stats = handler.get_stats()["gemini-2.5-pro"]
+    assert stats["successes"] == 5 and stats["failures"] == 0
+
+
+def test_quota_failure_is_sticky_until_cooldown():
+    """After pro runs out of quota, later questions go straight to flash until the cooldown expires."""
+    fake = FakeGenAI(reply=lambda model, prompt: f"{model} answer", failing={"gemini-2.5-pro"})
+    breaker = CircuitBreaker(cooldown_seconds=0.1, quota_cooldown_seconds=0.2)
+    handler = GeminiHandler(api_key="test-key", models=MODELS, breaker=breaker, genai_module=fake)
+
+    assert handler.ask("first") == "gemini-2.5-flash answer"
+    assert handler.ask("second") == "gemini-2.5-flash answer"
+    tried = [model for model, _, _ in fake.calls]
+    print(f"Models tried: {tried}")
+    assert tried == ["gemini-2.5-pro", "gemini-2.5-flash", "gemini-2.5-flash"]
+
+    stats = handler.get_stats()
+    assert stats["gemini-2.5-pro"]["failures"] == 1
+    assert not stats["gemini-2.5-pro"]["available"]
+    assert "Quota" in stats["gemini-2.5-pro"]["last_error"]
+
+    # Once the cooldown is over (and pro has recovered), the preferred model is used again.
+    time.sleep(0.25)
+    fake.failing.clear()
+    assert handler.ask("third") == "gemini-2.5-pro answer"
+    assert handler.get_stats()["gemini-2.5-pro"]["available"]
+
+
+def test_all_models_cooling_down():
+    """When every model is out of quota, questions are answered without any round-trip."""
+    fake = FakeGenAI(failing=set(MODELS))
+    handler = GeminiHandler(api_key="test-key", models=MODELS, genai_module=fake)
+    assert "quota exceeded" in handler.ask("first")
+    calls_after_first = len(fake.calls)
+    assert calls_after_first == 2
+
+    try:
+        handler.generate("second")
+        assert False, "expected GeminiQuotaError"
+    except GeminiQuotaError as e:
+        print(f"Got expected error: {e}")
+    assert len(fake.calls) == calls_after_first
+
+
+def test_stream_falls_back_before_first_chunk():
+    fake = FakeGenAI(reply="Streaming from flash.", failing={"gemini-2.5-pro"})
+    handler = GeminiHandler(api_key="test-key", models=MODELS, genai_module=fake)
+    chunks = list(handler.ask_stream("hi"))
+    print(f"Chunks: {chunks}")
+    assert "".join(chunks).strip() == "Streaming from flash."
+    assert handler.get_stats()["gemini-2.5-flash"]["successes"] == 1
+
+
+def test_stream_broken_off_part_way_is_reported_incomplete():
+    fake = FakeGenAI(reply="Paris is the capital of France.", break_after=2)
+    handler = GeminiHandler(api_key="test-key", models=MODELS, genai_module=fake)
+    stream = handler.ask_stream("capital of france")
+    chunks = []
+    try:
+        while True:
+            chunks.append(next(stream))
+    except StopIteration as stop:
+        complete = stop.value
+    # No other model is tried once part of the answer is out, and the caller learns it is partial.
+    assert "".join(chunks) == "Paris is " and complete is False
+    assert len(fake.calls) == 1
+
+
+if __name__ == "__main__":
+    test_clients_are_reused()
+    test_quota_failure_is_sticky_until_cooldown()
+    test_all_models_cooling_down()
+    test_stream_falls_back_before_first_chunk()
+    test_stream_broken_off_part_way_is_reported_incomplete()
+    print("\n✅ GeminiHandler tests completed successfully!")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test script to verify raced/hedged requests across AI backends and cancellation of the loser.
+"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from ai.gemini_handler import GeminiHandler
+from ai.hedged_request import hedged_stream
+from ai.ollama_handler import OllamaHandler
+from core.model_switcher import ModelSwitcher, is_error_reply
+from core.response_cache import ResponseCache
+from fake_gemini import FakeGenAI
+from fake_ollama_server import FakeOllamaServer
+
+
+def _backend(words, first_delay=0.0, word_delay=0.0, log=None, name=""):
+    """A fake backend stream that records whether it was started and whether it ran to the end."""
+    def factory():
+        log.append(f"{name} started")
+        try:
+            time.sleep(first_delay)
+            for word in words:
+                yield word
+                time.sleep(word_delay)
+            log.append(f"{name} finished")
+        finally:
+            log.append(f"{name} closed")
+    return name, factory
+
+
+def test_race_fastest_wins_and_loser_is_cancelled():
+    log = []
+    backends = [
+        _backend(["slow ", "answer"], first_delay=0.5, log=log, name="slow"),
+        _backend(["fast ", "answer"], log=log, name="fast"),
+    ]
+    winners = []
+    started = time.monotonic()
+    answer = "".join(hedged_stream(backends, on_winner=winners.append))
+    elapsed = time.monotonic() - started
+    time.sleep(0.6)  # let the slow backend wake up and notice it was cancelled
+    print(f"Answer: {answer!r} in {elapsed:.2f}s, log: {log}")
+    assert answer == "fast answer"
+    assert winners == ["fast"]
+    assert elapsed < 0.4
+    assert "slow finished" not in log and "slow closed" in log
+
+
+def test_hedge_only_starts_backup_when_primary_is_slow():
+    log = []
+    quick = [_backend(["primary"], log=log, name="primary"), _backend(["backup"], log=log, name="backup")]
+    assert "".join(hedged_stream(quick, hedge_delay=0.3)) == "primary"
+    assert "backup started" not in log
+
+    log.clear()
+    slow = [_backend(["primary"], first_delay=1.0, log=log, name="primary"), _backend(["backup"], log=log, name="backup")]
+    assert "".join(hedged_stream(slow, hedge_delay=0.1)) == "backup"
+    assert "backup started" in log
+
+
+def test_error_replies_do_not_win():
+    log = []
+    backends = [
+        _backend(["I'm having trouble with Ollama right now."], log=log, name="broken"),
+        _backend(["real ", "answer"], first_delay=0.1, log=log, name="working"),
+    ]
+    assert "".join(hedged_stream(backends, acceptable=lambda t: not is_error_reply(t))) == "real answer"
+
+    # If every backend fails, the preferred backend's error message is still spoken.
+    failing = [_backend(["Gemini API error: boom"], log=log, name="only")]
+    assert "".join(hedged_stream(failing, acceptable=lambda t: not is_error_reply(t))) == "Gemini API error: boom"
+
+
+def test_blank_first_chunk_can_still_win():
+    """A leading space is not judged on its own: the answer it starts still wins the race."""
+    log = []
+    backends = [
+        _backend(["slow"], first_delay=0.5, log=log, name="slow"),
+        _backend([" ", "spaced ", "answer"], word_delay=0.05, log=log, name="spaced"),
+    ]
+    winners = []
+    answer = "".join(hedged_stream(backends, on_winner=winners.append))
+    assert answer == " spaced answer"
+    assert winners == ["spaced"]
+
+
+def test_loser_waiting_for_its_server_is_aborted():
+    """The losing Ollama request is broken off at once, not when the server finally answers."""
+    log = []
+    with FakeOllamaServer(reply="Much too late.", delay=2.0) as server:
+        handler = OllamaHandler(model="mistral", base_url=server.url)
+
+        def ollama():
+            try:
+                yield from handler.chat_stream("explain gravity")
+            finally:
+                log.append("ollama closed")
+
+        backends = [("ollama", ollama), _backend(["fast ", "answer"], first_delay=0.2, log=log, name="fast")]
+        assert "".join(hedged_stream(backends)) == "fast answer"
+        deadline = time.monotonic() + 0.5
+        while "ollama closed" not in log and time.monotonic() < deadline:
+            time.sleep(0.02)
+        print(f"Log: {log}")
+        assert "ollama closed" in log
+
+
+def test_model_switcher_race_mode():
+    """A slow Ollama answer loses to Gemini, and the Ollama stream is abandoned."""
+    with FakeOllamaServer(reply="Ollama took its time with this one.", delay=0.8) as server:
+        switcher = ModelSwitcher(race_mode="race")
+        switcher.response_cache = None
+        switcher.ollama_handler = OllamaHandler(model="mistral", base_url=server.url)
+        switcher.gemini_handler = GeminiHandler(api_key="test-key", models=["gemini-2.5-flash"],
+                                                genai_module=FakeGenAI(reply="Gemini was quicker."))
+        started = time.monotonic()
+        answer = switcher.ask("explain gravity")
+        elapsed = time.monotonic() - started
+        print(f"Race answer: {answer!r} in {elapsed:.2f}s")
+        assert answer == "Gemini was quicker."
+        assert elapsed < 0.7
+
+        # Without a usable second backend, race mode quietly falls back to the selected model.
+        switcher.gemini_handler = GeminiHandler(api_key=None, genai_module=FakeGenAI())
+        assert not switcher._racing()
+
+
+def test_race_answer_is_cached_for_the_active_model():
+    """Whichever backend wins, the race answer is found again under the model that is selected."""
+    with FakeOllamaServer(reply="Ollama took its time with this one.", delay=0.8) as server:
+        switcher = ModelSwitcher(race_mode="race", response_cache=ResponseCache(
+            os.path.join(tempfile.mkdtemp(), "response_cache.json")))
+        switcher.ollama_handler = OllamaHandler(model="mistral", base_url=server.url)
+        switcher.gemini_handler = GeminiHandler(api_key="test-key", models=["gemini-2.5-flash"],
+                                                genai_module=FakeGenAI(reply="Gemini was quicker."))
+        assert switcher.ask("explain gravity") == "Gemini was quicker."
+        started = time.monotonic()
+        assert switcher.ask("explain gravity") == "Gemini was quicker."
+        assert time.monotonic() - started < 0.1
+        assert switcher.get_cache_stats()['hits'] == 1
+
+
+if __name__ == "__main__":
+    test_race_fastest_wins_and_loser_is_cancelled()
+    test_hedge_only_starts_backup_when_primary_is_slow()
+    test_error_replies_do_not_win()
+    test_blank_first_chunk_can_still_win()
+    test_loser_waiting_for_its_server_is_aborted()
+    test_model_switcher_race_mode()
+    test_race_answer_is_cached_for_the_active_model()
+    print("\n✅ Hedged request tests completed successfully!")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the local arithmetic and unit-conversion engine.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from core.math_engine import MathEngine
+from core.model_switcher import ModelSwitcher
+
+
+def test_spoken_arithmetic():
+    engine = MathEngine()
+    cases = {
+        "What's 15 plus 27?": "15 plus 27 is 42.",
+        "what is fifteen plus twenty seven": "fifteen plus twenty seven is 42.",
+        "one hundred and five times two": "one hundred and five times two is 210.",
+        "three point five times 2": "three point five times 2 is 7.",
+        "20 percent of 80": "20 percent of 80 is 16.",
+        "what's 15% of 80": "15% of 80 is 12.",
+        "2 to the power of 10": "2 to the power of 10 is 1024.",
+        "7 squared": "7 squared is 49.",
+        "the square root of 144": "the square root of 144 is 12.",
+        "ten divided by three": "ten divided by three is 3.33.",
+        "(2 + 3) * 4": "(2 + 3) * 4 is 20.",
+        "negative five minus 3": "negative five minus 3 is -8.",
+        "10 divided by 0": "You can't divide by zero.",
+    }
+    for question, expected in cases.items():
+        answer = engine.answer(question)
+        print(f"{question!r} -> {answer!r}")
+        assert answer == expected
+
+
+def test_unit_conversions():
+    engine = MathEngine()
+    assert engine.answer("how many feet in a mile") == "There are 5280 feet in a mile."
+    assert engine.answer("convert 5 miles to km") == "5 miles is 8.05 km."
+    assert engine.answer("what's 100 degrees fahrenheit in celsius") == "100 fahrenheit is 37.78 celsius."
+    assert engine.answer("how many seconds are there in 3 hours") == "There are 10800 seconds in 3 hours."
+    # Different dimensions can't be converted.
+    assert engine.answer("5 miles in kilograms") is None
+
+
+def test_unparseable_questions_fall_through():
+    engine = MathEngine()
+    for question in ["who won the 2018 world cup", "how many people live in Paris", "2018", "2 ^ 5000",
+                     "import os plus 1"]:
+        assert engine.answer(question) is None, question
+
+
+def test_deep_nesting_falls_through():
+    engine = MathEngine()
+    assert engine.answer("(" * 20 + "1 + 1" + ")" * 20) == "(" * 20 + "1 + 1" + ")" * 20 + " is 2."
+    # Deep enough to exhaust Python's recursion limit without the parser's own cap.
+    for question in ["(" * 5000 + "1" + ")" * 5000, "minus " * 5000 + "1", "2 ^ " * 5000 + "1"]:
+        assert engine.answer(question) is None
+
+
+def test_model_switcher_skips_the_model_for_maths():
+    switcher = ModelSwitcher()
+    switcher.response_cache = None
+    switcher.models["Ollama"] = lambda question, history=None: "LLM was called"
+    assert switcher.ask("what's 15 plus 27") == "15 plus 27 is 42."
+    assert switcher.ask("who won the 2018 world cup") == "LLM was called"
+    assert switcher.get_skill_stats()["math"] == 1
+
+
+if __name__ == "__main__":
+    test_spoken_arithmetic()
+    test_unit_conversions()
+    test_unparseable_questions_fall_through()
+    test_deep_nesting_falls_through()
+    test_model_switcher_skips_the_model_for_maths()
+    print("\n✅ Math engine tests completed successfully!")
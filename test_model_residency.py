@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that the local model is preloaded, kept alive and unloaded when idle.
+"""
+
+import os
+import sys
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from ai.ollama_handler import OllamaHandler
+from ai.model_residency import ModelResidencyManager
+from fake_ollama_server import FakeOllamaServer
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_preload_ping_and_idle_unload():
+    with FakeOllamaServer() as server:
+        states = []
+        handler = OllamaHandler(model="mistral", base_url=server.url)
+        manager = ModelResidencyManager(handler, keep_alive_interval=0.1, idle_unload_after=0.6,
+                                        on_state_change=states.append)
+        manager.start()
+        try:
+            assert _wait_for(manager.is_ready)
+            print(f"States after start: {states}")
+            assert states[:2] == ["warming up", "ready"]
+
+            # While in use, pings keep arriving; the model stays resident.
+            for _ in range(4):
+                manager.touch()
+                time.sleep(0.1)
+            pings = [p for path, p in server.requests if path == "/api/generate" and p.get("keep_alive") != 0]
+            print(f"Pings sent: {len(pings)}")
+            assert len(pings) >= 3
+            assert manager.is_ready()
+
+            # Once idle, the model is unloaded with keep_alive=0.
+            assert _wait_for(lambda: manager.state == "unloaded")
+            assert server.requests[-1][1]["keep_alive"] == 0
+
+            # The next bit of activity warms it straight back up.
+            manager.touch()
+            assert _wait_for(manager.is_ready)
+        finally:
+            manager.stop()
+
+
+def test_unreachable_server_reports_error():
+    handler = OllamaHandler(base_url="http://127.0.0.1:9")
+    manager = ModelResidencyManager(handler, keep_alive_interval=0.1, idle_unload_after=0)
+    manager.start()
+    try:
+        assert _wait_for(lambda: manager.state == "error")
+    finally:
+        manager.stop()
+
+
+if __name__ == "__main__":
+    test_preload_ping_and_idle_unload()
+    test_unreachable_server_reports_error()
+    print("\n✅ Model residency tests completed successfully!")
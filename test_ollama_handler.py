@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the HTTP Ollama client against a local stand-in server.
+"""
+
+import os
+import socket
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from ai.ollama_handler import (
+    OllamaHandler,
+    OllamaConnectionError,
+    OllamaModelNotFoundError,
+    OllamaTimeoutError,
+)
+from fake_ollama_server import FakeOllamaServer
+
+
+def _unused_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_ask_reuses_one_connection():
+    """Several questions in a row should travel over a single keep-alive connection."""
+    with FakeOllamaServer(reply=lambda payload: payload["messages"][-1]["content"].upper()) as server:
+        handler = OllamaHandler(model="mistral", base_url=server.url)
+        for question in ["one", "two", "three"]:
+            assert handler.ask(question) == question.upper()
+        handler.close()
+
+        print(f"Requests: {len(server.requests)}, connections: {server.connections}")
+        assert len(server.requests) == 3
+        assert server.connections == 1
+        path, payload = server.requests[0]
+        assert path == "/api/chat"
+        assert payload["messages"][0]["role"] == "system"
+        assert payload["stream"] is False
+
+
+def test_stream_yields_tokens_and_keeps_connection():
+    """Streaming replies arrive token by token, and the connection goes back to the pool afterwards."""
+    with FakeOllamaServer(reply="The answer is 42. Anything else?") as server:
+        handler = OllamaHandler(model="mistral", base_url=server.url)
+        tokens = list(handler.chat_stream("What's 15 plus 27?"))
+        print(f"Tokens: {tokens}")
+        assert len(tokens) > 1
+        assert "".join(tokens) == "The answer is 42. Anything else?"
+        assert server.requests[0][1]["stream"] is True
+
+        assert handler.chat("again") == "The answer is 42. Anything else?"
+        assert server.connections == 1
+
+        # Abandoning a stream half way must not leave a half-read connection in the pool.
+        stream = handler.chat_stream("partial")
+        next(stream)
+        stream.close()
+        assert handler.chat("after partial") == "The answer is 42. Anything else?"
+
+
+def test_missing_model_is_reported():
+    with FakeOllamaServer(models=("llama3",)) as server:
+        handler = OllamaHandler(model="mistral", base_url=server.url)
+        try:
+            handler.chat("hi")
+            assert False, "expected OllamaModelNotFoundError"
+        except OllamaModelNotFoundError as e:
+            print(f"Got expected error: {e}")
+        assert "ollama pull mistral" in handler.ask("hi")
+
+
+def test_server_down_and_timeout():
+    handler = OllamaHandler(base_url=f"http://127.0.0.1:{_unused_port()}")
+    try:
+        handler.chat("hi")
+        assert False, "expected OllamaConnectionError"
+    except OllamaConnectionError as e:
+        print(f"Got expected error: {e}")
+    assert handler.ask("hi").startswith("I'm having trouble with Ollama")
+
+    with FakeOllamaServer(delay=0.5) as server:
+        handler = OllamaHandler(base_url=server.url, request_timeout=0.1)
+        try:
+            handler.chat("hi")
+            assert False, "expected OllamaTimeoutError"
+        except OllamaTimeoutError as e:
+            print(f"Got expected error: {e}")
+
+
+if __name__ == "__main__":
+    test_ask_reuses_one_connection()
+    test_stream_yields_tokens_and_keeps_connection()
+    test_missing_model_is_reported()
+    test_server_down_and_timeout()
+    print("\n✅ OllamaHandler tests completed successfully!")
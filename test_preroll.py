@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that a question said right after the wake word, in the same breath,
+is recorded from where the wake word ended rather than from when the listener started.
+"""
+
+import os
+import sys
+import time
+import threading
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from voice.audio_bus import AudioBus
+from voice.stt_backends import STTBackend
+from voice.whisper_listener import WhisperListener
+from voice.wake_word_detector import WakeWordDetector
+from fake_microphone import FakeMicrophone, tone, silence
+from fake_porcupine import FakePorcupine
+
+RATE = 16000
+
+
+class _Backend(STTBackend):
+    name = "fake"
+
+    def transcribe_segments(self, audio, prompt=None):
+        return [(0.0, len(audio) / RATE, "what time is it")]
+
+
+def _rms(samples):
+    return float(np.sqrt(np.mean(np.square(samples))))
+
+
+def test_question_after_wake_word_is_not_cut_off():
+    # "Hey Ryo" (0.5 s), then the question straight away with no pause, then silence.
+    lead, wake_word, question = silence(0.5), tone(0.5, frequency=440), tone(1.0)
+    signal = np.concatenate([lead, wake_word, question, silence(2.0)])
+    wake_word_end = len(lead) + len(wake_word)
+
+    microphone = FakeMicrophone(signal, speed=4)
+    bus = AudioBus(stream_factory=microphone.factory)
+    listener = WhisperListener(backend=_Backend(), streaming=False, audio_bus=bus)
+    detected = threading.Event()
+    detector = WakeWordDetector(on_wake_word=detected.set, audio_bus=bus)
+    detector.porcupine = FakePorcupine(wake_word_ends=[wake_word_end])
+    try:
+        detector.start()
+        assert detected.wait(timeout=5)
+        # The app takes a moment to switch over (stopping TTS etc.); the user is already talking.
+        time.sleep(0.1)
+        assert bus.position > detector.detected_at + 0.3 * RATE
+
+        done = threading.Event()
+        listener.start_listening(on_utterance_end=done.set, start_position=detector.detected_at)
+        assert done.wait(timeout=5)
+        audio = listener.audio
+        print(f"Wake word ended at {detector.detected_at / RATE:.2f}s; recorded {len(audio) / RATE:.2f}s")
+
+        # The recording starts exactly where the wake word ended, i.e. at the first word of the question.
+        assert abs(detector.detected_at - wake_word_end) < FakePorcupine.frame_length
+        assert _rms(audio[:1600]) > 0.1, "the start of the question was lost"
+        assert len(audio) >= len(question)
+    finally:
+        detector.stop()
+        bus.stop()
+
+
+def test_preroll_is_limited():
+    # Something was said a good while before listening starts.
+    microphone = FakeMicrophone(np.concatenate([tone(1.0), silence(4.0)]), speed=20)
+    bus = AudioBus(stream_factory=microphone.factory)
+    listener = WhisperListener(backend=_Backend(), streaming=False, audio_bus=bus, preroll_seconds=0.5)
+    bus.start()
+    try:
+        while bus.position < 2 * RATE:
+            time.sleep(0.01)
+        done = threading.Event()
+        listener.start_listening(on_utterance_end=done.set, no_speech_timeout=1.0, start_position=0)
+        assert done.wait(timeout=5)
+        # Asked to start 2 s back, but only half a second of pre-roll is allowed: the old speech isn't heard.
+        assert listener.end_reason == "no_speech"
+        assert listener.audio is None
+    finally:
+        bus.stop()
+
+
+if __name__ == "__main__":
+    test_question_after_wake_word_is_not_cut_off()
+    test_preroll_is_limited()
+    print("\n✅ Pre-roll tests completed successfully!")
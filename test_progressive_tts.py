@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that speech starts playing as soon as the first chunk of synthesised
+audio arrives, rather than after the whole mp3 has been downloaded, and that stopping
+silences it and ends the synthesis straight away.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import threading
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from voice.audio_output import AudioOutput, StreamDecoder, decode_mp3
+from voice.tts_speaker import TTSSpeaker
+from voice.tts_cache import TTSCache
+from fake_speaker import FakeSpeaker
+from fake_tts import FakeEdgeTTS
+
+RATE = 24000
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _speaker(tts, speed=10):
+    fake = FakeSpeaker(speed=speed)
+    speaker = TTSSpeaker(output=AudioOutput(samplerate=RATE, stream_factory=fake.factory),
+                         cache=TTSCache(tempfile.mkdtemp()), synthesizer=tts)
+    return fake, speaker
+
+
+def test_stream_decoder_plays_before_the_end():
+    mp3 = FakeEdgeTTS().mp3
+    output = AudioOutput(samplerate=RATE, stream_factory=FakeSpeaker().factory)
+    try:
+        playback = output.play()
+        decoder = StreamDecoder(playback)
+        half = len(mp3) // 2
+        for offset in range(0, half, 2048):
+            decoder.feed(mp3[offset:min(offset + 2048, half)])
+        # Half the mp3 is in: audio is already coming out, and the playback isn't over.
+        assert _wait_for(lambda: playback.played > 0)
+        assert not playback.done.is_set()
+        for offset in range(half, len(mp3), 2048):
+            decoder.feed(mp3[offset:offset + 2048])
+        decoder.finish()
+        assert playback.wait(timeout=10)
+        # Streamed decoding yields the same audio as decoding the whole file (give or take an mp3 frame of padding).
+        assert abs(playback.played - len(decode_mp3(mp3, RATE))) <= 2 * 1152
+    finally:
+        output.close()
+
+
+def test_first_audio_before_synthesis_finishes():
+    tts = FakeEdgeTTS(chunk_delay=0.02)   # ~1.4 s to send the whole answer
+    fake, speaker = _speaker(tts)
+    finished = threading.Event()
+    try:
+        started = time.perf_counter()
+        speaker.speak("Here is a long answer.", on_finish=finished.set)
+        assert _wait_for(lambda: fake.first_sound_at is not None)
+        first_audio = fake.first_sound_at - started
+        assert _wait_for(lambda: tts.finished_at is not None)
+        synthesis = tts.finished_at - started
+        print(f"First audio after {first_audio * 1000:.0f} ms; synthesis took {synthesis * 1000:.0f} ms")
+        assert first_audio < 0.3
+        assert fake.first_sound_at < tts.finished_at
+        speaker.stop()
+        assert finished.wait(timeout=3)
+    finally:
+        speaker.close()
+
+
+def test_stop_is_immediate():
+    tts = FakeEdgeTTS(chunk_delay=0.02)
+    fake, speaker = _speaker(tts)
+    finished = threading.Event()
+    try:
+        speaker.speak("Read out my to-do list.", on_finish=finished.set)
+        assert _wait_for(lambda: fake.first_sound_at is not None)
+        playback = speaker.playback
+        speaker.stop()
+        assert playback.cancelled and not speaker.output.is_playing()
+        blocks = len(fake.blocks)
+        assert finished.wait(timeout=1)
+        # The synthesis stream was abandoned, and nothing more reaches the speaker.
+        assert tts.closed_early == 1
+        sent = tts.chunks_sent
+        time.sleep(0.1)
+        assert tts.chunks_sent == sent
+        assert not any(block.any() for block in fake.blocks[blocks + 1:])
+    finally:
+        speaker.close()
+
+
+def test_streamed_sentences_play_in_order():
+    tts = FakeEdgeTTS(chunk_delay=0, seconds=1.0)
+    fake, speaker = _speaker(tts, speed=50)
+    finished = threading.Event()
+    calls = []
+    try:
+        speaker.speak_stream(iter(["First sentence.", "Second sentence."]),
+                             on_finish=lambda: (calls.append(1), finished.set()))
+        assert finished.wait(timeout=10)
+        assert tts.texts == ["First sentence.", "Second sentence."]
+        assert speaker.last_text == "First sentence. Second sentence."
+        played = fake.audio()
+        one = len(decode_mp3(tts.mp3, RATE))
+        print(f"Played {len(played) / RATE:.2f}s for two {one / RATE:.2f}s sentences")
+        assert len(played) > 1.5 * one
+        time.sleep(0.05)
+        assert calls == [1]
+    finally:
+        speaker.close()
+
+
+if __name__ == "__main__":
+    test_stream_decoder_plays_before_the_end()
+    test_first_audio_before_synthesis_finishes()
+    test_stop_is_immediate()
+    test_streamed_sentences_play_in_order()
+    print("\n✅ Progressive TTS tests completed successfully!")
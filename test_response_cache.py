@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the persistent response cache and its use in ModelSwitcher
+"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from core.response_cache import ResponseCache
+from core.model_switcher import ModelSwitcher
+from fake_ollama_server import FakeOllamaServer
+from ai.ollama_handler import OllamaHandler
+
+
+def _cache_file():
+    return os.path.join(tempfile.mkdtemp(), "response_cache.json")
+
+
+def test_normalisation_ttl_and_lru():
+    cache = ResponseCache(_cache_file(), max_entries=2, ttl_seconds=0.2)
+    cache.put("What's 15 plus 27?", "Ollama:mistral", "v1", "42.")
+    assert cache.get("what is 15 plus 27", "Ollama:mistral", "v1") == "42."
+    assert cache.get("Hey Ryo, what's 15 plus 27", "Ollama:mistral", "v1") == "42."
+    # Another model or another system prompt version is a different entry.
+    assert cache.get("what's 15 plus 27", "Gemini", "v1") is None
+    assert cache.get("what's 15 plus 27", "Ollama:mistral", "v2") is None
+
+    cache.put("define entropy", "Ollama:mistral", "v1", "A measure of disorder.")
+    cache.put("what is pi", "Ollama:mistral", "v1", "About 3.14.")
+    assert cache.get("what's 15 plus 27", "Ollama:mistral", "v1") is None  # evicted (LRU)
+
+    time.sleep(0.25)
+    assert cache.get("what is pi", "Ollama:mistral", "v1") is None  # expired
+    stats = cache.get_stats()
+    print(f"Stats: {stats}")
+    assert stats['hits'] == 2
+
+
+def test_time_sensitive_questions_bypass_the_cache():
+    cache = ResponseCache(_cache_file())
+    for question in ["What time is it?", "What's the weather like today", "Any news right now?"]:
+        assert not ResponseCache.is_cacheable(question)
+        cache.put(question, "Ollama:mistral", "v1", "Something")
+        assert cache.get(question, "Ollama:mistral", "v1") is None
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_cache_survives_restart():
+    path = _cache_file()
+    ResponseCache(path).put("how many feet in a mile", "Ollama:mistral", "v1", "5280 feet.")
+    assert ResponseCache(path).get("How many feet in a mile?", "Ollama:mistral", "v1") == "5280 feet."
+
+
+def test_model_switcher_answers_repeats_from_cache():
+    with FakeOllamaServer(reply="Paris is the capital of France.") as server:
+        switcher = ModelSwitcher(response_cache=ResponseCache(_cache_file()))
+        switcher.ollama_handler = OllamaHandler(model="mistral", base_url=server.url)
+
+        assert switcher.ask("What is the capital of France?") == "Paris is the capital of France."
+        assert "".join(switcher.ask_stream("what's the capital of france")) == "Paris is the capital of France."
+        assert len(server.requests) == 1
+
+    # With the server gone, the error reply must not be cached.
+    assert switcher.ask("What is the tallest mountain?").startswith("I'm having trouble")
+    assert switcher.response_cache.get("What is the tallest mountain?", *switcher._cache_identity()) is None
+
+
+
+def test_broken_off_stream_is_not_remembered():
+    with FakeOllamaServer(reply="Paris is the capital of France.", drop_after=2) as server:
+        switcher = ModelSwitcher(response_cache=ResponseCache(_cache_file()))
+        switcher.ollama_handler = OllamaHandler(model="mistral", base_url=server.url)
+        switcher.start_conversation()
+
+        assert "".join(switcher.ask_stream("What is the capital of France?")) == "Paris is"
+        assert switcher.response_cache.get("What is the capital of France?", *switcher._cache_identity()) is None
+        assert switcher.conversation.is_empty()
+
+        # Asked again once the server behaves: a real request, and this time it is remembered.
+        server.drop_after = None
+        switcher.end_conversation()
+        assert "".join(switcher.ask_stream("What is the capital of France?")) == "Paris is the capital of France."
+        assert len(server.requests) == 2
+        assert switcher.response_cache.get("What is the capital of France?", *switcher._cache_identity()) is not None
+
+
+if __name__ == "__main__":
+    test_normalisation_ttl_and_lru()
+    test_time_sensitive_questions_bypass_the_cache()
+    test_cache_survives_restart()
+    test_model_switcher_answers_repeats_from_cache()
+    test_broken_off_stream_is_not_remembered()
+    print("\n✅ Response cache tests completed successfully!")
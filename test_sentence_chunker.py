@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that streamed model tokens are regrouped into speakable sentences.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from voice.sentence_chunker import iter_sentences
+
+
+def test_sentences_are_released_as_soon_as_they_end():
+    """The first sentence must come out before the rest of the stream has been read."""
+    consumed = []
+
+    def tokens():
+        for token in ["Sure", "!", " Dr", ". Smith", " says", " hi", ".", " Bye", " now"]:
+            consumed.append(token)
+            yield token
+
+    sentences = iter_sentences(tokens())
+    first = next(sentences)
+    print(f"First sentence '{first}' after {len(consumed)} tokens")
+    assert first == "Sure!"
+    assert len(consumed) < 9
+    assert list(sentences) == ["Dr. Smith says hi.", "Bye now"]
+
+
+def test_lists_and_long_runs():
+    text = "Here's your list:\n1. Milk\n2. Eggs\n"
+    assert list(iter_sentences(iter(text))) == ["Here's your list:", "1. Milk", "2. Eggs"]
+
+    run_on = "word, " * 60
+    pieces = list(iter_sentences([run_on], max_chars=100))
+    print(f"Run-on split into {len(pieces)} pieces")
+    assert len(pieces) > 1
+    assert all(len(piece) <= 100 for piece in pieces)
+
+
+if __name__ == "__main__":
+    test_sentences_are_released_as_soon_as_they_end()
+    test_lists_and_long_runs()
+    print("\n✅ Sentence chunker tests completed successfully!")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the fast-path skill registry and that it runs before any AI backend.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from ai.gemini_handler import GeminiHandler
+from core.model_switcher import ModelSwitcher
+from core.skills import SkillRegistry
+from fake_gemini import FakeGenAI
+
+
+def test_phrases_and_patterns():
+    registry = SkillRegistry()
+    registry.register("echo", lambda q: "exact", phrases=["What's up"])
+    registry.register("first", lambda q: "first pattern", patterns=[r"\bapples?\b"])
+    registry.register("second", lambda q: "second pattern", patterns=[r"\bbananas?\b", r"\bcherry\b"])
+
+    assert registry.match("what's up?") == "exact"
+    assert registry.match("  WHAT'S   UP!") == "exact"
+    assert registry.match("what's up with you") is None
+    assert registry.match("I like bananas") == "second pattern"
+    assert registry.match("one cherry please") == "second pattern"
+    assert registry.match("an apple a day") == "first pattern"
+    assert registry.match("pears") is None
+
+    stats = registry.get_stats()
+    print(f"Skill hits: {stats}")
+    assert stats == {"echo": 2, "first": 1, "second": 2}
+
+
+def test_declining_skill_passes_to_the_next_match():
+    registry = SkillRegistry()
+    asked = []
+
+    def timer(question):
+        asked.append("timer")
+        return None if "weather" in question else "timer set"
+
+    registry.register("timer", timer, phrases=["set a timer"], patterns=[r"\bminutes?\b"])
+    registry.register("weather", lambda q: "sunny" if "today" in q else None, patterns=[r"\bweather\b"])
+    registry.register("never", lambda q: None, patterns=[r"\bweather\b"])
+
+    assert registry.match("ten minutes") == "timer set"
+    # The timer pattern matches first but declines; the weather skill still gets the question.
+    assert registry.match("in ten minutes, what's the weather today") == "sunny"
+    # Every skill that matches declines, each asked once: on to the AI model.
+    assert registry.match("in ten minutes, what's the weather") is None
+    assert asked == ["timer", "timer", "timer"]
+    assert registry.get_stats() == {"timer": 1, "weather": 1, "never": 0}
+
+
+def test_skills_answer_for_every_backend():
+    """Gemini users hear the time without a Gemini call, and the model skill names the selected model."""
+    fake = FakeGenAI()
+    switcher = ModelSwitcher()
+    switcher.response_cache = None
+    switcher.gemini_handler = GeminiHandler(api_key="test-key", models=["gemini-2.5-flash"], genai_module=fake)
+    switcher.set_active_model("Gemini")
+
+    assert switcher.ask("What time is it?").startswith("The current time is")
+    assert "".join(switcher.ask_stream("hello")).startswith("Hello! I'm Ryo")
+    assert switcher.ask("which model am I using") == "You are currently using the Gemini model."
+    assert "weather" in switcher.ask("how is the weather in Hanoi")
+    assert fake.calls == []
+
+    assert switcher.ask("explain photosynthesis") == "Fake Gemini answer."
+    assert len(fake.calls) == 1
+    stats = switcher.get_skill_stats()
+    print(f"Skill hits: {stats}")
+    assert stats["time"] == 1 and stats["greeting"] == 1 and stats["model"] == 1 and stats["weather"] == 1
+
+
+if __name__ == "__main__":
+    test_phrases_and_patterns()
+    test_declining_skill_passes_to_the_next_match()
+    test_skills_answer_for_every_backend()
+    print("\n✅ Skill registry tests completed successfully!")
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the speech scheduler: one ordered queue with priorities, a
+cancellation handle per utterance, barge-in, resuming from where speech was cut off
+on unmute, and exactly one finish callback for every utterance.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from core.config import TTS_RESUME_REWIND_SECONDS
+from voice.audio_output import AudioOutput, decode_mp3
+from voice.speech_queue import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, SpeechQueue, Utterance
+from voice.tts_cache import TTSCache
+from voice.tts_speaker import TTSSpeaker
+from fake_speaker import FakeSpeaker
+from fake_tts import FakeEdgeTTS
+
+RATE = 24000
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _speaker(tts, speed=50):
+    fake = FakeSpeaker(speed=speed)
+    speaker = TTSSpeaker(output=AudioOutput(samplerate=RATE, stream_factory=fake.factory),
+                         cache=TTSCache(tempfile.mkdtemp()), synthesizer=tts)
+    return fake, speaker
+
+
+class Callbacks:
+    """Records every finish callback, by name."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, name):
+        def callback():
+            with self._lock:
+                self.calls.append(name)
+        return callback
+
+
+def test_queue_order():
+    queue = SpeechQueue()
+    low, first, second, urgent = (Utterance(["low"], PRIORITY_LOW), Utterance(["first"]),
+                                  Utterance(["second"]), Utterance(["urgent"], PRIORITY_HIGH))
+    for utterance in (low, first, second, urgent):
+        queue.push(utterance)
+    assert queue.remove(second) and not queue.remove(second)
+    assert [queue.pop() for _ in range(3)] == [urgent, first, low]
+    assert queue.pop() is None
+    assert Utterance(iter(["a"])).blocking and not Utterance(["a"]).blocking
+
+
+def test_rapid_speaks_fire_one_callback_each():
+    tts = FakeEdgeTTS(chunk_delay=0.005, seconds=0.5)
+    fake, speaker = _speaker(tts)
+    callbacks = Callbacks()
+    try:
+        threads = [threading.Thread(target=speaker.speak, args=(f"Reply {i}.", callbacks(i))) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        last = speaker.speak("Added task: buy milk", on_finish=callbacks("last"))
+        assert last.wait(timeout=10) and last.state == "done"
+        time.sleep(0.1)
+        print(f"Callbacks: {callbacks.calls}")
+        assert sorted(map(str, callbacks.calls)) == sorted([str(i) for i in range(8)] + ["last"])
+        assert callbacks.calls[-1] == "last"
+        assert not speaker.output.is_playing()
+    finally:
+        speaker.close()
+
+
+def test_queued_and_priority_order():
+    tts = FakeEdgeTTS(chunk_delay=0, seconds=0.3)
+    fake, speaker = _speaker(tts)
+    callbacks = Callbacks()
+    try:
+        # Something more urgent than what is playing isn't cut off by a normal reply, only queued.
+        alert = speaker.speak("Battery low.", callbacks("alert"), priority=PRIORITY_HIGH)
+        answer = speaker.speak("Here's the answer.", callbacks("answer"))
+        later = speaker.speak("Anything else?", callbacks("later"), interrupt=False)
+        assert later.wait(timeout=10)
+        assert alert.state == answer.state == later.state == "done"
+        assert tts.texts == ["Battery low.", "Here's the answer.", "Anything else?"]
+        time.sleep(0.05)
+        assert callbacks.calls == ["alert", "answer", "later"]
+    finally:
+        speaker.close()
+
+
+def test_barge_in_resumes_what_it_cut_off():
+    tts = FakeEdgeTTS(chunk_delay=0, seconds=3.0)
+    fake, speaker = _speaker(tts, speed=5)
+    callbacks = Callbacks()
+    try:
+        answer = speaker.speak("A long answer.", callbacks("answer"), priority=PRIORITY_LOW)
+        assert _wait_for(lambda: speaker.playback is not None and speaker.playback.played > RATE)
+        alert = speaker.speak("Timer done.", callbacks("alert"), priority=PRIORITY_NORMAL, interrupt=False)
+        assert alert.wait(timeout=10) and answer.wait(timeout=10)
+        # It had been synthesised in full before it was cut off, so it resumed from the cache.
+        assert tts.texts == ["A long answer.", "Timer done."]
+        index, samples = answer.position
+        print(f"The answer resumed {samples / RATE:.2f}s in")
+        assert index == 0 and samples > RATE
+        assert answer._playbacks[0][1] > 0   # the resumed playback skipped what was already heard
+        time.sleep(0.05)
+        assert callbacks.calls == ["alert", "answer"]
+    finally:
+        speaker.close()
+
+
+def test_cancellation_handles():
+    tts = FakeEdgeTTS(chunk_delay=0, seconds=1.0)
+    fake, speaker = _speaker(tts, speed=5)
+    callbacks = Callbacks()
+    closed = threading.Event()
+
+    def reply():
+        try:
+            yield "First sentence."
+            time.sleep(0.3)
+            yield "Second sentence."
+            time.sleep(1.5)   # the model is still thinking
+            yield "Never reached."
+        finally:
+            closed.set()
+
+    try:
+        answer = speaker.speak_stream(reply(), callbacks("answer"))
+        queued = speaker.speak("Queued.", callbacks("queued"), interrupt=False)
+        queued.cancel()
+        assert queued.state == "cancelled" and queued.is_finished()
+        assert _wait_for(lambda: len(answer.sentences) == 2)
+        answer.cancel()
+        assert answer.wait(timeout=1) and answer.state == "cancelled"
+        assert not speaker.output.is_playing()
+        # The generator was closed even though it was still busy producing its next sentence.
+        assert closed.wait(timeout=3)
+        answer.cancel()   # cancelling twice is harmless
+        time.sleep(0.05)
+        assert sorted(callbacks.calls) == ["answer", "queued"]
+        assert tts.texts.count("Queued.") == 0
+    finally:
+        speaker.close()
+
+
+def test_unmute_resumes_from_position():
+    tts = FakeEdgeTTS(chunk_delay=0, seconds=3.0)
+    fake, speaker = _speaker(tts, speed=5)
+    callbacks = Callbacks()
+    try:
+        answer = speaker.speak("A long answer.", callbacks("answer"))
+        assert _wait_for(lambda: speaker.playback is not None and speaker.playback.played > RATE)
+        assert speaker.toggle_mute() is True
+        assert _wait_for(lambda: speaker.current is None and answer.state == "paused")
+        _, cut_at = answer.position
+        heard = len(fake.audio())
+        time.sleep(0.05)
+        assert not answer.is_finished() and callbacks.calls == []   # not over until it has been heard
+
+        assert speaker.toggle_mute() is False
+        assert _wait_for(lambda: speaker.current is answer)
+        assert answer.wait(timeout=10) and answer.state == "done"
+        resumed = len(fake.audio()) - heard
+        full = len(decode_mp3(tts.mp3, RATE))
+        print(f"Cut off {cut_at / RATE:.2f}s in; {resumed / RATE:.2f}s more played after unmuting")
+        # Continued from a little before the cut, not started over.
+        expected = full - (cut_at - TTS_RESUME_REWIND_SECONDS * RATE)
+        assert abs(resumed - expected) < 0.1 * RATE
+        time.sleep(0.05)
+        assert callbacks.calls == ["answer"]
+
+        # Spoken while muted: consumed in silence, then heard from the start, and finished, on unmute.
+        speaker.toggle_mute()
+        reply = speaker.speak_stream(iter(["One.", "Two."]), callbacks("reply"))
+        assert _wait_for(lambda: speaker.last_text == "One. Two." and speaker.current is None)
+        assert reply.state == "paused" and not reply.is_finished()
+        count = len(tts.texts)
+        speaker.toggle_mute()
+        assert reply.wait(timeout=10) and reply.state == "done"
+        assert tts.texts[count:] == ["One.", "Two."]
+        time.sleep(0.05)
+        assert callbacks.calls == ["answer", "reply"]
+
+        # Dropped while muted: finished then, as cancelled, and not spoken on unmute.
+        speaker.toggle_mute()
+        dropped = speaker.speak("Never heard.", callbacks("dropped"))
+        assert _wait_for(lambda: dropped.state == "paused")
+        speaker.stop()
+        assert dropped.wait(timeout=1) and dropped.state == "cancelled"
+        speaker.toggle_mute()
+        time.sleep(0.2)
+        assert "Never heard." not in tts.texts
+        assert callbacks.calls == ["answer", "reply", "dropped"]
+    finally:
+        speaker.close()
+
+
+if __name__ == "__main__":
+    test_queue_order()
+    test_rapid_speaks_fire_one_callback_each()
+    test_queued_and_priority_order()
+    test_barge_in_resumes_what_it_cut_off()
+    test_cancellation_handles()
+    test_unmute_resumes_from_position()
+    print("\n✅ Speech queue tests completed successfully!")
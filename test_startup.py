@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that subsystems load in parallel in the background, that requests
+made before a subsystem is ready are queued, and that startup timings are reported.
+"""
+
+import os
+import sys
+import time
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from core.startup import SubsystemLoader
+from ai.gemini_handler import GeminiHandler
+from fake_gemini import FakeGenAI
+
+
+def _slow(result, seconds):
+    def factory():
+        time.sleep(seconds)
+        return result
+    return factory
+
+
+def test_subsystems_load_in_parallel():
+    loader = SubsystemLoader()
+    started = time.perf_counter()
+    loader.add("speech recognition", _slow("listener", 0.4))
+    loader.add("wake word", _slow("detector", 0.4))
+    loader.add("gemini", _slow("genai", 0.4))
+    # Adding is instant: the caller (the GUI) isn't held up by the loading.
+    assert time.perf_counter() - started < 0.1
+    assert loader.states() == {"speech recognition": "loading", "wake word": "loading", "gemini": "loading"}
+
+    assert loader.get("wake word") == "detector"
+    assert loader.wait_all(timeout=2.0)
+    took = time.perf_counter() - started
+    print(f"Three 0.4 s subsystems ready after {took:.2f} s")
+    assert took < 1.0, "subsystems were loaded one after another"
+    assert all(loader.is_ready(name) for name in loader.states())
+    loader.shutdown()
+
+
+def test_requests_before_ready_are_queued():
+    loader = SubsystemLoader()
+    release = threading.Event()
+    loader.add("wake word", lambda: release.wait(2.0) and "detector")
+
+    delivered = []
+    loader.when_ready("wake word", delivered.append)
+    loader.when_ready("wake word", delivered.append)
+    time.sleep(0.1)
+    assert delivered == [], "callback ran before the subsystem was ready"
+
+    release.set()
+    assert loader.wait_all(timeout=2.0)
+    time.sleep(0.05)
+    assert delivered == ["detector", "detector"]
+
+    # Once ready, requests are served straight away.
+    loader.when_ready("wake word", delivered.append)
+    assert delivered[-1] == "detector" and len(delivered) == 3
+    loader.shutdown()
+
+
+def test_failure_state_and_timing_report():
+    states = []
+    loader = SubsystemLoader(on_state_change=lambda name, state: states.append((name, state)))
+
+    def broken():
+        raise RuntimeError("no microphone")
+
+    loader.add("wake word", broken)
+    loader.add("speech recognition", _slow("listener", 0.05))
+    skipped = []
+    loader.when_ready("wake word", skipped.append)
+    assert loader.wait_all(timeout=2.0)
+
+    assert loader.state("wake word") == "failed"
+    assert skipped == []
+    try:
+        loader.get("wake word")
+        assert False, "expected the loading error to be re-raised"
+    except RuntimeError as e:
+        assert "no microphone" in str(e)
+    assert ("wake word", "loading") in states and ("wake word", "failed") in states
+    assert ("speech recognition", "ready") in states
+
+    report = loader.report()
+    print(report)
+    assert "speech recognition" in report and "ready" in report
+    assert "failed (no microphone)" in report
+    assert set(loader.timings()) == {"wake word", "speech recognition"}
+
+    # A GUI attached later still learns the current state of everything.
+    replayed = []
+    loader.set_state_callback(lambda name, state: replayed.append((name, state)))
+    assert sorted(replayed) == [("speech recognition", "ready"), ("wake word", "failed")]
+    loader.shutdown()
+
+
+def test_gemini_library_is_imported_on_demand():
+    imports = []
+    handler = GeminiHandler(api_key="test-key")
+    # Nothing is imported when the handler is created...
+    assert handler._genai is None
+    fake = FakeGenAI(reply="Hi")
+    import ai.gemini_handler as module
+    original = module._import_genai
+    module._import_genai = lambda: imports.append(1) or fake
+    try:
+        # ...only on first use (or when the startup loader asks for it), and only once.
+        assert handler.load_library() is fake
+        assert handler.is_configured()
+        assert handler.genai is fake
+        assert imports == [1]
+    finally:
+        module._import_genai = original
+
+
+if __name__ == "__main__":
+    test_subsystems_load_in_parallel()
+    test_requests_before_ready_are_queued()
+    test_failure_state_and_timing_report()
+    test_gemini_library_is_imported_on_demand()
+    print("\n✅ Startup tests completed successfully!")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script to verify streaming transcription: partial results while speaking and a quick final decode.
+"""
+
+import os
+import sys
+import time
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from voice.streaming_transcriber import StreamingTranscriber
+
+RATE = 1000  # a low sample rate keeps the fake audio small
+
+
+class FakeWhisper:
+    """Every second of audio holds one 'word': the block's sample value is the word number."""
+
+    def __init__(self):
+        self.decoded_seconds = []
+        self.prompts = []
+
+    def __call__(self, audio, prompt):
+        self.decoded_seconds.append(len(audio) / RATE)
+        self.prompts.append(prompt)
+        segments = []
+        for start in range(0, len(audio) - RATE + 1, RATE):
+            word = int(round(audio[start] * 100))
+            segments.append((start / RATE, start / RATE + 1, f"word{word}"))
+        return segments
+
+
+def _speak(transcriber, words, delay=0.0):
+    for word in range(1, words + 1):
+        for _ in range(10):  # ten 100 ms frames per word
+            transcriber.add_audio(np.full(RATE // 10, word / 100, dtype=np.float32))
+        time.sleep(delay)
+
+
+def test_partials_and_final_transcript():
+    whisper = FakeWhisper()
+    partials = []
+    transcriber = StreamingTranscriber(whisper, samplerate=RATE, step_seconds=1.0, commit_margin=1.0,
+                                       on_partial=partials.append)
+    transcriber.start()
+    _speak(transcriber, 8, delay=0.05)
+    text = transcriber.finish()
+
+    print(f"Partials: {partials}")
+    print(f"Decoded seconds per call: {whisper.decoded_seconds}")
+    assert text == " ".join(f"word{i}" for i in range(1, 9))
+    assert partials and partials[0].startswith("word1")
+    # Committed audio is not decoded again: the final decode only covers the uncommitted tail.
+    assert whisper.decoded_seconds[-1] < 8
+    assert any(prompt.startswith("word1") for prompt in whisper.prompts)
+
+
+def test_short_utterance_and_cancel():
+    whisper = FakeWhisper()
+    transcriber = StreamingTranscriber(whisper, samplerate=RATE, step_seconds=5.0)
+    transcriber.start()
+    _speak(transcriber, 1)
+    assert transcriber.finish() == "word1"
+    assert transcriber.decodes == 1
+
+    transcriber = StreamingTranscriber(whisper, samplerate=RATE)
+    transcriber.start()
+    transcriber.cancel()
+
+
+if __name__ == "__main__":
+    test_partials_and_final_transcript()
+    test_short_utterance_and_cancel()
+    print("\n✅ Streaming transcription tests completed successfully!")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the pluggable speech-to-text backend interface.
+"""
+
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from voice.stt_backends import BACKENDS, FasterWhisperBackend, STTBackend, create_stt_backend
+
+
+class _Segment:
+    def __init__(self, start, end, text):
+        self.start, self.end, self.text = start, end, text
+
+
+class FakeCTranslate2Model:
+    """Mimics faster_whisper.WhisperModel.transcribe: a lazy segment generator plus info."""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **options):
+        self.calls.append((audio, options))
+        segments = (s for s in [_Segment(0.0, 1.2, " What time"), _Segment(1.2, 2.0, " is it?")])
+        return segments, {"language": "en"}
+
+
+def test_faster_whisper_backend_adapts_segments():
+    model = FakeCTranslate2Model()
+    backend = FasterWhisperBackend(model=model)
+    audio = np.zeros(32000, dtype=np.float32)
+
+    assert backend.transcribe_segments(audio, "earlier words") == [(0.0, 1.2, "What time"), (1.2, 2.0, "is it?")]
+    assert backend.transcribe(audio) == "What time is it?"
+    options = model.calls[0][1]
+    print(f"Decode options: {options}")
+    assert options["initial_prompt"] == "earlier words"
+    assert options["beam_size"] == 1
+    assert model.calls[1][1]["initial_prompt"] is None
+
+
+def test_backend_selection():
+    assert set(BACKENDS) == {"whisper", "faster-whisper"}
+    try:
+        create_stt_backend("vosk")
+        assert False, "expected ValueError"
+    except ValueError as e:
+        print(f"Got expected error: {e}")
+    try:
+        STTBackend()
+        assert False, "expected TypeError: transcribe_segments() is abstract"
+    except TypeError as e:
+        print(f"Got expected error: {e}")
+
+
+if __name__ == "__main__":
+    test_faster_whisper_backend_adapts_segments()
+    test_backend_selection()
+    print("\n✅ STT backend tests completed successfully!")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the pluggable text-to-speech backends: the local espeak-ng engine
+(run as fake_espeak.py), routing between backends by text length, and falling back to the
+local engine when Edge fails or is too slow, so the assistant still speaks offline.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from voice.audio_output import AudioOutput, decode_mp3
+from voice.tts_backends import EspeakBackend, TTSBackend, TTSRouter, create_tts_backend
+from voice.tts_cache import TTSCache
+from voice.tts_speaker import TTSSpeaker
+from fake_speaker import FakeSpeaker
+from fake_tts import FakeEdgeTTS
+
+FAKE_ESPEAK = f"{sys.executable} {os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_espeak.py')}"
+
+
+class BrokenTTS(TTSBackend):
+    """Edge with no network: fails before sending any audio."""
+
+    name = "edge"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def stream(self, text, voice, rate="+0%", volume="+0%"):
+        self.calls += 1
+        raise ConnectionError("Cannot connect to host speech.platform.bing.com")
+        yield
+
+
+def _synthesize(backend, text, **options):
+    async def collect():
+        chunks = []
+        async for chunk in backend.stream(text, "en-US-AriaNeural", **options):
+            chunks.append(chunk)
+        return chunks
+    return asyncio.run(collect())
+
+
+def test_espeak_backend_streams_wav():
+    log = tempfile.mktemp()
+    os.environ["FAKE_ESPEAK_LOG"] = log
+    try:
+        backend = EspeakBackend(command=FAKE_ESPEAK, voice="en-gb")
+        chunks = _synthesize(backend, "Added task: buy milk", rate="+20%", volume="-50%")
+    finally:
+        del os.environ["FAKE_ESPEAK_LOG"]
+    print(f"{len(chunks)} chunks from espeak-ng")
+    assert len(chunks) > 1 and all(chunk["format"] == "wav" for chunk in chunks)
+    samples = decode_mp3(b"".join(chunk["data"] for chunk in chunks), 24000)
+    assert abs(len(samples) / 24000 - 0.06 * len("Added task: buy milk")) < 0.05   # resampled to 24 kHz
+
+    with open(log) as f:
+        call = json.loads(f.readline())
+    assert call["text"] == "Added task: buy milk"
+    args = call["args"]
+    assert args[args.index("-v") + 1] == "en-gb"
+    assert args[args.index("-s") + 1] == "210" and args[args.index("-a") + 1] == "50"
+
+    try:
+        EspeakBackend(command="no-such-espeak-ng")
+        assert False, "expected ImportError"
+    except ImportError as e:
+        print(f"Got expected error: {e}")
+    try:
+        create_tts_backend("piper")
+        assert False, "expected ValueError"
+    except ValueError as e:
+        print(f"Got expected error: {e}")
+    try:
+        TTSBackend()
+        assert False, "expected TypeError: stream() is abstract"
+    except TypeError as e:
+        print(f"Got expected error: {e}")
+
+
+def test_router_picks_backend_by_length():
+    edge, local = FakeEdgeTTS(chunk_delay=0, seconds=0.5), EspeakBackend(command=FAKE_ESPEAK)
+    router = TTSRouter({"edge": edge, "espeak": local}, default="edge", short="espeak", short_max_chars=30)
+    assert router.select("Session ended.") is local
+    assert router.select("Here is a longer answer about the weather in Hanoi.") is edge
+
+    assert {chunk.get("format") for chunk in _synthesize(router, "Session ended.")} == {"wav"}
+    assert {chunk.get("format", "mp3") for chunk in _synthesize(router, "Here is a longer answer about the weather.")} == {"mp3"}
+    assert edge.texts == ["Here is a longer answer about the weather."]
+
+
+def test_router_falls_back_when_edge_fails_or_stalls():
+    broken = BrokenTTS()
+    router = TTSRouter({"edge": broken, "espeak": EspeakBackend(command=FAKE_ESPEAK)},
+                       default="edge", fallback="espeak")
+    chunks = _synthesize(router, "What's on my list?")
+    assert broken.calls == 1 and router.fallbacks_used == 1
+    assert chunks and all(chunk["format"] == "wav" for chunk in chunks)
+
+    # Edge is reachable but takes too long to start: don't keep the user waiting.
+    slow = FakeEdgeTTS(chunk_delay=2.0)
+    router = TTSRouter({"edge": slow, "espeak": EspeakBackend(command=FAKE_ESPEAK)},
+                       default="edge", fallback="espeak", fallback_after=0.2)
+    chunks = _synthesize(router, "What's on my list?")
+    assert router.fallbacks_used == 1 and slow.closed_early == 1 and slow.chunks_sent == 0
+    assert all(chunk["format"] == "wav" for chunk in chunks)
+
+    # Without a fallback the error is reported as before.
+    try:
+        _synthesize(TTSRouter({"edge": BrokenTTS()}, default="edge", fallback="espeak"), "Hello")
+        assert False, "expected ConnectionError"
+    except ConnectionError:
+        pass
+
+
+def test_speaker_talks_offline_without_caching_local_speech():
+    fake = FakeSpeaker(speed=50)
+    edge = FakeEdgeTTS(chunk_delay=0, seconds=0.5)
+    router = TTSRouter({"edge": BrokenTTS(), "espeak": EspeakBackend(command=FAKE_ESPEAK)},
+                       default="edge", fallback="espeak")
+    speaker = TTSSpeaker(output=AudioOutput(stream_factory=fake.factory), cache=TTSCache(tempfile.mkdtemp()),
+                         synthesizer=router)
+    try:
+        finished = threading.Event()
+        speaker.speak("Session ended.", on_finish=finished.set)
+        assert finished.wait(timeout=10)
+        assert len(fake.audio()) > 0.5 * 24000 * 0.06 * len("Session ended.")
+        assert not speaker.cache.contains("Session ended.", speaker.voice)
+
+        # Back online: Edge speaks, and its audio is cached as usual.
+        router.backends["edge"] = edge
+        finished.clear()
+        speaker.speak("Session ended.", on_finish=finished.set)
+        assert finished.wait(timeout=10)
+        assert edge.texts == ["Session ended."]
+        assert speaker.cache.contains("Session ended.", speaker.voice)
+    finally:
+        speaker.close()
+
+
+if __name__ == "__main__":
+    test_espeak_backend_streams_wav()
+    test_router_picks_backend_by_length()
+    test_router_falls_back_when_edge_fails_or_stalls()
+    test_speaker_talks_offline_without_caching_local_speech()
+    print("\n✅ TTS backend tests completed successfully!")
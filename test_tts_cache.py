@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the on-disk speech cache: content-addressed LRU files with atomic
+writes and an in-memory tier, and that TTSSpeaker plays cached phrases without synthesising
+them again, even with no TTS service at all.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from voice.audio_output import AudioOutput
+from voice.tts_cache import TTSCache
+from voice.tts_speaker import TTSSpeaker
+from fake_speaker import FakeSpeaker
+from fake_tts import FakeEdgeTTS
+
+VOICE = "en-US-AriaNeural"
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_keys_cover_everything_that_changes_the_audio():
+    key = TTSCache.make_key("Session ended.", VOICE)
+    assert TTSCache.make_key("Session   ended. ", VOICE) == key
+    assert TTSCache.make_key("Session ended!", VOICE) != key
+    assert TTSCache.make_key("Session ended.", "en-GB-RyanNeural") != key
+    assert TTSCache.make_key("Session ended.", VOICE, rate="+20%") != key
+    assert TTSCache.make_key("Session ended.", VOICE, volume="-10%") != key
+
+
+def test_memory_and_disk_tiers():
+    directory = tempfile.mkdtemp()
+    cache = TTSCache(directory, memory_entries=1)
+    cache.put("Session ended.", VOICE, "+0%", "+0%", b"mp3-a")
+    cache.put("Your to-do list is empty.", VOICE, "+0%", "+0%", b"mp3-b")
+    assert cache.get("Your to-do list is empty.", VOICE) == b"mp3-b"   # in memory
+    assert cache.get("Session ended.", VOICE) == b"mp3-a"              # pushed out of memory; read from disk
+    assert cache.get("Added task: milk", VOICE) is None
+    stats = cache.get_stats()
+    print(f"Stats: {stats}")
+    assert stats["hits"] == 2 and stats["memory_hits"] == 1 and stats["misses"] == 1
+    assert not [name for name in os.listdir(directory) if name.endswith(".tmp")]
+
+    # A new process sees the same files.
+    assert TTSCache(directory).get("Session ended.", VOICE) == b"mp3-a"
+
+
+def test_size_bound_evicts_least_recently_used():
+    directory = tempfile.mkdtemp()
+    cache = TTSCache(directory, max_bytes=3000)
+    cache.put("one", VOICE, "+0%", "+0%", b"1" * 1200)
+    time.sleep(0.01)
+    cache.put("two", VOICE, "+0%", "+0%", b"2" * 1200)
+    time.sleep(0.01)
+    assert cache.get("one", VOICE)   # "one" is now more recently used than "two"
+    cache.put("three", VOICE, "+0%", "+0%", b"3" * 1200)
+    assert cache.contains("one", VOICE) and cache.contains("three", VOICE)
+    assert not cache.contains("two", VOICE)
+    assert len(os.listdir(directory)) == 2
+    assert cache.get_stats()["bytes"] == 2400
+
+    # The LRU order survives a restart, and a leftover temporary file from a crash is removed.
+    open(os.path.join(directory, "half-written.tmp"), "wb").close()
+    reloaded = TTSCache(directory, max_bytes=1500)
+    assert reloaded.contains("three", VOICE) and not reloaded.contains("one", VOICE)
+    assert os.listdir(directory) == [TTSCache.make_key("three", VOICE) + ".mp3"]
+
+
+def _speaker(tts):
+    fake = FakeSpeaker(speed=50)
+    speaker = TTSSpeaker(output=AudioOutput(stream_factory=fake.factory), cache=TTSCache(tempfile.mkdtemp()),
+                         synthesizer=tts)
+    return fake, speaker
+
+
+def _say(speaker, text):
+    finished = threading.Event()
+    speaker.speak(text, on_finish=finished.set)
+    assert finished.wait(timeout=10)
+
+
+def test_repeated_phrase_is_not_synthesised_again():
+    tts = FakeEdgeTTS(chunk_delay=0.01, seconds=1.0)
+    fake, speaker = _speaker(tts)
+    try:
+        _say(speaker, "Added task: buy milk")
+        assert tts.texts == ["Added task: buy milk"]
+        first = len(fake.audio())
+
+        started = time.perf_counter()
+        fake.first_sound_at = None
+        _say(speaker, "Added task: buy milk")
+        print(f"Cached phrase started playing after {(fake.first_sound_at - started) * 1000:.1f} ms")
+        assert tts.texts == ["Added task: buy milk"]   # no second synthesis
+        assert len(fake.audio()) > 1.8 * first
+
+        # Offline: no TTS service at all, but cached phrases are still spoken.
+        speaker.synthesizer = None
+        played = len(fake.audio())
+        _say(speaker, "Added task: buy milk")
+        assert len(fake.audio()) > played
+
+        # Long answers are not cached.
+        speaker.synthesizer = tts
+        long_answer = "This is a long answer. " * 20
+        _say(speaker, long_answer)
+        assert not speaker.cache.contains(long_answer, speaker.voice)
+    finally:
+        speaker.close()
+
+
+def test_interrupted_phrase_is_not_cached():
+    tts = FakeEdgeTTS(chunk_delay=0.02)
+    fake, speaker = _speaker(tts)
+    try:
+        speaker.speak("Session ended.")
+        assert _wait_for(lambda: tts.chunks_sent > 2)
+        speaker.stop()
+        assert _wait_for(lambda: tts.closed_early == 1)
+        assert not speaker.cache.contains("Session ended.", speaker.voice)
+    finally:
+        speaker.close()
+
+
+def test_prewarm():
+    tts = FakeEdgeTTS(chunk_delay=0, seconds=0.5)
+    fake, speaker = _speaker(tts)
+    phrases = ["Session ended.", "Your to-do list is empty."]
+    try:
+        speaker.prewarm(phrases)
+        assert _wait_for(lambda: all(speaker.cache.contains(p, speaker.voice) for p in phrases))
+        assert fake.opened == 0   # pre-warming doesn't play anything
+        speaker.prewarm(phrases)  # already cached: nothing synthesised again
+        time.sleep(0.1)
+        assert tts.texts == phrases
+        _say(speaker, "Session ended.")
+        assert tts.texts == phrases and len(fake.audio()) > 0
+    finally:
+        speaker.close()
+
+
+def test_close_stops_prewarming():
+    tts = FakeEdgeTTS(chunk_delay=0.02)
+    fake, speaker = _speaker(tts)
+    phrases = ["Session ended.", "Your to-do list is empty.", "Timer done.", "Goodbye."]
+    speaker.prewarm(phrases)
+    assert _wait_for(lambda: len(tts.texts) == 1)
+    speaker.close()
+    assert not any(thread.is_alive() for thread in speaker._prewarming)
+    time.sleep(0.2)
+    print(f"Synthesised before close: {tts.texts}")
+    assert len(tts.texts) < len(phrases)
+    assert not speaker.worker.is_running()   # nothing started it again
+
+
+if __name__ == "__main__":
+    test_keys_cover_everything_that_changes_the_audio()
+    test_memory_and_disk_tiers()
+    test_size_bound_evicts_least_recently_used()
+    test_repeated_phrase_is_not_synthesised_again()
+    test_interrupted_phrase_is_not_cached()
+    test_prewarm()
+    test_close_stops_prewarming()
+    print("\n✅ TTS cache tests completed successfully!")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script to verify voice-activity endpointing on synthetic audio frames.
+"""
+
+import os
+import sys
+import numpy as np
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+
+from voice.vad import EnergyVAD, Endpointer
+
+RATE = 16000
+FRAME = 480  # 30 ms
+
+
+def _noise(amplitude=0.002):
+    return (np.random.default_rng(0).standard_normal(FRAME) * amplitude).astype(np.float32)
+
+
+def _speech(amplitude=0.3):
+    t = np.arange(FRAME) / RATE
+    return (np.sin(2 * np.pi * 220 * t) * amplitude).astype(np.float32)
+
+
+def _run(endpointer, frames):
+    for index, frame in enumerate(frames):
+        reason = endpointer.feed(frame)
+        if reason:
+            return reason, (index + 1) * FRAME / RATE
+    return None, len(frames) * FRAME / RATE
+
+
+def test_short_command_ends_after_trailing_silence():
+    """'stop' (0.4 s of speech) should end about 0.8 s later, not after a fixed 5 s window."""
+    endpointer = Endpointer(frame_seconds=FRAME / RATE, trailing_silence=0.8)
+    frames = [_noise()] * 10 + [_speech()] * 13 + [_noise()] * 200
+    reason, seconds = _run(endpointer, frames)
+    print(f"Ended by {reason} after {seconds:.2f}s")
+    assert reason == Endpointer.SILENCE
+    assert 1.4 < seconds < 1.6
+
+
+def test_long_question_is_not_cut_off_by_short_pauses():
+    endpointer = Endpointer(frame_seconds=FRAME / RATE, trailing_silence=0.8, max_utterance=15)
+    frames = ([_speech()] * 50 + [_noise()] * 10) * 5 + [_noise()] * 40
+    reason, seconds = _run(endpointer, frames)
+    print(f"Ended by {reason} after {seconds:.2f}s")
+    assert reason == Endpointer.SILENCE
+    assert seconds > 9
+
+
+def test_limits():
+    endpointer = Endpointer(frame_seconds=FRAME / RATE, max_utterance=2.0)
+    assert _run(endpointer, [_speech()] * 200)[0] == Endpointer.MAX_LENGTH
+
+    endpointer = Endpointer(frame_seconds=FRAME / RATE, no_speech_timeout=1.0)
+    reason, seconds = _run(endpointer, [_noise()] * 200)
+    assert reason == Endpointer.NO_SPEECH and seconds <= 1.05
+    assert not endpointer.speech_started
+
+    # A single loud click is not speech.
+    endpointer = Endpointer(frame_seconds=FRAME / RATE, no_speech_timeout=1.0)
+    assert _run(endpointer, [_noise()] * 5 + [_speech()] + [_noise()] * 100)[0] == Endpointer.NO_SPEECH
+
+
+def test_noise_floor_adapts():
+    vad = EnergyVAD(energy_ratio=3.0, min_rms=0.005)
+    for _ in range(600):
+        vad.is_speech(_noise(0.02))  # a noisy room, for about 18 seconds
+    assert not vad.is_speech(_noise(0.025))
+    assert vad.is_speech(_speech(0.3))
+
+
+if __name__ == "__main__":
+    test_short_command_ends_after_trailing_silence()
+    test_long_question_is_not_cut_off_by_short_pauses()
+    test_limits()
+    test_noise_floor_adapts()
+    print("\n✅ VAD endpointing tests completed successfully!")
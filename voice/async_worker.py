@@ -0,0 +1,90 @@
+# === Ryo AI Assistant - Async Worker ===
+# One background thread that runs a single asyncio event loop for the life of the app.
+# Speech synthesis is asynchronous (websockets), but the rest of the assistant is built on
+# threads, so instead of creating and tearing down an event loop for every utterance,
+# callers hand coroutines to this worker and get a concurrent.futures.Future back.
+# Anything that lives on the loop, like the open connection to the TTS service, is
+# therefore kept from one utterance to the next.
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, Optional
+
+
+class AsyncWorker:
+    """A thread owning one event loop; coroutines are submitted to it from any thread."""
+
+    def __init__(self, name: str = "async worker"):
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def in_worker(self) -> bool:
+        """True when called from the worker's own thread (where blocking on a future would deadlock)."""
+        return self._thread is threading.current_thread()
+
+    def start(self):
+        """Starts the loop thread if it isn't running yet. submit() calls this for you."""
+        with self._lock:
+            if self.is_running():
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self.loop = loop
+            self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def submit(self, coroutine: Awaitable) -> concurrent.futures.Future:
+        """Schedules a coroutine on the loop. Thread-safe; returns a future for its result."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Runs a coroutine on the loop and waits for its result (or exception)."""
+        if self.in_worker():
+            raise RuntimeError(f"{self.name}: run() called from the worker's own thread")
+        return self.submit(coroutine).result(timeout)
+
+    def call_soon(self, callback: Callable, *args):
+        """Runs a plain function on the loop thread."""
+        self.start()
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def stop(self, timeout: float = 5.0):
+        """Cancels whatever is still running, stops the loop and joins the thread."""
+        with self._lock:
+            loop, thread = self.loop, self._thread
+            self.loop = self._thread = None
+        if thread is None or not thread.is_alive():
+            return
+        if thread is threading.current_thread():
+            loop.stop()
+            return
+
+        async def shutdown():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await loop.shutdown_asyncgens()
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout)
+        except Exception as e:
+            print(f"[AsyncWorker] Error while shutting down {self.name}: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
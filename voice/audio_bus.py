@@ -0,0 +1,236 @@
+# === Ryo AI Assistant - Shared Microphone Bus ===
+# The microphone is opened once, when the app starts, and stays open. Every block it
+# captures goes into a ring buffer, and each part of the app that needs audio (the wake
+# word detector, the speech listener, the interrupt window, the level meter) reads from
+# that buffer at its own pace. Going from "waiting for the wake word" to "listening" is
+# just a different consumer reading the same stream: no device to close and reopen and
+# nothing to wait for while the audio system settles.
+
+import threading
+import numpy as np
+from contextlib import contextmanager
+from typing import List, Optional
+from core.config import AUDIO_SAMPLE_RATE, AUDIO_CHUNK_SIZE, AUDIO_BUFFER_SECONDS, AUDIO_INPUT_DEVICE
+try:
+    import sounddevice as sd
+except (ImportError, OSError):
+    # OSError: the package is installed but the PortAudio library it wraps is missing.
+    sd = None
+
+
+class RingBuffer:
+    """
+    A fixed-size buffer of int16 samples with one writer (the capture callback) and any
+    number of readers. Positions are absolute sample counts since capture started, so a
+    reader always knows what it has and hasn't seen. The writer never waits for readers;
+    a reader that falls more than `capacity` samples behind loses the oldest audio.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.int16)
+        self.written = 0  # total samples written so far; only the writer changes it
+        self.writing = 0  # written + the size of the write in progress; set before any sample is stored
+
+    def write(self, samples: np.ndarray):
+        n = len(samples)
+        self.writing = self.written + n
+        if n > self.capacity:
+            self.written += n - self.capacity
+            samples = samples[-self.capacity:]
+            n = self.capacity
+        start = self.written % self.capacity
+        first = min(n, self.capacity - start)
+        self._data[start:start + first] = samples[:first]
+        self._data[:n - first] = samples[first:]
+        # Published only after the samples are in place, so readers never see unwritten data.
+        self.written += n
+
+    def oldest(self) -> int:
+        """Position of the oldest sample still in the buffer."""
+        return max(0, self.written - self.capacity)
+
+    def _overwritable(self) -> int:
+        """Samples before this position may already be overwritten, by a write still in progress."""
+        return max(0, self.writing - self.capacity)
+
+    def copy(self, position: int, out: np.ndarray) -> bool:
+        """
+        Copies len(out) samples starting at position into out. Returns False if the writer
+        overwrote part of that range before or during the copy (the reader fell too far behind).
+        """
+        n = len(out)
+        if position < self._overwritable() or position + n > self.written:
+            return False
+        start = position % self.capacity
+        first = min(n, self.capacity - start)
+        out[:first] = self._data[start:start + first]
+        out[first:] = self._data[:n - first]
+        # Without locks the writer may have lapped us mid-copy. `written` only moves once a write
+        # is stored, so check against `writing`, which covers a write that had started by now.
+        return position >= self._overwritable()
+
+
+class Subscription:
+    """One consumer's cursor on the bus. It receives every sample from its start position on, in order."""
+
+    def __init__(self, bus: "AudioBus", name: str, position: int):
+        self.bus = bus
+        self.name = name
+        self.position = position
+        self.dropped = 0     # samples lost because this consumer fell behind
+        self.closed = False
+
+    def available(self) -> int:
+        """Samples captured but not read yet."""
+        return self.bus.ring.written - self.position
+
+    def read(self, count: int, timeout: Optional[float] = None, out: np.ndarray = None) -> Optional[np.ndarray]:
+        """
+        Waits for the next `count` samples and returns them as int16 (in `out` if given).
+        Returns None on timeout, or once the subscription or the bus has been closed.
+        """
+        if out is None:
+            out = np.empty(count, dtype=np.int16)
+        ring = self.bus.ring
+        while True:
+            if not self.bus.wait_for(self, self.position + count, timeout):
+                return None
+            oldest = ring.oldest()
+            if self.position < oldest:
+                self.dropped += oldest - self.position
+                self.position = oldest
+                continue
+            if ring.copy(self.position, out):
+                self.position += count
+                return out
+
+    def skip_to_now(self):
+        """Discards everything not read yet; the next read returns newly captured audio."""
+        self.position = self.bus.ring.written
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class AudioBus:
+    """The one open microphone stream, shared by every audio consumer."""
+
+    def __init__(self, samplerate: int = AUDIO_SAMPLE_RATE, blocksize: int = AUDIO_CHUNK_SIZE,
+                 buffer_seconds: float = AUDIO_BUFFER_SECONDS, device=AUDIO_INPUT_DEVICE,
+                 stream_factory=None):
+        """
+        Args:
+            samplerate (int): Capture rate in Hz (mono, int16).
+            blocksize (int): Samples per capture callback.
+            buffer_seconds (float): How much recent audio the ring buffer keeps.
+            device (str or int, optional): Input device name or index; None for the system default.
+            stream_factory (callable, optional): stream_factory(bus) -> object with start()/stop()/close()
+                                                 that calls bus.push() with captured samples. Used by tests;
+                                                 by default a sounddevice InputStream is opened.
+        """
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.device = int(device) if isinstance(device, str) and device.isdigit() else device
+        self.ring = RingBuffer(int(samplerate * buffer_seconds))
+        self.stream_factory = stream_factory or AudioBus._open_input_stream
+        self.level = 0.0          # RMS of the latest block, 0..1, for the GUI level meter
+        self._stream = None
+        self._stopped = False
+        self._subscriptions: List[Subscription] = []
+        self._cond = threading.Condition()
+        self._lock = threading.Lock()
+
+    @property
+    def position(self) -> int:
+        """Absolute position of the next sample to be captured."""
+        return self.ring.written
+
+    def is_running(self) -> bool:
+        return self._stream is not None
+
+    def start(self):
+        """Opens the microphone if it isn't open yet. Raises if the device can't be opened."""
+        with self._lock:
+            if self._stream is not None:
+                return
+            stream = self.stream_factory(self)
+            stream.start()
+            self._stream = stream
+            self._stopped = False
+            print(f"[AudioBus] Microphone open ({self.samplerate} Hz, {self.blocksize}-sample blocks)")
+
+    @contextmanager
+    def held_closed(self):
+        """
+        Yields whether the microphone is closed and, if it is, keeps it closed until the block
+        ends (start() waits meanwhile). Used to re-initialise PortAudio, which breaks every
+        open stream.
+        """
+        with self._lock:
+            yield self._stream is None
+
+    def stop(self):
+        """Closes the microphone. Waiting consumers wake up and get None."""
+        with self._lock:
+            stream, self._stream = self._stream, None
+            self._stopped = True
+        if stream is not None:
+            try:
+                stream.stop()
+                stream.close()
+            except Exception as e:
+                print(f"[AudioBus] Error closing the microphone: {e}")
+            print("[AudioBus] Microphone closed")
+        with self._cond:
+            self._cond.notify_all()
+
+    def subscribe(self, name: str, start: int = None) -> Subscription:
+        """
+        Adds a consumer that reads from `start` (an absolute position, clamped to the oldest
+        audio still buffered) or, by default, from the next captured sample.
+        """
+        position = self.position if start is None else max(start, self.ring.oldest())
+        subscription = Subscription(self, name, position)
+        with self._cond:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._cond:
+            subscription.closed = True
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+            self._cond.notify_all()
+
+    def consumers(self) -> List[str]:
+        with self._cond:
+            return [subscription.name for subscription in self._subscriptions]
+
+    def push(self, samples: np.ndarray):
+        """Adds captured int16 samples and wakes the consumers. Called from the capture callback."""
+        self.ring.write(samples)
+        if len(samples):
+            self.level = float(np.sqrt(np.mean(np.square(samples, dtype=np.float32)))) / 32768.0
+        with self._cond:
+            self._cond.notify_all()
+
+    def wait_for(self, subscription: Subscription, position: int, timeout: Optional[float] = None) -> bool:
+        """Waits until audio up to `position` has been captured. False on timeout or when closed."""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: subscription.closed or self._stopped or self.ring.written >= position,
+                timeout,
+            )
+            return not subscription.closed and not self._stopped and self.ring.written >= position
+
+    def _open_input_stream(self):
+        if sd is None:
+            raise RuntimeError("sounddevice (PortAudio) is not available")
+
+        def callback(indata, frame_count, time_info, status):
+            # Runs on the audio thread; copying into the ring buffer is all it does.
+            self.push(indata[:, 0])
+
+        return sd.InputStream(samplerate=self.samplerate, channels=1, dtype='int16',
+                              blocksize=self.blocksize, device=self.device, callback=callback)
@@ -0,0 +1,205 @@
+# === Ryo AI Assistant - Audio Device Manager ===
+# Keeps the shared microphone stream (voice/audio_bus.py) alive. A cheap background check
+# notices when the stream stops delivering audio (microphone unplugged, taken over by a
+# call, Bluetooth headset gone), closes it, and then retries every poll until an input
+# device can be opened again. As soon as it is back the consumers are told, so wake word
+# detection resumes within a poll interval instead of after fixed multi-second sleeps.
+# Finding a newly plugged-in device means re-initialising PortAudio, which breaks every
+# open stream, so rescans are rate-limited and only happen with the microphone closed and
+# no speech playing; an idle speaker stream is closed for the rescan and reopens when next used.
+
+import threading
+import time
+from contextlib import ExitStack
+from typing import Callable, Iterable, List, Optional, Tuple
+from voice.audio_bus import AudioBus, sd
+
+DeviceList = List[Tuple[int, str]]
+
+
+def list_input_devices(refresh: bool = False) -> DeviceList:
+    """
+    Returns (index, name) for every input device. PortAudio only scans for devices when it
+    is initialised, so refresh=True re-initialises it, which breaks every open stream; only
+    AudioDeviceManager does that, holding the microphone and speaker closed meanwhile.
+    """
+    if sd is None:
+        return []
+    if refresh:
+        sd._terminate()
+        sd._initialize()
+    return [(index, device["name"]) for index, device in enumerate(sd.query_devices())
+            if device["max_input_channels"] > 0]
+
+
+class AudioDeviceManager:
+    """Watches the microphone's health and re-opens it as soon as an input device is usable."""
+
+    # Health states, passed to on_health_change
+    OK = "ok"                  # audio is flowing
+    LOST = "lost"              # the stream stopped delivering audio; trying to reopen
+    NO_DEVICE = "no device"    # there is no input device at all
+    BUSY = "busy"              # input devices exist, but opening one failed
+
+    def __init__(self, audio_bus: AudioBus, poll_interval: float = 0.5, stall_timeout: float = 1.5,
+                 list_devices: Callable[[bool], DeviceList] = list_input_devices,
+                 on_health_change: Callable[[str], None] = None, outputs: Iterable = (),
+                 rescan_interval: float = 1.0):
+        """
+        Args:
+            audio_bus (AudioBus): The shared microphone stream to look after.
+            poll_interval (float): Seconds between checks.
+            stall_timeout (float): An open stream that delivers nothing for this long counts as lost.
+            list_devices (callable): list_devices(refresh) -> [(index, name), ...] (tests pass a fake).
+            on_health_change (callable, optional): Called with the new health state.
+            outputs (iterable): The AudioOutputs (speaker streams) to hold closed while rescanning.
+            rescan_interval (float): Minimum seconds between device rescans.
+        """
+        self.audio_bus = audio_bus
+        self.poll_interval = poll_interval
+        self.stall_timeout = stall_timeout
+        self.list_devices = list_devices
+        self.on_health_change = on_health_change
+        self.outputs = list(outputs)
+        self.rescan_interval = rescan_interval
+        self.state = self.OK if audio_bus.is_running() else self.LOST
+        self._ready = threading.Event()   # set while the state is OK
+        if self.state == self.OK:
+            self._ready.set()
+        self._last_rescan = None
+        self.devices: DeviceList = []
+        self.last_error = None
+        self.recoveries = 0
+        self._lost_at = None
+        self.last_recovery_seconds = None
+        self._restored_callbacks = []
+        self._device_change_callbacks = []
+        self._last_position = audio_bus.position
+        self._last_progress = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def on_restored(self, callback: Callable[[], None]):
+        """Registers a consumer to re-attach (e.g. resume wake word detection) when the microphone is back."""
+        self._restored_callbacks.append(callback)
+
+    def on_device_change(self, callback: Callable[[DeviceList, DeviceList], None]):
+        """Registers callback(added, removed), called when the list of input devices changes."""
+        self._device_change_callbacks.append(callback)
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Waits until the microphone is open and delivering audio. False on timeout."""
+        return self._ready.wait(timeout)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self.devices = self.list_devices(False)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.poll_interval + 1)
+        self._thread = None
+
+    def get_health(self) -> dict:
+        """Health of the microphone for the controller/GUI."""
+        return {
+            "state": self.state,
+            "devices": [name for _, name in self.devices],
+            "last_error": str(self.last_error) if self.last_error else None,
+            "recoveries": self.recoveries,
+            "last_recovery_seconds": self.last_recovery_seconds,
+        }
+
+    def check(self):
+        """One health check; the background thread calls this every poll_interval."""
+        if self.audio_bus.is_running():
+            position = self.audio_bus.position
+            now = time.monotonic()
+            if position != self._last_position:
+                self._last_position = position
+                self._last_progress = now
+                if self.state != self.OK:
+                    self._set_state(self.OK)
+            elif now - self._last_progress > self.stall_timeout:
+                print(f"[AudioDeviceManager] No audio for {now - self._last_progress:.1f}s; reopening the microphone")
+                self._lost_at = now
+                self.audio_bus.stop()   # consumers waiting for audio wake up and suspend
+                self._set_state(self.LOST)
+            return
+
+        if self._lost_at is None:
+            self._lost_at = time.monotonic()
+        self._refresh_devices()
+        if not self.devices:
+            self._set_state(self.NO_DEVICE)
+            return
+        try:
+            self.audio_bus.start()
+        except Exception as e:
+            self.last_error = e
+            self._set_state(self.BUSY)
+            return
+        self.recoveries += 1
+        self.last_recovery_seconds = time.monotonic() - self._lost_at
+        self._lost_at = None
+        self._last_position = self.audio_bus.position
+        self._last_progress = time.monotonic()
+        print(f"[AudioDeviceManager] Microphone back after {self.last_recovery_seconds:.2f}s")
+        self._set_state(self.OK)
+        for callback in self._restored_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[AudioDeviceManager] Re-attaching a consumer failed: {e}")
+
+    def _refresh_devices(self):
+        """
+        Rescans for input devices, at most every rescan_interval and only while it is safe to
+        re-initialise PortAudio: the microphone closed and no speech playing. Otherwise the
+        last list stands until a later poll.
+        """
+        if self._last_rescan is not None and time.monotonic() - self._last_rescan < self.rescan_interval:
+            return
+        with ExitStack() as held:
+            if not held.enter_context(self.audio_bus.held_closed()):
+                return
+            for output in self.outputs:
+                if not held.enter_context(output.held_closed()):
+                    return   # speaking; an idle speaker would have been closed for the rescan
+            self._last_rescan = time.monotonic()
+            try:
+                devices = self.list_devices(True)
+            except Exception as e:
+                self.last_error = e
+                return
+        added = [device for device in devices if device not in self.devices]
+        removed = [device for device in self.devices if device not in devices]
+        self.devices = devices
+        if added or removed:
+            print(f"[AudioDeviceManager] Input devices changed: +{[n for _, n in added]} -{[n for _, n in removed]}")
+            for callback in self._device_change_callbacks:
+                callback(added, removed)
+
+    def _set_state(self, state: str):
+        if state == self.state:
+            return
+        self.state = state
+        if state == self.OK:
+            self._ready.set()
+        else:
+            self._ready.clear()
+        print(f"[AudioDeviceManager] Microphone {state}")
+        if self.on_health_change:
+            self.on_health_change(state)
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"[AudioDeviceManager] Health check failed: {e}")
@@ -0,0 +1,19 @@
+import numpy as np
+
+
+def to_float32_mono(audio) -> np.ndarray:
+    """
+    Converts captured audio to what the speech models expect: a 1-D, contiguous
+    float32 array with samples in [-1.0, 1.0].
+
+    Float32 input is passed through without copying (only reshaped); int16 input
+    (e.g. from PyAudio) is scaled; multi-channel input is averaged down to mono.
+    """
+    audio = np.asarray(audio)
+    if audio.ndim == 2:
+        audio = audio[:, 0] if audio.shape[1] == 1 else audio.mean(axis=1)
+    if audio.dtype == np.int16:
+        audio = audio.astype(np.float32) / 32768.0
+    elif audio.dtype != np.float32:
+        audio = audio.astype(np.float32)
+    return np.ascontiguousarray(audio)
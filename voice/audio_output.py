@@ -0,0 +1,369 @@
+# === Ryo AI Assistant - Audio Output ===
+# The speaker side of voice/audio_bus.py. One output stream is opened the first time the
+# assistant speaks and then stays open, playing silence while there is nothing to say.
+# Speech is decoded in process (miniaudio) into int16 samples and handed over as a
+# Playback; starting one is appending it to a queue that the audio callback reads from,
+# with no player process to start and no file to write. Stop, flush and volume act on the
+# queue directly, so they take effect within one output block. Speech that is still being
+# synthesised goes through a StreamDecoder, which feeds each piece of the mp3 (or WAV, from
+# a local engine) to the playback as soon as it has been decoded.
+# If the stream dies under us (the device was unplugged, or PortAudio was re-initialised),
+# the audio callback stops being called; is_stalled() tells whoever is waiting on a
+# playback, and the next play() opens a fresh stream.
+
+import queue
+import threading
+import time
+import numpy as np
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+from core.config import TTS_SAMPLE_RATE, AUDIO_OUTPUT_BLOCK_SIZE, AUDIO_OUTPUT_DEVICE, AUDIO_OUTPUT_STALL_SECONDS
+from voice.audio_bus import sd
+
+try:
+    import miniaudio
+except ImportError:
+    miniaudio = None
+
+
+def decode_mp3(data: bytes, samplerate: int = TTS_SAMPLE_RATE) -> np.ndarray:
+    """Decodes a complete mp3 (or any format miniaudio knows) to int16 mono at `samplerate`."""
+    if miniaudio is None:
+        raise RuntimeError("miniaudio is not installed; run: pip install miniaudio")
+    decoded = miniaudio.decode(data, output_format=miniaudio.SampleFormat.SIGNED16,
+                               nchannels=1, sample_rate=samplerate)
+    return np.frombuffer(decoded.samples, dtype=np.int16)
+
+
+class _ByteQueue(miniaudio.StreamableSource if miniaudio else object):
+    """Encoded bytes handed from the synthesiser to the decoder; read() blocks until some arrive."""
+
+    def __init__(self):
+        self._chunks = queue.Queue()
+        self._pending = b""
+        self._ended = False
+
+    def put(self, data: Optional[bytes]):
+        self._chunks.put(data)   # None marks the end
+
+    def read(self, num_bytes: int) -> bytes:
+        # Returns whatever has arrived (up to num_bytes) rather than waiting for all of it,
+        # so the first mp3 frames are decoded as soon as they exist. b"" means the end.
+        while not self._pending and not self._ended:
+            data = self._chunks.get()
+            if data is None:
+                self._ended = True
+            else:
+                self._pending = data
+        data, self._pending = self._pending[:num_bytes], self._pending[num_bytes:]
+        return data
+
+
+class Playback:
+    """
+    One utterance on its way to the speaker. Samples can be fed while it is already playing;
+    it is done once finish() has been called and everything fed has been played, or when it
+    is cancelled.
+    """
+
+    def __init__(self, samplerate: int):
+        self.samplerate = samplerate
+        self.played = 0          # samples sent to the device so far
+        self.underruns = 0       # output blocks that found this playback waiting for more audio
+        self.cancelled = False
+        self.done = threading.Event()
+        self._chunks = deque()
+        self._offset = 0         # read position within the first chunk
+        self._skip = 0           # samples still to drop from what is fed
+        self._finished = False
+        self._callbacks = []
+        self._lock = threading.Lock()   # the audio callback reads while other threads feed or cancel
+
+    @property
+    def seconds_played(self) -> float:
+        return self.played / self.samplerate
+
+    def feed(self, samples: np.ndarray):
+        """Appends int16 samples to the end of this playback."""
+        with self._lock:
+            if self._skip:
+                dropped = min(self._skip, len(samples))
+                samples = samples[dropped:]
+                self._skip -= dropped
+            if not self.cancelled and len(samples):
+                self._chunks.append(samples)
+
+    def skip(self, samples: int):
+        """Drops the first `samples` samples fed from now on, to continue an utterance part-way through."""
+        with self._lock:
+            self._skip = max(0, samples)
+
+    def finish(self):
+        """No more samples will be fed; the playback ends once the queued ones have been played."""
+        with self._lock:
+            self._finished = True
+            ended = not self._chunks
+        if ended:
+            self._set_done()
+
+    def cancel(self):
+        """Drops whatever hasn't been played yet. Takes effect at the next output block."""
+        with self._lock:
+            self.cancelled = True
+            self._chunks.clear()
+        self._set_done()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Waits until the playback has ended. False on timeout."""
+        return self.done.wait(timeout)
+
+    def add_done_callback(self, callback):
+        """
+        Calls callback(playback) once, when the playback ends (right away if it already has).
+        It may run on the audio thread, so it must only hand the news on, not do any work.
+        """
+        with self._lock:
+            if not self.done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _set_done(self):
+        with self._lock:
+            if self.done.is_set():
+                return
+            self.done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def _read(self, out: np.ndarray) -> int:
+        """Copies up to len(out) samples into out and returns how many there were."""
+        filled = 0
+        with self._lock:
+            while filled < len(out) and self._chunks:
+                chunk = self._chunks[0]
+                n = min(len(out) - filled, len(chunk) - self._offset)
+                out[filled:filled + n] = chunk[self._offset:self._offset + n]
+                filled += n
+                self._offset += n
+                if self._offset == len(chunk):
+                    self._chunks.popleft()
+                    self._offset = 0
+            self.played += filled
+            ended = not self._chunks and self._finished
+        if ended:
+            self._set_done()
+        return filled
+
+
+class StreamDecoder:
+    """
+    Decodes an mp3 that arrives in pieces (e.g. from Communicate.stream()) on a background
+    thread and feeds the samples to a Playback as they come out, so it starts playing
+    while the rest is still being synthesised.
+    """
+
+    def __init__(self, playback: Playback, frames_per_read: int = 1024, file_format: str = "mp3"):
+        """
+        Args:
+            file_format (str): What the bytes are: "mp3" (Edge TTS) or "wav" (local engines).
+        """
+        if miniaudio is None:
+            raise RuntimeError("miniaudio is not installed; run: pip install miniaudio")
+        self.playback = playback
+        self.frames_per_read = frames_per_read
+        self.received = 0        # encoded bytes fed so far
+        self.file_format = miniaudio.FileFormat[file_format.upper()]
+        self._source = _ByteQueue()
+        self._thread = threading.Thread(target=self._decode, daemon=True)
+        self._thread.start()
+
+    def feed(self, data: bytes):
+        if data:
+            self.received += len(data)
+            self._source.put(data)
+
+    def finish(self):
+        """No more data is coming; the playback ends once the rest has been decoded and played."""
+        self._source.put(None)
+
+    def _decode(self):
+        playback = self.playback
+        try:
+            frames = miniaudio.stream_any(self._source, source_format=self.file_format,
+                                          output_format=miniaudio.SampleFormat.SIGNED16, nchannels=1,
+                                          sample_rate=playback.samplerate, frames_to_read=self.frames_per_read)
+            for block in frames:
+                if playback.cancelled:
+                    break
+                playback.feed(np.frombuffer(block, dtype=np.int16))
+        except Exception as e:
+            if self.received:   # nothing was fed when synthesis failed; that is reported elsewhere
+                print(f"[AudioOutput] Error decoding speech: {e}")
+        finally:
+            playback.finish()
+
+
+class AudioOutput:
+    """The one open speaker stream. Playbacks are played one after another, in the order queued."""
+
+    def __init__(self, samplerate: int = TTS_SAMPLE_RATE, blocksize: int = AUDIO_OUTPUT_BLOCK_SIZE,
+                 device=AUDIO_OUTPUT_DEVICE, stream_factory=None, stall_timeout: float = AUDIO_OUTPUT_STALL_SECONDS):
+        """
+        Args:
+            samplerate (int): Output rate in Hz (mono, int16). Edge TTS produces 24 kHz.
+            blocksize (int): Samples per output callback.
+            device (str or int, optional): Output device name or index; None for the system default.
+            stream_factory (callable, optional): stream_factory(output) -> object with start()/stop()/close()
+                                                 that calls output.fill() for every block. Used by tests;
+                                                 by default a sounddevice OutputStream is opened.
+            stall_timeout (float): Seconds without an output callback after which the open stream
+                                   is considered dead (see is_stalled()).
+        """
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.device = int(device) if isinstance(device, str) and device.isdigit() else device
+        self.stream_factory = stream_factory or AudioOutput._open_output_stream
+        self.volume = 1.0
+        self.stall_timeout = stall_timeout
+        self._queue = deque()
+        self._stream = None
+        self._last_fill = 0.0    # time.monotonic() of the last output callback
+        self._lock = threading.Lock()
+
+    def is_running(self) -> bool:
+        return self._stream is not None
+
+    def is_playing(self) -> bool:
+        return bool(self._queue)
+
+    def is_stalled(self) -> bool:
+        """True if the stream is open but its callback hasn't run for stall_timeout seconds."""
+        return self._stream is not None and time.monotonic() - self._last_fill > self.stall_timeout
+
+    def start(self):
+        """Opens the output device if it isn't open yet (or has died). Raises if it can't be opened."""
+        with self._lock:
+            self._start()
+
+    def _start(self):
+        # Call with the lock held.
+        if self._stream is not None:
+            if self._is_alive(self._stream):
+                return
+            print("[AudioOutput] Speaker stream died, reopening it")
+            stream, self._stream = self._stream, None
+            self._close_stream(stream)   # frees the dead stream and its callback thread
+        stream = self.stream_factory(self)
+        self._last_fill = time.monotonic()
+        stream.start()
+        self._stream = stream
+        print(f"[AudioOutput] Speaker open ({self.samplerate} Hz, {self.blocksize}-sample blocks)")
+
+    def close(self):
+        """Stops all playback and closes the output device."""
+        self.stop()
+        with self._lock:
+            stream, self._stream = self._stream, None
+        self._close_stream(stream)
+
+    @contextmanager
+    def held_closed(self):
+        """
+        Closes the device if nothing is playing and keeps it closed until the block ends:
+        play() waits meanwhile, then reopens it. Yields False, leaving it open, if something
+        is playing. Used to re-initialise PortAudio, which breaks every open stream.
+        """
+        with self._lock:
+            if self._queue:
+                yield False
+                return
+            stream, self._stream = self._stream, None
+            self._close_stream(stream)
+            yield True
+
+    @staticmethod
+    def _close_stream(stream):
+        if stream is not None:
+            try:
+                stream.stop()
+                stream.close()
+            except Exception as e:
+                print(f"[AudioOutput] Error closing the speaker: {e}")
+            print("[AudioOutput] Speaker closed")
+
+    @staticmethod
+    def _is_alive(stream) -> bool:
+        # sounddevice streams have `active`; after PortAudio is terminated it is False or raises.
+        try:
+            return bool(getattr(stream, "active", True))
+        except Exception:
+            return False
+
+    def set_volume(self, volume: float):
+        self.volume = min(max(volume, 0.0), 1.0)
+
+    def play(self, samples: np.ndarray = None) -> Playback:
+        """
+        Queues a playback behind any already queued and returns it. With samples it is complete;
+        without, feed() it and call finish() when done. Opens the device on first use.
+        """
+        playback = Playback(self.samplerate)
+        if samples is not None:
+            playback.feed(samples)
+            playback.finish()
+        with self._lock:
+            # Opened and queued in one step, so held_closed() can't close the device in between.
+            self._start()
+            self._queue.append(playback)
+        return playback
+
+    def flush(self):
+        """Drops every queued playback except the one currently playing."""
+        for playback in list(self._queue)[1:]:
+            playback.cancel()   # fill() drops cancelled playbacks when it reaches them
+
+    def stop(self):
+        """Cuts off the current playback and drops everything queued."""
+        for playback in list(self._queue):
+            playback.cancel()
+            try:
+                self._queue.remove(playback)
+            except ValueError:
+                pass
+
+    def fill(self, out: np.ndarray):
+        """Writes the next len(out) samples to play into out. Called from the output callback."""
+        self._last_fill = time.monotonic()
+        filled = 0
+        while filled < len(out):
+            try:
+                playback = self._queue[0]
+            except IndexError:   # nothing to play (or stop() emptied the queue meanwhile)
+                break
+            filled += playback._read(out[filled:])
+            if playback.done.is_set():
+                try:
+                    self._queue.remove(playback)
+                except ValueError:
+                    pass
+            elif filled < len(out):
+                # Still being synthesised: play silence rather than skipping ahead to the next one.
+                playback.underruns += 1
+                break
+        out[filled:] = 0
+        if self.volume != 1.0 and filled:
+            np.multiply(out[:filled], self.volume, out=out[:filled], casting="unsafe")
+
+    def _open_output_stream(self):
+        if sd is None:
+            raise RuntimeError("sounddevice (PortAudio) is not available")
+
+        def callback(outdata, frame_count, time_info, status):
+            # Runs on the audio thread; it only copies samples that are already decoded.
+            self.fill(outdata[:, 0])
+
+        return sd.OutputStream(samplerate=self.samplerate, channels=1, dtype='int16',
+                               blocksize=self.blocksize, device=self.device, callback=callback)
@@ -0,0 +1,158 @@
+# === Ryo AI Assistant - Edge TTS Connection ===
+# edge_tts.Communicate opens a new HTTP session, TLS handshake and websocket for every
+# utterance. The read-aloud service accepts any number of requests on one websocket, one
+# after another, so this keeps a single connection open and sends each utterance as a new
+# request on it. It speaks the same protocol as edge_tts (and reuses its helpers), and
+# yields the same {"type": "audio", "data": ...} chunks as Communicate.stream().
+# It must always be used from the same event loop (see voice/async_worker.py).
+
+import asyncio
+import ssl
+import time
+from typing import AsyncIterator, Dict, Optional
+from core.config import TTS_CONNECTION_IDLE_SECONDS
+
+try:
+    import aiohttp
+    import certifi
+    import edge_tts
+    from edge_tts import communicate as edge_communicate
+except ImportError:
+    aiohttp = certifi = edge_tts = edge_communicate = None
+
+# The headers Edge itself sends; the service rejects connections without them.
+_HEADERS = {
+    "Pragma": "no-cache",
+    "Cache-Control": "no-cache",
+    "Origin": "chrome-extension://jdiccldimpdaibmpdkjnbmckianbfold",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Accept-Language": "en-US,en;q=0.9",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+                  " (KHTML, like Gecko) Chrome/91.0.4472.77 Safari/537.36 Edg/91.0.864.41",
+}
+
+
+class EdgeConnection:
+    """One websocket to the Edge read-aloud service, kept open and reused for every utterance."""
+
+    name = "edge"
+    local = False
+
+    def __init__(self, idle_timeout: float = TTS_CONNECTION_IDLE_SECONDS):
+        """
+        Args:
+            idle_timeout (float): Reconnect instead of reusing a connection that has been idle this
+                                  long, since the service drops idle connections on its side.
+        """
+        if edge_tts is None:
+            raise RuntimeError("edge_tts is not installed; run: pip install edge-tts")
+        self.idle_timeout = idle_timeout
+        self.connections_opened = 0
+        self.requests_sent = 0
+        self._session = None
+        self._websocket = None
+        self._last_used = 0.0
+        self._ssl = None
+        self._lock = None   # created on the loop; one utterance at a time on the websocket
+
+    def is_connected(self) -> bool:
+        return self._websocket is not None and not self._websocket.closed
+
+    async def stream(self, text: str, voice: str, rate: str = "+0%", volume: str = "+0%") -> AsyncIterator[Dict]:
+        """Synthesises text and yields its audio chunks as they arrive, like Communicate.stream()."""
+        # Communicate validates the settings and expands short voice names the way Edge expects.
+        request = edge_tts.Communicate(text, voice, rate=rate, volume=volume)
+        parts = edge_communicate.split_text_by_byte_length(
+            edge_communicate.escape(edge_communicate.remove_incompatible_characters(request.text)),
+            edge_communicate.calc_max_mesg_size(request.voice, request.rate, request.volume, request.pitch),
+        )
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            for part in parts:
+                ssml = edge_communicate.mkssml(part, request.voice, request.rate, request.volume, request.pitch)
+                async for chunk in self._request(ssml):
+                    yield chunk
+
+    async def close(self):
+        await self._close_websocket()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request(self, ssml: str) -> AsyncIterator[Dict]:
+        """Sends one SSML request and yields its audio until the service reports the turn is over."""
+        for attempt in range(2):
+            reused = self.is_connected() and time.monotonic() - self._last_used < self.idle_timeout
+            websocket = self._websocket if reused else await self._connect()
+            complete = False
+            received_any = False
+            try:
+                try:
+                    await websocket.send_str(edge_communicate.ssml_headers_plus_data(
+                        edge_communicate.connect_id(), edge_communicate.date_to_string(), ssml))
+                    self.requests_sent += 1
+                except (aiohttp.ClientError, ConnectionError):
+                    if reused and attempt == 0:
+                        continue   # the service dropped the idle connection; open a new one
+                    raise
+
+                async for message in websocket:
+                    received_any = True
+                    if message.type == aiohttp.WSMsgType.TEXT:
+                        headers, _ = edge_communicate.get_headers_and_data(message.data)
+                        if headers.get(b"Path") == b"turn.end":
+                            complete = True
+                            break
+                    elif message.type == aiohttp.WSMsgType.BINARY:
+                        if len(message.data) < 2:
+                            raise edge_tts.exceptions.UnexpectedResponse("Binary message without a header length")
+                        header_length = int.from_bytes(message.data[:2], "big")
+                        yield {"type": "audio", "data": message.data[header_length + 2:]}
+                    elif message.type == aiohttp.WSMsgType.ERROR:
+                        raise edge_tts.exceptions.WebSocketError(str(message.data or "Unknown error"))
+            finally:
+                if complete:
+                    self._last_used = time.monotonic()
+                else:
+                    # Stopped mid-utterance or the connection failed: the rest of this turn would
+                    # arrive ahead of the next request's audio, so this connection can't be reused.
+                    await self._close_websocket()
+            if complete:
+                return
+            if reused and attempt == 0 and not received_any:
+                continue   # closed by the service while idle; retry once on a fresh connection
+            raise edge_tts.exceptions.WebSocketError("The connection closed before the audio was complete")
+
+    async def _connect(self):
+        await self._close_websocket()
+        if self._session is None:
+            self._session = aiohttp.ClientSession(trust_env=True)
+        url = f"{edge_communicate.WSS_URL}&ConnectionId={edge_communicate.connect_id()}"
+        if url.startswith("wss:") and self._ssl is None:
+            self._ssl = ssl.create_default_context(cafile=certifi.where())
+        self._websocket = await self._session.ws_connect(
+            url, compress=15, autoclose=True, autoping=True, headers=_HEADERS,
+            ssl=self._ssl if url.startswith("wss:") else True,
+        )
+        self.connections_opened += 1
+        # The output format is set once per connection and applies to every request on it.
+        await self._websocket.send_str(
+            f"X-Timestamp:{edge_communicate.date_to_string()}\r\n"
+            "Content-Type:application/json; charset=utf-8\r\n"
+            "Path:speech.config\r\n\r\n"
+            '{"context":{"synthesis":{"audio":{"metadataoptions":{'
+            '"sentenceBoundaryEnabled":false,"wordBoundaryEnabled":false},'
+            '"outputFormat":"audio-24khz-48kbitrate-mono-mp3"'
+            "}}}}\r\n"
+        )
+        self._last_used = time.monotonic()
+        return self._websocket
+
+    async def _close_websocket(self):
+        websocket, self._websocket = self._websocket, None
+        if websocket is not None and not websocket.closed:
+            try:
+                await websocket.close()
+            except Exception:
+                pass
@@ -0,0 +1,55 @@
+# === Ryo AI Assistant - Sentence Chunker ===
+# This file turns a stream of LLM tokens into whole sentences, so the speaker can
+# start saying the first sentence while the model is still writing the rest.
+
+import re
+from typing import Iterable, Iterator
+
+# A sentence ends at '.', '!' or '?' (optionally followed by quotes/brackets) and then whitespace.
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+')
+# Short words that end in a period without ending the sentence.
+_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e", "approx"}
+
+
+def _ends_with_abbreviation(text: str) -> bool:
+    """Checks whether a period ends an abbreviation ('Dr.') or a list number ('2.') rather than a sentence."""
+    words = text.rstrip(".").split()
+    if not words:
+        return False
+    current_line = text.rsplit("\n", 1)[-1].strip().rstrip(".")
+    return words[-1].lower() in _ABBREVIATIONS or current_line.isdigit()
+
+
+def iter_sentences(tokens: Iterable[str], max_chars: int = 200) -> Iterator[str]:
+    """
+    Groups streamed text tokens into sentences and yields each one as soon as it is complete.
+
+    Args:
+        tokens: Pieces of text in the order the model produced them.
+        max_chars: If no sentence end shows up for this long, the text is cut at the
+                   last comma or space so speech doesn't wait on a run-on sentence.
+
+    Yields:
+        Stripped, non-empty sentences. Whatever is left when the stream ends is yielded last.
+    """
+    buffer = ""
+    for token in tokens:
+        buffer += token
+        while True:
+            cut = None
+            for match in _SENTENCE_END.finditer(buffer):
+                if not _ends_with_abbreviation(buffer[:match.start() + 1]):
+                    cut = match.end()
+                    break
+            if cut is None and "\n" in buffer:
+                cut = buffer.index("\n") + 1
+            if cut is None and len(buffer) > max_chars:
+                split_at = max(buffer.rfind(", ", 0, max_chars), buffer.rfind(" ", 0, max_chars))
+                cut = split_at + 1 if split_at > 0 else max_chars
+            if cut is None:
+                break
+            sentence, buffer = buffer[:cut].strip(), buffer[cut:]
+            if sentence:
+                yield sentence
+    if buffer.strip():
+        yield buffer.strip()
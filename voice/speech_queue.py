@@ -0,0 +1,125 @@
+# === Ryo AI Assistant - Speech Queue ===
+# Everything the assistant is asked to say becomes an Utterance: a handle the caller can
+# cancel or wait on, which records how far it has been spoken so that it can pick up from
+# there after being muted or pre-empted. TTSSpeaker keeps utterances waiting to be spoken
+# in a SpeechQueue and speaks them one at a time, most urgent first.
+
+import heapq
+import itertools
+import threading
+from typing import Callable, Iterable, List, Optional, Tuple
+
+# Utterance priorities: a more urgent utterance is spoken before less urgent ones.
+PRIORITY_LOW = 0
+PRIORITY_NORMAL = 1
+PRIORITY_HIGH = 2
+
+
+class Utterance:
+    """
+    One thing to say: a text, or the sentences of a reply that is still being generated.
+    Returned by TTSSpeaker.speak() and speak_stream().
+
+    on_finish is called exactly once, when the utterance is over: it was spoken to the end
+    (`state` is then "done"), or cancelled or replaced ("cancelled"). One said while muted
+    waits, paused, until it has been heard after unmuting.
+    """
+
+    _order = itertools.count()
+
+    def __init__(self, sentences: Iterable[str], priority: int = PRIORITY_NORMAL,
+                 on_finish: Optional[Callable] = None):
+        self.priority = priority
+        self.on_finish = on_finish
+        self.order = next(Utterance._order)   # earlier utterances go first among equal priorities
+        self.sentences: List[str] = []          # the sentences taken from the source so far
+        self.state = "queued"                   # queued, speaking, paused, done, cancelled
+        self.cancelled = False
+        self.position: Tuple[int, int] = (0, 0)   # (sentence index, samples into it) to continue from
+        self.finished = threading.Event()
+        # A list of sentences is already complete; anything else (a generator streaming a
+        # reply) may block until its next sentence exists.
+        self.blocking = not isinstance(sentences, (list, tuple))
+        self._source = sentences
+        self._iterator = iter(sentences)
+        self._exhausted = False
+        self._pull = None        # the request for the next sentence, while one is in flight
+        self._playbacks = []     # (sentence index, samples skipped, Playback) for what has been queued to play
+        self._pause = False      # interrupted to be continued later rather than cancelled
+        self._silent = False     # being consumed without speaking, while muted
+        self._canceller = None
+        self._lock = threading.Lock()
+
+    @property
+    def text(self) -> str:
+        """What has been taken from the source so far (everything, once it is finished)."""
+        return " ".join(self.sentences)
+
+    def cancel(self):
+        """Stops the utterance if it is being spoken, or drops it from the queue."""
+        if self._canceller is not None:
+            self._canceller(self)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Waits until the utterance is over. False on timeout."""
+        return self.finished.wait(timeout)
+
+    def is_finished(self) -> bool:
+        return self.finished.is_set()
+
+    def _finish(self, state: str) -> bool:
+        """Marks the utterance as over. True only the first time, so on_finish can't fire twice."""
+        with self._lock:
+            if self.finished.is_set():
+                return False
+            self.state = state
+            self.finished.set()
+            return True
+
+    def _played_position(self) -> Tuple[int, int]:
+        """Where speech stopped: the first sentence not yet played to the end, and how far into it."""
+        for index, skipped, playback in list(self._playbacks):
+            if not playback.done.is_set():
+                return index, skipped + playback.played
+        if self._playbacks:
+            return self._playbacks[-1][0] + 1, 0
+        return self.position
+
+    def _close_source(self):
+        """Stops the source (e.g. the model streaming the reply) once nothing more is wanted from it."""
+        close = getattr(self._source, "close", None)
+        if close is None:
+            return
+        if self._pull is not None and not self._pull.done():
+            # A generator can't be closed while another thread is inside it; close it when it yields.
+            self._pull.add_done_callback(lambda _: close())
+        else:
+            close()
+
+
+class SpeechQueue:
+    """Utterances waiting to be spoken, most urgent first and in order of arrival within a priority."""
+
+    def __init__(self):
+        self._heap = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __iter__(self):
+        return iter([utterance for _, _, utterance in self._heap])
+
+    def push(self, utterance: Utterance):
+        # A paused utterance keeps its original place, ahead of what arrived after it.
+        heapq.heappush(self._heap, (-utterance.priority, utterance.order, utterance))
+
+    def pop(self) -> Optional[Utterance]:
+        return heapq.heappop(self._heap)[2] if self._heap else None
+
+    def remove(self, utterance: Utterance) -> bool:
+        for i, (_, _, queued) in enumerate(self._heap):
+            if queued is utterance:
+                self._heap.pop(i)
+                heapq.heapify(self._heap)
+                return True
+        return False
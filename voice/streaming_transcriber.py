@@ -0,0 +1,128 @@
+import threading
+import numpy as np
+from typing import Callable, List, Tuple
+from core.config import STT_STREAM_STEP_SECONDS
+
+
+class StreamingTranscriber:
+    """
+    Transcribes an utterance while it is still being spoken.
+
+    Every step_seconds the audio that isn't final yet is decoded again and the hypothesis
+    is reported through on_partial. Segments that come out the same in two decodes in a
+    row (and aren't right at the edge of the audio) are committed: their text is final
+    and their audio is dropped from later decodes. When the user stops talking only the
+    short uncommitted tail still needs decoding, so the final transcript arrives quickly.
+    """
+
+    def __init__(self, transcribe_segments: Callable[[np.ndarray, str], List[Tuple[float, float, str]]],
+                 samplerate: int = 16000, step_seconds: float = STT_STREAM_STEP_SECONDS,
+                 commit_margin: float = 1.0, on_partial: Callable[[str], None] = None):
+        """
+        Args:
+            transcribe_segments (callable): (float32 audio, prompt) -> [(start, end, text), ...] with
+                                            times in seconds. The prompt is the text committed so far.
+            samplerate (int): Sample rate of the audio passed to add_audio().
+            step_seconds (float): How much new audio triggers another partial decode.
+            commit_margin (float): Segments ending closer than this to the end of the audio stay tentative.
+            on_partial (callable, optional): Receives the full partial transcript after each decode.
+        """
+        self.transcribe_segments = transcribe_segments
+        self.samplerate = samplerate
+        self.step_seconds = step_seconds
+        self.commit_margin = commit_margin
+        self.on_partial = on_partial
+        self.decodes = 0
+        self._chunks = []
+        self._received = 0        # samples received so far
+        self._committed_at = 0    # samples before this point are final
+        self._committed_text = []
+        self._previous = []       # segment texts of the last decode, to check agreement
+        self._decoded_upto = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add_audio(self, frame: np.ndarray):
+        """Appends captured samples. Cheap enough to call from the audio callback."""
+        with self._lock:
+            self._chunks.append(frame)
+            self._received += len(frame)
+        if self._received - self._decoded_upto >= self.step_seconds * self.samplerate:
+            self._wake.set()
+
+    def finish(self) -> str:
+        """Stops partial decoding, decodes whatever is not final yet and returns the whole transcript."""
+        self._stop_thread()
+        audio = self._pending_audio()
+        if len(audio):
+            segments = self._decode(audio)
+            self._committed_text.extend(text for _, _, text in segments if text)
+        return " ".join(self._committed_text).strip()
+
+    def cancel(self):
+        """Stops without producing a transcript (e.g. nothing was said)."""
+        self._stop_thread()
+
+    def _stop_thread(self):
+        self._stopping = True
+        self._wake.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _pending_audio(self) -> np.ndarray:
+        with self._lock:
+            if len(self._chunks) > 1:
+                self._chunks = [np.concatenate(self._chunks)]
+            audio = self._chunks[0] if self._chunks else np.zeros(0, dtype=np.float32)
+        return audio[self._committed_at:]
+
+    def _decode(self, audio: np.ndarray):
+        self.decodes += 1
+        return self.transcribe_segments(audio, " ".join(self._committed_text))
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._stopping:
+                return
+            try:
+                self._partial_decode()
+            except Exception as e:
+                print(f"[StreamingTranscriber] Partial decode failed: {e}")
+
+    def _partial_decode(self):
+        audio = self._pending_audio()
+        self._decoded_upto = self._committed_at + len(audio)
+        if not len(audio):
+            return
+        segments = self._decode(audio)
+        if self._stopping:
+            return  # finish() will decode this audio again anyway
+
+        # Commit the leading segments that agree with the previous decode and end well before the edge.
+        edge = len(audio) / self.samplerate - self.commit_margin
+        committed = 0
+        for index, (_, end, text) in enumerate(segments):
+            if index < len(self._previous) and self._previous[index] == text and end <= edge:
+                committed = index + 1
+            else:
+                break
+        if committed:
+            self._committed_text.extend(text for _, _, text in segments[:committed] if text)
+            self._committed_at += int(segments[committed - 1][1] * self.samplerate)
+            # Timings of the remaining segments are relative to the old start; agree afresh next time.
+            self._previous = []
+        else:
+            self._previous = [text for _, _, text in segments]
+
+        if self.on_partial:
+            tentative = [text for _, _, text in segments[committed:] if text]
+            self.on_partial(" ".join(self._committed_text + tentative).strip())
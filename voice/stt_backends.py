@@ -0,0 +1,119 @@
+# === Ryo AI Assistant - Speech-to-Text Backends ===
+# WhisperListener records audio; a backend from this file turns it into text.
+# "whisper" is the original openai-whisper engine on PyTorch. "faster-whisper" runs the
+# same models through CTranslate2 with int8 weights, which is several times faster on
+# CPU-only machines and needs much less memory.
+
+import os
+import ssl
+import importlib
+import certifi
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import List, Tuple
+from core.config import STT_BACKEND, STT_MODEL_SIZE, STT_COMPUTE_TYPE, STT_CPU_THREADS
+
+Segment = Tuple[float, float, str]
+
+
+def _import_optional(name: str):
+    # The engines are imported when a backend is built, not when this module is: importing
+    # PyTorch alone takes seconds, and the backend is built on a background thread at startup.
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+class STTBackend(ABC):
+    """Interface of a speech-to-text engine. Audio is 16 kHz mono float32 in [-1, 1]."""
+
+    name = "base"
+
+    def transcribe(self, audio: np.ndarray, prompt: str = None) -> str:
+        """Returns the text spoken in the audio. prompt is earlier text the speech follows on from."""
+        return " ".join(text for _, _, text in self.transcribe_segments(audio, prompt) if text).strip()
+
+    @abstractmethod
+    def transcribe_segments(self, audio: np.ndarray, prompt: str = None) -> List[Segment]:
+        """Returns (start, end, text) segments, times in seconds from the start of the audio."""
+
+
+class OpenAIWhisperBackend(STTBackend):
+    """The original openai-whisper package (PyTorch)."""
+
+    name = "whisper"
+
+    def __init__(self, model_size: str = STT_MODEL_SIZE):
+        whisper = _import_optional("whisper")
+        if whisper is None:
+            raise ImportError("openai-whisper is not installed")
+        # Fix SSL certificate issues on macOS
+        try:
+            ssl._create_default_https_context = lambda: ssl.create_default_context(cafile=certifi.where())
+        except:
+            pass
+
+        try:
+            self.model = whisper.load_model(model_size)  # You can use "tiny", "base", "small", "medium", "large"
+        except Exception as e:
+            print(f"[ERROR] Failed to load Whisper model: {e}")
+            print("[INFO] Trying to download with SSL fix...")
+            os.environ['REQUESTS_CA_BUNDLE'] = certifi.where()
+            self.model = whisper.load_model(model_size)
+
+    def transcribe(self, audio: np.ndarray, prompt: str = None) -> str:
+        return self.model.transcribe(audio, initial_prompt=prompt or None)["text"].strip()
+
+    def transcribe_segments(self, audio: np.ndarray, prompt: str = None) -> List[Segment]:
+        result = self.model.transcribe(audio, initial_prompt=prompt or None, condition_on_previous_text=False)
+        return [(segment["start"], segment["end"], segment["text"].strip()) for segment in result["segments"]]
+
+
+class FasterWhisperBackend(STTBackend):
+    """Whisper on CTranslate2 (faster-whisper), int8-quantised on the CPU by default."""
+
+    name = "faster-whisper"
+
+    def __init__(self, model_size: str = STT_MODEL_SIZE, compute_type: str = STT_COMPUTE_TYPE,
+                 cpu_threads: int = STT_CPU_THREADS, model=None):
+        """
+        Args:
+            model_size (str): Whisper model name ("tiny", "base", "small", ...) or a converted model path.
+            compute_type (str): CTranslate2 weight type: "int8", "int8_float32", "float32"...
+            cpu_threads (int): Threads used for decoding (0 lets CTranslate2 decide).
+            model (optional): An already loaded faster_whisper.WhisperModel to reuse.
+        """
+        if model is None:
+            faster_whisper = _import_optional("faster_whisper")
+            if faster_whisper is None:
+                raise ImportError("faster-whisper is not installed")
+            model = faster_whisper.WhisperModel(model_size, device="cpu", compute_type=compute_type,
+                                                cpu_threads=cpu_threads)
+        self.model = model
+
+    def transcribe_segments(self, audio: np.ndarray, prompt: str = None) -> List[Segment]:
+        segments, _info = self.model.transcribe(
+            audio, beam_size=1, initial_prompt=prompt or None, condition_on_previous_text=False
+        )
+        # beam_size=1 is greedy decoding, like openai-whisper's default. segments is a generator:
+        # decoding happens while we iterate it.
+        return [(segment.start, segment.end, segment.text.strip()) for segment in segments]
+
+
+BACKENDS = {
+    OpenAIWhisperBackend.name: OpenAIWhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def create_stt_backend(name: str = STT_BACKEND, model_size: str = STT_MODEL_SIZE) -> STTBackend:
+    """Builds the configured backend, falling back to the other engine if its package is missing."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown STT backend '{name}'. Choose one of: {', '.join(BACKENDS)}")
+    try:
+        return BACKENDS[name](model_size=model_size)
+    except ImportError as e:
+        fallback = next(other for other in BACKENDS if other != name)
+        print(f"[WARNING] STT backend '{name}' unavailable ({e}); using '{fallback}' instead")
+        return BACKENDS[fallback](model_size=model_size)
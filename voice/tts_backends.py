@@ -0,0 +1,197 @@
+# === Ryo AI Assistant - Text-to-Speech Backends ===
+# TTSSpeaker plays whatever a backend from this file synthesises. "edge" is Microsoft's
+# neural voices over the network (voice/edge_connection.py). "espeak" is espeak-ng running
+# on this machine: it sounds robotic, but it needs no network and its first audio is ready
+# in milliseconds. TTSRouter picks the backend for each utterance (for example short
+# confirmations locally, long answers through Edge) and switches to a fallback backend when
+# the chosen one fails or is too slow to start, so the assistant is never silently mute.
+
+import asyncio
+import shlex
+import shutil
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, Optional
+from core.config import (TTS_BACKEND, TTS_SHORT_TEXT_BACKEND, TTS_SHORT_TEXT_CHARS, TTS_FALLBACK_BACKEND,
+                         TTS_FALLBACK_AFTER_SECONDS, TTS_ESPEAK_COMMAND, TTS_ESPEAK_VOICE)
+from voice.edge_connection import EdgeConnection
+
+
+class TTSBackend(ABC):
+    """
+    Interface of a speech synthesiser. stream() yields {"type": "audio", "data": bytes} chunks
+    as the audio is produced, like edge_tts.Communicate.stream(); "format" in a chunk says
+    which container the bytes are ("mp3" when it is missing).
+    """
+
+    name = "base"
+    local = False   # runs on this machine, with no network
+
+    @abstractmethod
+    def stream(self, text: str, voice: str, rate: str = "+0%", volume: str = "+0%") -> AsyncIterator[Dict]:
+        """Synthesises text; implemented as an async generator."""
+
+    async def close(self):
+        pass
+
+
+# EdgeConnection (voice/edge_connection.py) has the same interface without depending on this module.
+TTSBackend.register(EdgeConnection)
+
+
+def _percent(value: str) -> float:
+    """"+20%" -> 0.2, the way Edge expresses rate and volume."""
+    return float(value.strip().rstrip("%")) / 100
+
+
+class EspeakBackend(TTSBackend):
+    """espeak-ng, one short-lived process per utterance, streaming WAV from its stdout."""
+
+    name = "espeak"
+    local = True
+
+    def __init__(self, command: str = TTS_ESPEAK_COMMAND, voice: str = TTS_ESPEAK_VOICE):
+        """
+        Args:
+            command (str): How to run espeak-ng (a path, or a command line with extra options).
+            voice (str): An espeak-ng voice, e.g. "en-us" or "en-gb+f3". Edge voice names mean
+                         nothing to espeak-ng, so the voice passed to stream() is ignored.
+        """
+        self.command = shlex.split(command) if isinstance(command, str) else list(command)
+        if not self.command or shutil.which(self.command[0]) is None:
+            raise ImportError(f"'{self.command[0] if self.command else command}' was not found; install espeak-ng")
+        self.voice = voice
+
+    async def stream(self, text: str, voice: str = None, rate: str = "+0%", volume: str = "+0%") -> AsyncIterator[Dict]:
+        # espeak-ng speaks at 175 words per minute and amplitude 100 by default.
+        speed = max(80, round(175 * (1 + _percent(rate))))
+        amplitude = min(200, max(0, round(100 * (1 + _percent(volume)))))
+        process = await asyncio.create_subprocess_exec(
+            *self.command, "--stdout", "-v", self.voice, "-s", str(speed), "-a", str(amplitude),
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            # The text goes through stdin so that nothing in it can be taken for an option.
+            process.stdin.write(text.encode("utf-8"))
+            await process.stdin.drain()
+            process.stdin.close()
+            # espeak-ng writes the WAV while it synthesises; pass on each piece as it comes.
+            while True:
+                data = await process.stdout.read(4096)
+                if not data:
+                    break
+                yield {"type": "audio", "format": "wav", "data": data}
+            if await process.wait() != 0:
+                error = (await process.stderr.read()).decode(errors="replace").strip()
+                raise RuntimeError(f"espeak-ng exited with {process.returncode}: {error}")
+        finally:
+            if process.returncode is None:   # stopped mid-utterance
+                process.kill()
+                await process.wait()
+
+
+BACKENDS = {
+    EdgeConnection.name: EdgeConnection,
+    EspeakBackend.name: EspeakBackend,
+}
+
+
+class TTSRouter(TTSBackend):
+    """
+    Sends each utterance to one of several backends: texts of at most short_max_chars go to
+    `short`, the rest to `default`. If that backend fails, or produces no audio within
+    fallback_after seconds, the utterance is synthesised by `fallback` instead.
+    """
+
+    name = "router"
+
+    def __init__(self, backends: Dict[str, TTSBackend], default: str, short: str = None,
+                 short_max_chars: int = TTS_SHORT_TEXT_CHARS, fallback: str = None,
+                 fallback_after: float = TTS_FALLBACK_AFTER_SECONDS):
+        """
+        Args:
+            backends (dict): The available backends by name.
+            default (str): Name of the backend for everything that isn't short.
+            short (str, optional): Name of the backend for short texts; None to use `default`.
+            fallback (str, optional): Name of the backend to switch to when the chosen one fails.
+        """
+        self.backends = backends
+        self.default = default
+        self.short = short or default
+        self.short_max_chars = short_max_chars
+        self.fallback = fallback
+        self.fallback_after = fallback_after
+        self.fallbacks_used = 0
+
+    def select(self, text: str) -> TTSBackend:
+        """The backend that will speak text (before any fallback)."""
+        name = self.short if len(text.strip()) <= self.short_max_chars else self.default
+        return self.backends.get(name) or self.backends[self.default]
+
+    async def stream(self, text: str, voice: str, rate: str = "+0%", volume: str = "+0%") -> AsyncIterator[Dict]:
+        backend = self.select(text)
+        fallback = self.backends.get(self.fallback)
+        stream = backend.stream(text, voice, rate, volume)
+        if fallback is None or fallback is backend:
+            try:
+                async for chunk in stream:
+                    yield chunk
+            finally:
+                await stream.aclose()
+            return
+
+        # Hold back until the first audio: up to then the utterance can still move to the fallback.
+        early = []
+        try:
+            try:
+                await asyncio.wait_for(self._until_audio(stream, early), self.fallback_after)
+            except Exception as e:
+                reason = f"no audio after {self.fallback_after:g}s" if isinstance(e, asyncio.TimeoutError) else e
+                print(f"[DEBUG] TTS backend '{backend.name}' failed ({reason}); speaking with '{fallback.name}' instead")
+                self.fallbacks_used += 1
+                await stream.aclose()
+                stream = fallback.stream(text, voice, rate, volume)
+                early = []
+            for chunk in early:
+                yield chunk
+            async for chunk in stream:
+                yield chunk
+        finally:
+            await stream.aclose()
+
+    @staticmethod
+    async def _until_audio(stream, early: list):
+        async for chunk in stream:
+            early.append(chunk)
+            if chunk["type"] == "audio":
+                return
+        raise RuntimeError("the synthesis produced no audio")
+
+    async def close(self):
+        for backend in self.backends.values():
+            await backend.close()
+
+
+def create_tts_backend(name: str) -> TTSBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown TTS backend '{name}'. Choose one of: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def create_tts_router(default: str = TTS_BACKEND, short: str = TTS_SHORT_TEXT_BACKEND,
+                      fallback: str = TTS_FALLBACK_BACKEND) -> Optional[TTSRouter]:
+    """
+    Builds the configured backends and the router between them. Backends whose engine isn't
+    installed are left out; returns None if none of them can be built.
+    """
+    backends = {}
+    for name in dict.fromkeys(n for n in (default, short, fallback) if n):
+        try:
+            backends[name] = create_tts_backend(name)
+        except (ImportError, RuntimeError) as e:
+            print(f"[WARNING] TTS backend '{name}' unavailable ({e})")
+    if not backends:
+        return None
+    if default not in backends:
+        default = next(iter(backends))
+        print(f"[WARNING] Speaking with TTS backend '{default}' instead")
+    return TTSRouter(backends, default, short if short in backends else None, fallback=fallback)
@@ -0,0 +1,188 @@
+# === Ryo AI Assistant - Speech Cache ===
+# The assistant says the same short phrases over and over ("Session ended.", "Added task: ...").
+# Their synthesised mp3 is kept in a directory of files named after a hash of everything
+# that affects the audio (text, voice, rate, volume), so a repeated phrase plays straight
+# away, without a round-trip to the TTS service, and also works offline. The directory is
+# capped in size and trimmed least-recently-used first; the hottest entries are also kept
+# in memory so they don't even need a disk read.
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+from core.config import TTS_CACHE_DIR, TTS_CACHE_MAX_MB, TTS_CACHE_MEMORY_ENTRIES
+
+
+class TTSCache:
+    """A size-bounded LRU cache of synthesised speech on disk, with a small in-memory tier in front."""
+
+    def __init__(self, directory: str = TTS_CACHE_DIR, max_bytes: int = int(TTS_CACHE_MAX_MB * 1024 * 1024),
+                 memory_entries: int = TTS_CACHE_MEMORY_ENTRIES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        # Least recently used first: key -> size in bytes of every file in the directory
+        self._files = OrderedDict()
+        self._size = 0
+        self._memory = OrderedDict()   # key -> mp3 bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self.load()
+
+    @staticmethod
+    def make_key(text: str, voice: str, rate: str = "+0%", volume: str = "+0%") -> str:
+        """Content address of a phrase: the same words with the same settings always sound the same."""
+        text = " ".join(text.split())
+        return hashlib.sha256(f"{voice}|{rate}|{volume}|{text}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str, voice: str, rate: str = "+0%", volume: str = "+0%") -> Optional[bytes]:
+        """Returns the cached mp3 for the phrase, or None on a miss."""
+        key = self.make_key(text, voice, rate, volume)
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self._files.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return audio
+            if key not in self._files:
+                self.misses += 1
+                return None
+        try:
+            with open(self._path(key), "rb") as f:
+                audio = f.read()
+            os.utime(self._path(key))   # the file's mtime is its place in the LRU order across restarts
+        except OSError:
+            with self._lock:
+                self._forget(key)
+                self.misses += 1
+            return None
+        with self._lock:
+            if key in self._files:
+                self._files.move_to_end(key)
+            self._remember(key, audio)
+            self.hits += 1
+        return audio
+
+    def put(self, text: str, voice: str, rate: str, volume: str, audio: bytes):
+        """Stores a phrase's mp3, evicting the least recently used files beyond max_bytes."""
+        if not audio or len(audio) > self.max_bytes:
+            return
+        key = self.make_key(text, voice, rate, volume)
+        try:
+            # Written under a temporary name and renamed, so a reader never sees half a file.
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"[ERROR] Failed to save speech to the cache: {e}")
+            return
+        with self._lock:
+            self._forget(key)
+            self._files[key] = len(audio)
+            self._size += len(audio)
+            self._remember(key, audio)
+        self._trim()
+
+    def prewarm(self, phrases: Iterable[str], voice: str, rate: str, volume: str,
+                synthesize: Callable[[str], bytes], stop: Optional[threading.Event] = None) -> int:
+        """
+        Synthesises every phrase that isn't cached yet with synthesize(text). Returns how many were added.
+        If stop is given, no more phrases are started once it is set.
+        """
+        added = 0
+        for text in phrases:
+            if stop is not None and stop.is_set():
+                break
+            if self.make_key(text, voice, rate, volume) in self._files:
+                continue
+            try:
+                self.put(text, voice, rate, volume, synthesize(text))
+                added += 1
+            except Exception as e:
+                print(f"[ERROR] Failed to pre-warm '{text}': {e}")
+        return added
+
+    def contains(self, text: str, voice: str, rate: str = "+0%", volume: str = "+0%") -> bool:
+        return self.make_key(text, voice, rate, volume) in self._files
+
+    def clear(self):
+        with self._lock:
+            keys = list(self._files)
+            self._files.clear()
+            self._memory.clear()
+            self._size = 0
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._files),
+            'bytes': self._size,
+            'memory_entries': len(self._memory),
+            'hits': self.hits,
+            'memory_hits': self.memory_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / lookups * 100) if lookups > 0 else 0
+        }
+
+    def load(self):
+        """Indexes the files already in the directory, oldest access first, and trims it to size."""
+        try:
+            entries = []
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if name.endswith(".tmp"):
+                    os.remove(path)   # left over from a crash mid-write
+                elif name.endswith(".mp3"):
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, name[:-4], stat.st_size))
+            with self._lock:
+                self._files = OrderedDict((key, size) for _, key, size in sorted(entries))
+                self._size = sum(self._files.values())
+        except Exception as e:
+            print(f"[ERROR] Failed to load speech cache: {e}")
+        self._trim()
+
+    def _trim(self):
+        """Deletes the least recently used files until the directory fits in max_bytes."""
+        evicted = []
+        with self._lock:
+            while self._size > self.max_bytes and self._files:
+                oldest = next(iter(self._files))
+                self._forget(oldest)
+                evicted.append(oldest)
+        for key in evicted:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".mp3")
+
+    def _remember(self, key: str, audio: bytes):
+        """Puts an entry in the in-memory tier. Call with the lock held."""
+        self._memory[key] = audio
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _forget(self, key: str):
+        """Drops an entry from the index and the in-memory tier. Call with the lock held."""
+        size = self._files.pop(key, None)
+        if size is not None:
+            self._size -= size
+        self._memory.pop(key, None)
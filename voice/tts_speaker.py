@@ -1,136 +1,470 @@
 # === Ryo AI Assistant - Text-to-Speech Speaker ===
 # This file is responsible for converting the AI's text responses into audible speech.
+# Speech is played through the shared output stream in voice/audio_output.py while it is
+# still being synthesised: each chunk Edge TTS sends is decoded and queued as it arrives.
+# Nothing is written to disk and no player process is started. Short phrases are kept in
+# voice/tts_cache.py once synthesised, so repeats play without going to the network.
+# All synthesis runs on one long-lived event loop (voice/async_worker.py). Which engine
+# synthesises an utterance, Edge over the network or espeak-ng locally, is decided per
+# utterance by the router in voice/tts_backends.py.
+# Everything to be said goes through one scheduler on that loop: utterances wait in a
+# priority queue (voice/speech_queue.py) and are spoken one at a time, so two requests to
+# speak can never talk over each other or share state.
 
 import asyncio
+import concurrent.futures
 import threading
-import subprocess
-import os
-from core.config import BASE_DIR
-
-# Dynamically import edge_tts to handle potential import errors gracefully.
-try:
-    import edge_tts
-except ImportError:
-    edge_tts = None
+from typing import Iterable, Optional
+from core.config import TTS_CACHE_ENABLED, TTS_CACHE_MAX_TEXT_CHARS, TTS_RESUME_REWIND_SECONDS
+from voice.async_worker import AsyncWorker
+from voice.audio_output import AudioOutput, Playback, StreamDecoder, decode_mp3
+from voice.speech_queue import PRIORITY_NORMAL, SpeechQueue, Utterance
+from voice.tts_backends import create_tts_router
+from voice.tts_cache import TTSCache
 
 class TTSSpeaker:
     """Handles text-to-speech generation and playback with real-time controls."""
 
-    def __init__(self, voice: str = "en-US-AriaNeural"):
-        """Initializes the speaker, audio file directory, and playback state."""
+    def __init__(self, voice: str = "en-US-AriaNeural", output: AudioOutput = None, cache: TTSCache = None,
+                 synthesizer=None, worker: AsyncWorker = None):
+        """
+        Initializes the speaker, its audio output and speech cache, and playback state.
+
+        Args:
+            synthesizer (optional): A backend from voice/tts_backends.py, or anything else with an
+                                    async stream(text, voice, rate, volume) that yields
+                                    {"type": "audio", "data": bytes} chunks. Defaults to the
+                                    configured TTSRouter.
+            worker (AsyncWorker, optional): The event loop thread that all synthesis runs on.
+        """
         self.voice = voice
-        self.output_file = os.path.join(BASE_DIR, "assets", "response.mp3")
+        self.rate = "+0%"
+        self.volume = "+0%"
+        self.output = output or AudioOutput()
+        if cache is None and TTS_CACHE_ENABLED:
+            cache = TTSCache()
+        self.cache = cache
+        if synthesizer is None:
+            synthesizer = create_tts_router()
+        self.synthesizer = synthesizer
+        self.worker = worker or AsyncWorker("tts")
         self.is_muted = False
-        self.playback_process = None
-        self.on_finish_callback = None
+        self.playback = None
         self.last_text = None  # To remember the last thing to say
+        self.current: Optional[Utterance] = None   # the utterance being spoken (or consumed while muted)
+        self.queue = SpeechQueue()
+        self._resumable = []     # utterances consumed while muted, spoken from where they were on unmute
+        self._task = None        # the task speaking self.current
+        self._scheduler = None
+        self._wakeup = None      # set when the queue changes; created on the loop
+        self._lock = threading.Lock()   # guards queue, current and _task
+        self._closing = threading.Event()   # set by close(); pre-warming stops before its next phrase
+        self._prewarming = []               # pre-warm threads, joined by close()
+        # Reading the next sentence of a streamed reply can block until the model has written it.
+        self._sentences = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="tts-sentences")
+        # Finish callbacks run one at a time, in the order the utterances ended.
+        self._callbacks = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-callbacks")
 
-        os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
-
-        if not edge_tts:
-            print("Warning: 'edge_tts' library not found. TTS will be disabled.")
+        if not self.synthesizer:
+            print("Warning: no TTS backend is available. TTS will be disabled.")
 
-    def speak(self, text: str, on_finish: callable = None):
+    def speak(self, text: str, on_finish: callable = None, priority: int = PRIORITY_NORMAL,
+              interrupt: bool = True) -> Utterance:
         """
         Generates and speaks the given text aloud.
 
-        This method is the main entry point for making the assistant speak. It handles
-        interrupting previous speech, managing the muted state, and running the
-        entire process in a background thread to keep the application responsive.
+        This method is the main entry point for making the assistant speak. By default it
+        interrupts whatever is being said, unless that is more urgent. All the work happens
+        on the speaker's event loop thread to keep the application responsive.
 
         Args:
             text (str): The text to be spoken.
-            on_finish (callable, optional): A callback function to execute when
-                                            speaking is complete. Defaults to None.
+            on_finish (callable, optional): Called exactly once when the utterance is over: spoken,
+                                            cancelled or replaced. Spoken while muted, it is over once
+                                            it has been heard after unmuting (or dropped).
+            priority (int): PRIORITY_LOW, PRIORITY_NORMAL or PRIORITY_HIGH (voice/speech_queue.py).
+            interrupt (bool): Replace what is playing or queued at the same or a lower priority. If
+                              False, the text waits its turn; a higher priority still goes first,
+                              and what it cut off is continued afterwards.
+
+        Returns:
+            The Utterance, which can be cancelled or waited on.
         """
-        self.stop()  # Stop any previous playback before starting a new one.
-        self.on_finish_callback = on_finish
+        print(f"[DEBUG] TTS speak called with muted={self.is_muted}, text='{text[:50]}...'")
         self.last_text = text  # Remember what we need to say in case we're unmuted.
+        return self._enqueue(Utterance([text], priority, on_finish), interrupt)
 
-        print(f"[DEBUG] TTS speak called with muted={self.is_muted}, text='{text[:50]}...'")
-        if self.is_muted or not edge_tts:
-            print(f"[DEBUG] TTS skipping speech due to muted={self.is_muted} or no edge_tts={not edge_tts}")
-            if self.on_finish_callback:
-                threading.Thread(target=self.on_finish_callback, daemon=True).start()
-            return
+    def speak_stream(self, sentences, on_finish: callable = None, priority: int = PRIORITY_NORMAL,
+                     interrupt: bool = True) -> Utterance:
+        """
+        Speaks sentences as they arrive, for example from a streaming AI reply.
 
-        thread = threading.Thread(target=self._generate_and_play, args=(text,), daemon=True)
-        thread.start()
+        Sentence N+1 is synthesised while sentence N plays, and each sentence starts
+        playing with its first chunk of audio, so the reply is heard as soon as the first
+        sentence exists instead of after it has been generated and synthesised in full.
 
-    def _generate_and_play(self, text: str):
+        Args:
+            sentences (iterable): Yields the sentences to speak, in order. It is consumed
+                                  on a background thread and closed early if speech is stopped.
+            on_finish (callable, optional): Called once the last sentence has been played.
+            priority, interrupt: As for speak().
         """
-        The core worker method that handles audio generation and playback.
+        self.last_text = None
+        return self._enqueue(Utterance(sentences, priority, on_finish), interrupt)
+
+    def _enqueue(self, utterance: Utterance, interrupt: bool) -> Utterance:
+        utterance._canceller = self._cancel
+        if interrupt:
+            with self._lock:
+                replaced = [other for other in [self.current] + list(self.queue) + self._resumable
+                            if other is not None and other.priority <= utterance.priority]
+            for other in replaced:
+                self._cancel(other)
+        with self._lock:
+            current = self.current
+            if not interrupt and current and current.priority < utterance.priority:
+                # Barge in: the current utterance steps aside and continues once this one is over.
+                self._interrupt(current, pause=True)
+            self.queue.push(utterance)
+            if self._scheduler is None:
+                self._scheduler = self.worker.submit(self._run())
+        self.worker.call_soon(self._wake)
+        return utterance
+
+    def _cancel(self, utterance: Utterance):
+        """Ends an utterance: silences it right away if it is playing, or drops it from the queue."""
+        with self._lock:
+            utterance.cancelled = True
+            if utterance is self.current:
+                self._interrupt(utterance, pause=False)
+            else:
+                self.queue.remove(utterance)
+            if utterance in self._resumable:
+                self._resumable.remove(utterance)
+        self._end(utterance, "cancelled")
+
+    def _interrupt(self, utterance: Utterance, pause: bool):
         """
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+        Cuts off the current utterance within one output block and stops its task. A paused
+        utterance goes back in the queue, to continue from where it was cut off. Call with
+        the lock held.
+        """
+        if pause:
+            if not utterance._silent:   # nothing plays while muted, so the position stands
+                utterance.position = utterance._played_position()
+            utterance._pause = True
+        for _, _, playback in list(utterance._playbacks):
+            playback.cancel()
+        if not pause:
+            self.output.stop()
+            self.playback = None
+        if self._task is not None:
+            self.worker.loop.call_soon_threadsafe(self._task.cancel)
 
-            async def _main() -> None:
-                communicate = edge_tts.Communicate(text, self.voice)
-                await communicate.save(self.output_file)
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
 
-            loop.run_until_complete(_main())
-            loop.close()
+    async def _run(self):
+        """The scheduler: speaks queued utterances one at a time, most urgent first."""
+        self._wakeup = asyncio.Event()
+        while True:
+            with self._lock:
+                utterance = self.queue.pop()
+                self.current = utterance
+                if utterance is None:
+                    self._wakeup.clear()
+                else:
+                    if not utterance.finished.is_set():
+                        utterance.state = "speaking"
+                    utterance._pause = False
+                    self._task = task = asyncio.ensure_future(self._perform(utterance))
+            if utterance is None:
+                await self._wakeup.wait()
+                continue
 
-            self.playback_process = subprocess.Popen(
-                ["mpv", "--no-video", "--audio-display=no", "--no-terminal", self.output_file],
-                stdout=subprocess.DEVNULL, 
-                stderr=subprocess.DEVNULL
-            )
-            self.playback_process.wait()
+            await asyncio.wait([task])
+            state = None if task.cancelled() else task.result()
+            with self._lock:
+                self.current = self._task = None
+                if utterance._pause and not utterance.cancelled:
+                    if not utterance.finished.is_set():
+                        utterance.state = "paused"
+                    self.queue.push(utterance)
+                    continue
+                if state == "muted" and not utterance.cancelled:
+                    # Not heard yet, so not over: it is spoken, and finishes, once unmuted.
+                    utterance.state = "paused"
+                    self._resumable.append(utterance)
+                    continue
+            self._end(utterance, state or "cancelled")
 
-        except FileNotFoundError:
-            print("Error: 'mpv' command not found. Please install mpv to hear speech.")
+    async def _perform(self, utterance: Utterance) -> str:
+        """Speaks the utterance (or, while muted, consumes it in silence). Returns how it ended."""
+        try:
+            if self.is_muted:
+                await self._consume(utterance)
+                return "muted"
+            await self._say(utterance)
+            return "done"
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             print(f"An error occurred in TTS generation/playback: {e}")
+            return "done"
         finally:
-            # Ensure the playback process is completely stopped
-            if self.playback_process and self.playback_process.poll() is None:
+            if not utterance._pause:
+                for _, _, playback in list(utterance._playbacks):
+                    playback.cancel()   # whatever was queued after a stop doesn't get heard
+
+    def _end(self, utterance: Utterance, state: str):
+        """Finishes the utterance and fires its callback, if that hasn't happened yet."""
+        utterance._close_source()
+        if utterance._finish(state) and utterance.on_finish:
+            # Off the loop thread, so a callback can't hold up synthesis of what comes next.
+            self._callbacks.submit(self._call, utterance.on_finish)
+
+    @staticmethod
+    def _call(callback):
+        try:
+            callback()
+        except Exception as e:
+            print(f"[ERROR] TTS finish callback failed: {e}")
+
+    async def _say(self, utterance: Utterance):
+        """
+        Plays the utterance from its position. Each sentence gets its own playback, queued
+        on the output behind the previous one, so sentence N+1 is synthesised while sentence N
+        plays.
+        """
+        index, offset = utterance.position
+        utterance._playbacks = []
+        if index or offset:
+            print(f"[DEBUG] TTS resuming at sentence {index + 1}, {offset / self.output.samplerate:.1f}s in")
+        rewind = int(TTS_RESUME_REWIND_SECONDS * self.output.samplerate)
+        playback = None
+        while not utterance.cancelled:
+            sentence = await self._sentence(utterance, index)
+            if sentence is None:
+                break
+            skip = max(0, offset - rewind) if offset else 0
+            playback = await self._play(sentence, utterance, index, skip) or playback
+            index, offset = index + 1, 0
+        if playback:
+            await self._played(playback)
+
+    async def _consume(self, utterance: Utterance):
+        """Muted: takes every sentence from the source without speaking, so the reply still completes."""
+        print(f"[DEBUG] TTS muted, not speaking: '{utterance.text[:50] or '(streamed reply)'}...'")
+        utterance._silent = True
+        try:
+            index = len(utterance.sentences)
+            while await self._sentence(utterance, index) is not None:
+                index += 1
+        finally:
+            utterance._silent = False
+
+    async def _sentence(self, utterance: Utterance, index: int) -> Optional[str]:
+        """The utterance's sentence at index, waiting for its source to produce it if need be."""
+        while index >= len(utterance.sentences):
+            if utterance._exhausted:
+                return None
+            if utterance.blocking:
+                # The reply is a blocking generator (the model streaming it); wait for it off the loop.
+                # A request still in flight from before a pause is picked up rather than repeated.
+                if utterance._pull is None:
+                    utterance._pull = self._sentences.submit(next, utterance._iterator, None)
                 try:
-                    self.playback_process.terminate()
-                    self.playback_process.wait(timeout=1)
-                except subprocess.TimeoutExpired:
-                    self.playback_process.kill()
-                except Exception as e:
-                    print(f"Error terminating playback process: {e}")
-            self.playback_process = None
-            
-            # Add a small delay to ensure audio device is released
-            import time
-            time.sleep(0.2)
-            
-            if self.on_finish_callback:
-                self.on_finish_callback()
+                    sentence = await asyncio.shield(asyncio.wrap_future(utterance._pull))
+                finally:
+                    if utterance._pull.done():
+                        utterance._pull = None
+            else:
+                sentence = next(utterance._iterator, None)
+            if sentence is None:
+                utterance._exhausted = True
+                return None
+            utterance.sentences.append(sentence)
+            self.last_text = utterance.text
+        return utterance.sentences[index]
+
+    async def _play(self, text: str, utterance: Utterance, index: int, skip: int = 0) -> Optional[Playback]:
+        """Queues text on the output, from the cache or synthesised as it plays, and returns its playback."""
+        if utterance.cancelled:
+            return None
+        audio = self._cached(text)
+        if audio is None and not self.synthesizer:
+            print(f"[DEBUG] TTS skipping speech: no synthesizer and '{text[:50]}' isn't cached")
+            return None
+        if audio is not None:
+            playback = self.output.play(audio[skip:])
+        else:
+            playback = self.output.play()
+            playback.skip(skip)
+        utterance._playbacks.append((index, skip, playback))
+        self.playback = playback
+        if audio is None:
+            await self._synthesize_into(text, playback, utterance)
+        return playback
+
+    async def _played(self, playback: Playback):
+        """
+        Waits, without blocking the loop, until the playback has been heard or cancelled. If
+        the output stream has stopped playing anything meanwhile, the output is closed, which
+        cancels the playback; it is reopened for the next utterance.
+        """
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+
+        def resolve():
+            if not done.done():
+                done.set_result(None)
+        playback.add_done_callback(lambda _: loop.call_soon_threadsafe(resolve))
+        while not done.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(done), self.output.stall_timeout)
+            except asyncio.TimeoutError:
+                if self.output.is_stalled():
+                    print(f"[ERROR] TTS output stalled for {self.output.stall_timeout}s, giving up on this speech")
+                    self.output.close()
+
+    async def _synthesize_into(self, text: str, playback: Playback, utterance: Utterance):
+        """
+        Synthesises text and feeds each audio chunk to the playback as it arrives, so it
+        starts playing after the first chunk rather than the whole mp3. Short phrases
+        that Edge synthesised completely are added to the cache.
+        """
+        decoder = None
+        stream = self.synthesizer.stream(text, self.voice, self.rate, self.volume)
+        audio = bytearray()
+        audio_format = None
+        complete = False
+        try:
+            async for chunk in stream:
+                if utterance.cancelled or playback.cancelled:
+                    break   # stopped: closing the stream ends the synthesis too
+                if chunk["type"] == "audio":
+                    if decoder is None:
+                        # The router may have fallen back to a local engine, which sends WAV.
+                        audio_format = chunk.get("format", "mp3")
+                        decoder = StreamDecoder(playback, file_format=audio_format)
+                    decoder.feed(chunk["data"])
+                    audio.extend(chunk["data"])
+            else:
+                complete = True
+        finally:
+            await stream.aclose()
+            if decoder is not None:
+                decoder.finish()
+            else:
+                playback.finish()
+        # Local speech takes milliseconds to make again, and a cached copy would keep
+        # standing in for the Edge voice after a fallback.
+        if complete and audio_format == "mp3" and self._is_cacheable(text):
+            self.cache.put(text, self.voice, self.rate, self.volume, bytes(audio))
+
+    async def _synthesize(self, text: str) -> bytes:
+        """Synthesises text and returns the whole mp3."""
+        audio = bytearray()
+        async for chunk in self.synthesizer.stream(text, self.voice, self.rate, self.volume):
+            if chunk["type"] == "audio":
+                if chunk.get("format", "mp3") != "mp3":
+                    raise RuntimeError("only local speech is available")
+                audio.extend(chunk["data"])
+        return bytes(audio)
+
+    def _is_local(self, text: str) -> bool:
+        """Whether text is routed to a local engine, whose speech isn't cached."""
+        select = getattr(self.synthesizer, "select", None)
+        return bool(select and select(text).local)
+
+    def _is_cacheable(self, text: str) -> bool:
+        return self.cache is not None and len(text) <= TTS_CACHE_MAX_TEXT_CHARS
+
+    def _cached(self, text: str):
+        """The cached audio for text, decoded, or None if it isn't cached."""
+        if not self._is_cacheable(text):
+            return None
+        audio = self.cache.get(text, self.voice, self.rate, self.volume)
+        return None if audio is None else decode_mp3(audio, self.output.samplerate)
+
+    def prewarm(self, phrases: Iterable[str]):
+        """
+        Synthesises fixed phrases into the cache in the background, so the first time
+        they are said they already play instantly. Phrases already cached are skipped.
+        """
+        if self.cache is None or not self.synthesizer:
+            return
+
+        def worker():
+            added = self.cache.prewarm([p for p in phrases if self._is_cacheable(p) and not self._is_local(p)],
+                                       self.voice, self.rate, self.volume,
+                                       lambda text: self.worker.run(self._synthesize(text)),
+                                       stop=self._closing)
+            if added:
+                print(f"[DEBUG] TTS cache pre-warmed with {added} phrases")
+        if self._closing.is_set():
+            return
+        thread = threading.Thread(target=worker, name="tts-prewarm", daemon=True)
+        self._prewarming.append(thread)
+        thread.start()
 
     def toggle_mute(self) -> bool:
         """
         Toggles the mute state of the speaker.
+        Muting cuts speech off where it is; unmuting continues it from there (see
+        TTS_RESUME_REWIND_SECONDS) instead of starting it over. Finish callbacks wait until
+        then, so nothing counts as said before it has been heard.
         Returns the new mute state (True if muted, False if not).
         """
-        self.is_muted = not self.is_muted
-        print(f"[DEBUG] TTS toggle_mute: {'muted' if self.is_muted else 'unmuted'}")
-
-        if self.is_muted:
-            self.stop()
-        else:
-            if self.last_text:
-                print(f"[DEBUG] TTS unmuted, replaying last text: {self.last_text[:50]}...")
-                self.speak(self.last_text, self.on_finish_callback)
-        
+        with self._lock:
+            self.is_muted = not self.is_muted
+            print(f"[DEBUG] TTS toggle_mute: {'muted' if self.is_muted else 'unmuted'}")
+            current = self.current
+            if current is not None:
+                # Muting: consume the rest in silence. Unmuting: speak from where it was cut off.
+                self._interrupt(current, pause=True)
+            if not self.is_muted:
+                # Back in the queue at their original places; they finish once they have been heard.
+                for resumed in self._resumable:
+                    print(f"[DEBUG] TTS unmuted, resuming: {resumed.text[:50]}...")
+                    self.queue.push(resumed)
+                self._resumable = []
+            if self.is_muted:
+                self.output.stop()
+                self.playback = None
+        self.worker.call_soon(self._wake)
         return self.is_muted
 
     def stop(self):
         """
-        Forcefully stops any currently playing speech.
+        Forcefully stops any currently playing speech and drops everything queued.
         """
         self.last_text = None
-        
-        if self.playback_process and self.playback_process.poll() is None:
+        with self._lock:
+            utterances = [self.current] + list(self.queue) + self._resumable
+        for utterance in utterances:
+            if utterance is not None:
+                self._cancel(utterance)
+        # Silences the speaker within one output block; the device itself stays open.
+        self.output.stop()
+        self.playback = None
+
+    def close(self):
+        """Stops speaking, closes the output device and the TTS connection. Call once, when the app exits."""
+        self._closing.set()
+        self.stop()
+        # A phrase being pre-warmed is finished first; otherwise stopping the worker below would
+        # cancel it, or a pre-warm thread would start the worker again for its next phrase.
+        for thread in self._prewarming:
+            thread.join(timeout=5)
+        self.output.close()
+        close = getattr(self.synthesizer, "close", None)
+        if close and self.worker.is_running():
             try:
-                self.playback_process.terminate()
-                self.playback_process.wait(timeout=1)
-            except subprocess.TimeoutExpired:
-                self.playback_process.kill()
+                self.worker.run(close(), timeout=2)
             except Exception as e:
-                print(f"Error terminating playback process: {e}")
-        self.playback_process = None
+                print(f"Error closing the TTS connection: {e}")
+        self.worker.stop()
+        self._sentences.shutdown(wait=False)
+        self._callbacks.shutdown(wait=False)
@@ -0,0 +1,104 @@
+import numpy as np
+from typing import Optional
+from core.config import (
+    VAD_ENERGY_RATIO,
+    VAD_MIN_RMS,
+    VAD_TRAILING_SILENCE_SECONDS,
+    VAD_MAX_UTTERANCE_SECONDS,
+    VAD_NO_SPEECH_TIMEOUT_SECONDS,
+)
+
+
+class EnergyVAD:
+    """
+    Frame-level voice activity detection based on loudness (RMS energy).
+    The background noise level is learned as audio comes in, so a frame counts as speech
+    when it is clearly louder than the room, not louder than a fixed number. Reuse one
+    instance across recordings so the learned level carries over.
+    """
+
+    def __init__(self, energy_ratio: float = VAD_ENERGY_RATIO, min_rms: float = VAD_MIN_RMS,
+                 adapt_rate: float = 0.2, rise_rate: float = 0.002):
+        """
+        Args:
+            energy_ratio (float): How many times louder than the noise floor speech must be.
+            min_rms (float): Frames quieter than this are never speech (float32 samples, full scale = 1.0).
+            adapt_rate (float): How quickly the noise floor drops to a quieter room (0..1 per frame).
+            rise_rate (float): How quickly it creeps up in a louder room. Kept small so that
+                               talking for a few seconds doesn't get mistaken for background noise.
+        """
+        self.energy_ratio = energy_ratio
+        self.min_rms = min_rms
+        self.adapt_rate = adapt_rate
+        self.rise_rate = rise_rate
+        self.noise_floor = min_rms / 2
+
+    @staticmethod
+    def rms(frame: np.ndarray) -> float:
+        frame = np.asarray(frame, dtype=np.float32)
+        return float(np.sqrt(np.mean(np.square(frame)))) if frame.size else 0.0
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        level = self.rms(frame)
+        speech = level > max(self.min_rms, self.noise_floor * self.energy_ratio)
+        rate = self.adapt_rate if level < self.noise_floor else self.rise_rate
+        self.noise_floor += (level - self.noise_floor) * rate
+        return speech
+
+
+class Endpointer:
+    """Decides when the user has finished speaking, from a stream of audio frames."""
+
+    # Reasons an utterance ended, returned by feed()
+    SILENCE = "silence"          # the user spoke, then paused long enough
+    MAX_LENGTH = "max_length"    # the utterance hit the length limit
+    NO_SPEECH = "no_speech"      # nothing was said at all
+
+    def __init__(self, frame_seconds: float,
+                 trailing_silence: float = VAD_TRAILING_SILENCE_SECONDS,
+                 max_utterance: float = VAD_MAX_UTTERANCE_SECONDS,
+                 no_speech_timeout: float = VAD_NO_SPEECH_TIMEOUT_SECONDS,
+                 min_speech: float = 0.1,
+                 vad: Optional[EnergyVAD] = None):
+        """
+        Args:
+            frame_seconds (float): Duration of each frame passed to feed().
+            trailing_silence (float): Seconds of silence after speech that end the utterance.
+            max_utterance (float): Hard limit on the utterance length in seconds.
+            no_speech_timeout (float): Give up after this many seconds if nobody starts speaking.
+            min_speech (float): Seconds of continuous speech needed to count as talking (ignores clicks).
+            vad (EnergyVAD, optional): The frame classifier to use.
+        """
+        self.frame_seconds = frame_seconds
+        self.trailing_silence = trailing_silence
+        self.max_utterance = max_utterance
+        self.no_speech_timeout = no_speech_timeout
+        self.min_speech = min_speech
+        self.vad = vad or EnergyVAD()
+        self.elapsed = 0.0
+        self.speech_started = False
+        self.ended = None
+        self._speech_run = 0.0
+        self._silence_run = 0.0
+
+    def feed(self, frame: np.ndarray) -> Optional[str]:
+        """Processes one frame. Returns the end reason once the utterance is over, otherwise None."""
+        if self.ended:
+            return self.ended
+        self.elapsed += self.frame_seconds
+        if self.vad.is_speech(frame):
+            self._speech_run += self.frame_seconds
+            self._silence_run = 0.0
+            if self._speech_run >= self.min_speech:
+                self.speech_started = True
+        else:
+            self._speech_run = 0.0
+            self._silence_run += self.frame_seconds
+
+        if self.speech_started and self._silence_run >= self.trailing_silence:
+            self.ended = self.SILENCE
+        elif self.elapsed >= self.max_utterance:
+            self.ended = self.MAX_LENGTH if self.speech_started else self.NO_SPEECH
+        elif not self.speech_started and self.elapsed >= self.no_speech_timeout:
+            self.ended = self.NO_SPEECH
+        return self.ended
@@ -6,14 +6,16 @@
 
 # 'os' is used for interacting with the operating system, like checking if files exist.
 import os
-# 'struct' is used to handle binary data, which is how audio is processed.
-import struct
 # 'threading' allows us to run the listening process in the background without freezing the app.
 import threading
 # 'platform' helps us identify the operating system (e.g., macOS, Windows) to use the correct model file.
 import platform
-# 'pyaudio' is a library that allows Python to access the microphone.
-import pyaudio
+# 'time' is used to measure how long each audio frame takes to process.
+import time
+# 'ctypes' gives us a fixed block of memory in the format Porcupine's C library reads directly.
+from ctypes import c_short, c_int, byref
+# 'numpy' lets us view that same memory as an array, so audio can be copied straight into it.
+import numpy as np
 # 'pvporcupine' is the official Python library for the Porcupine wake word engine.
 import pvporcupine
 # We import the specific error class to handle exceptions gracefully.
@@ -24,36 +26,95 @@ except ImportError:
     # so the 'except' block doesn't crash the program.
     class PorcupineError(Exception):
         pass
+# The shared microphone stream. The detector reads from it instead of opening the mic itself.
+from voice.audio_bus import AudioBus
 # We import our specific configuration settings from the 'core.config' file.
 from core.config import (
     PORCUPINE_ACCESS_KEY, # Your secret key from the PicoVoice console.
     BASE_DIR              # The root directory of our project.
 )
 
-# --- Step 2: Define the WakeWordDetector Class ---
+# --- Step 2: A Reusable Audio Frame ---
+
+class PcmFrame:
+    """
+    One audio frame buffer, allocated once and reused for every frame. The samples live in a
+    ctypes array that Porcupine's C function reads directly, and `samples` is a numpy view of
+    the same memory that the audio bus copies into. Nothing is converted or allocated per frame.
+    """
+
+    def __init__(self, porcupine):
+        self.porcupine = porcupine
+        self.buffer = (c_short * porcupine.frame_length)()
+        self.samples = np.frombuffer(self.buffer, dtype=np.int16)
+        self._result = c_int()
+        self._result_ref = byref(self._result)
+        # Porcupine.process() copies the frame into a new ctypes array sample by sample; we call
+        # the C function it wraps with our buffer instead. _process_func, _handle and
+        # PicovoiceStatuses are private to pvporcupine 3.0.5 (the version pinned in
+        # requirements.txt); if any of them is missing, the public process() is used.
+        self._process_func = getattr(porcupine, "_process_func", None)
+        self._handle = getattr(porcupine, "_handle", None)
+        self._success = getattr(getattr(porcupine, "PicovoiceStatuses", None), "SUCCESS", None)
+        if self._process_func is None or self._handle is None or self._success is None:
+            self._process_func = None
+
+    def process(self) -> int:
+        """Runs Porcupine on the current samples. Returns the keyword index, or -1."""
+        if self._process_func is not None:
+            status = self._process_func(self._handle, self.buffer, self._result_ref)
+            if status is self._success:
+                return self._result.value
+        # Fallback (and, after a failed call, the library's own error): the public API,
+        # which takes a list of ints.
+        return self.porcupine.process(self.samples.tolist())
+
+
+# --- Step 3: Define the WakeWordDetector Class ---
 
 class WakeWordDetector:
     """A class dedicated to detecting a wake word using the Porcupine engine."""
 
+    # Detector states. One thread reads the shared microphone from start() to stop();
+    # pausing and resuming only flip the state, so nothing is reopened between turns.
+    LISTENING = "listening"   # running Porcupine on every frame
+    PAUSED = "paused"         # Ryo is busy with a conversation; frames are ignored
+    SUSPENDED = "suspended"   # the microphone is gone; waiting for resume()
+    STOPPED = "stopped"       # not started yet, or stopped for good
+
     # The __init__ method is the constructor. It's called when we create a new WakeWordDetector object.
-    def __init__(self, on_wake_word: callable):
+    def __init__(self, on_wake_word: callable, audio_bus: AudioBus = None):
         """
         Initializes the WakeWordDetector.
         Args:
             on_wake_word (callable): The function that should be called when the wake word is detected.
                                      This is a "callback" function.
+            audio_bus (AudioBus, optional): The shared microphone stream; a private one is made if not given.
         """
         # Store the function to call when the wake word is heard.
         self.on_wake_word = on_wake_word
         # Initialize all the components to 'None'. They will be set up in the _initialize_porcupine method.
         self.porcupine = None      # This will hold the Porcupine engine instance.
-        self.p_audio = None        # This will hold the PyAudio instance, which manages the microphone.
-        self.audio_stream = None   # This is the stream of audio data coming from the microphone.
-        self._running = False       # A flag to control the main listening loop.
+        self.audio_bus = audio_bus # The shared microphone stream we read audio from.
+        self._subscription = None  # Our reading position on the audio bus while running.
+        self.detected_at = None    # Audio bus position where the last wake word ended.
+        self._frame = None         # The reusable frame buffer (see PcmFrame).
+        # Counters that make the wake word's CPU cost measurable (see get_stats).
+        self.frames_processed = 0
+        self.processing_seconds = 0.0
+        self.max_frame_seconds = 0.0
+        self._dropped_samples = 0  # from earlier runs; the current subscription counts its own
+        self._state = self.STOPPED
+        self._listening = threading.Event()  # set while the state is LISTENING
+        self._skip_to_now = False   # drop audio that arrived while paused before listening again
+        self._stopping = False      # tells the detection thread to exit
         self._thread = None         # This will hold the background thread object.
+        self.on_state_change = None # Optional callback(state), e.g. for the GUI.
 
         # Call the private method to set up Porcupine. The underscore indicates it's for internal use.
         self._initialize_porcupine()
+        if self.audio_bus is None:
+            self.audio_bus = AudioBus(samplerate=self.porcupine.sample_rate if self.porcupine else 16000)
 
     def _initialize_porcupine(self):
         """Sets up the Porcupine engine and the microphone audio stream."""
@@ -73,17 +134,14 @@ class WakeWordDetector:
                 sensitivities=[0.90]
             )
 
-            self.p_audio = pyaudio.PyAudio()
             print("Wake word detector initialized successfully.")
 
         except PorcupineError as e:
             print(f"Failed to initialize Porcupine: {e}")
             self.porcupine = None
-            self.p_audio = None
         except Exception as e:
             print(f"An unexpected error occurred during Porcupine initialization: {e}")
             self.porcupine = None
-            self.p_audio = None
 
     def _get_keyword_paths(self):
         """
@@ -123,100 +181,35 @@ class WakeWordDetector:
         return [pvporcupine.KEYWORD_PATHS['porcupine']]
 
     def start(self):
-        """Starts the wake word detection process in a separate, non-blocking thread."""
+        """
+        Starts wake word detection. The first call opens the shared microphone and starts the
+        detection thread, which then lives until stop(); later calls just resume listening.
+        """
         print(f"[DEBUG] WakeWordDetector.start() called")
-        
+
         # If Porcupine failed to initialize, we can't start.
         if not self.porcupine:
             print("Wake word detection disabled (no Porcupine access key or initialization failed)")
             return
 
-        # If the detector is already running, don't start another one.
-        if self._running:
-            print("[WakeWordDetector] Already running.")
-            return
-
-        # Ensure any existing thread is properly stopped
+        # The detection thread is already there: going back to listening is just a state change.
         if self._thread and self._thread.is_alive():
-            print("[DEBUG] Stopping existing thread before restart")
-            self.stop()
-            import time
-            time.sleep(0.1)  # Brief pause to ensure cleanup
+            self.resume()
+            return
 
-        # Open a fresh audio stream each time we start.
+        # The microphone stays open between runs; starting only needs a reading position on it.
         try:
-            print(f"[DEBUG] Attempting to open audio stream...")
-            print(f"[DEBUG] Sample rate: {self.porcupine.sample_rate}")
-            print(f"[DEBUG] Frame length: {self.porcupine.frame_length}")
-            print(f"[DEBUG] PyAudio instance: {self.p_audio}")
-            
-            self.audio_stream = self.p_audio.open(
-                rate=self.porcupine.sample_rate,
-                channels=1,
-                format=pyaudio.paInt16,
-                input=True,
-                frames_per_buffer=self.porcupine.frame_length
-            )
-            print(f"[DEBUG] Audio stream opened successfully")
+            self.audio_bus.start()
         except Exception as e:
-            error_msg = str(e).lower()
-            print(f"Failed to open audio stream for wake word detector: {e}")
-            print(f"[DEBUG] Audio stream error details: {type(e).__name__}: {e}")
-            
-            # Check if it's a device busy error (common with FaceTime, calls, etc.)
-            if "busy" in error_msg or "10863" in error_msg or "cannot do in current context" in error_msg:
-                print("[WARNING] Audio device appears to be busy (possibly due to FaceTime, calls, or other audio apps)")
-                print("[INFO] Wake word detection will be disabled until audio device is available")
-                return
-            
-            # Try to reinitialize PyAudio and try again
-            try:
-                print(f"[DEBUG] Attempting to reinitialize PyAudio...")
-                if self.p_audio:
-                    self.p_audio.terminate()
-                self.p_audio = pyaudio.PyAudio()
-                print(f"[DEBUG] PyAudio reinitialized, trying again...")
-                
-                self.audio_stream = self.p_audio.open(
-                    rate=self.porcupine.sample_rate,
-                    channels=1,
-                    format=pyaudio.paInt16,
-                    input=True,
-                    frames_per_buffer=self.porcupine.frame_length
-                )
-                print(f"[DEBUG] Audio stream opened successfully after reinitialization")
-            except Exception as e2:
-                error_msg2 = str(e2).lower()
-                if "busy" in error_msg2 or "10863" in error_msg2 or "cannot do in current context" in error_msg2:
-                    print("[WARNING] Audio device still busy after PyAudio reinitialization")
-                    print("[INFO] Wake word detection will be disabled until audio device is available")
-                    return
-                print(f"Failed to reinitialize PyAudio: {e2}")
-                # Try one more time with a fresh PyAudio instance
-                try:
-                    print(f"[DEBUG] Final attempt with fresh PyAudio...")
-                    if self.p_audio:
-                        self.p_audio.terminate()
-                    self.p_audio = pyaudio.PyAudio()
-                    self.audio_stream = self.p_audio.open(
-                        rate=self.porcupine.sample_rate,
-                        channels=1,
-                        format=pyaudio.paInt16,
-                        input=True,
-                        frames_per_buffer=self.porcupine.frame_length
-                    )
-                    print(f"[DEBUG] Audio stream opened successfully on final attempt")
-                except Exception as e3:
-                    error_msg3 = str(e3).lower()
-                    if "busy" in error_msg3 or "10863" in error_msg3 or "cannot do in current context" in error_msg3:
-                        print("[WARNING] Audio device busy on final attempt")
-                        print("[INFO] Wake word detection will be disabled until audio device is available")
-                    else:
-                        print(f"All attempts to open audio stream failed: {e3}")
-                    return
+            print(f"Failed to open the microphone for wake word detection: {e}")
+            self._set_state(self.SUSPENDED)
+            return
+        self._subscription = self.audio_bus.subscribe("wake word")
+        if self._frame is None or self._frame.porcupine is not self.porcupine:
+            self._frame = PcmFrame(self.porcupine)
 
-        # Set the running flag to True to start the loop in the thread.
-        self._running = True
+        self._stopping = False
+        self._set_state(self.LISTENING)
         # Create a new thread. 'target' is the function the thread will run.
         # 'daemon=True' means the thread will automatically exit when the main program ends.
         self._thread = threading.Thread(target=self._run, daemon=True)
@@ -224,110 +217,171 @@ class WakeWordDetector:
         self._thread.start()
         print("Wake word detector started...")
 
+    def pause(self):
+        """Stops reacting to the wake word (e.g. while Ryo is listening or speaking). O(1): the stream stays open."""
+        if self._state == self.LISTENING:
+            self._set_state(self.PAUSED)
+
+    def resume(self):
+        """Goes back to listening for the wake word, starting from the current audio (nothing stale is replayed)."""
+        if self._state == self.STOPPED:
+            self.start()
+            return
+        if self._state == self.SUSPENDED:
+            # The microphone went away; try to get it back before listening again.
+            try:
+                self.audio_bus.start()
+            except Exception as e:
+                print(f"[WakeWordDetector] Microphone still unavailable: {e}")
+                return
+        self._skip_to_now = True
+        self._set_state(self.LISTENING)
+
+    def suspend(self):
+        """Marks the detector as waiting for the microphone to come back (see resume)."""
+        if self._state != self.STOPPED:
+            self._set_state(self.SUSPENDED)
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def _set_state(self, state: str):
+        if state == self._state:
+            return
+        self._state = state
+        # The detection thread only runs Porcupine while this is set; otherwise it sleeps on it.
+        if state == self.LISTENING:
+            self._listening.set()
+        else:
+            self._listening.clear()
+        print(f"[WakeWordDetector] {state}")
+        if self.on_state_change:
+            self.on_state_change(state)
+
     def _run(self):
         """The main loop that continuously reads audio from the mic and checks for the wake word."""
         print("[WakeWordDetector] Listening for wake word...")
         print(f"[DEBUG] Wake word detection thread started, porcupine: {self.porcupine is not None}")
-        
-        # This loop will continue as long as the 'running' flag is True.
-        while self._running:
+        subscription = self._subscription
+        frame = self._frame
+        frame_length = self.porcupine.frame_length
+
+        # This loop runs until stop(); while paused or suspended it just waits.
+        while not self._stopping:
             try:
-                # Read a chunk of audio data from the microphone stream.
-                # We set exception_on_overflow=False to prevent crashes if the CPU is busy
-                # and can't process the audio data in time. It just drops the old data.
-                pcm = self.audio_stream.read(self.porcupine.frame_length, exception_on_overflow=False)
-                # Convert the raw audio data (bytes) into a list of 16-bit integers that Porcupine can understand.
-                pcm = struct.unpack_from("h" * self.porcupine.frame_length, pcm)
+                if not self._listening.wait(timeout=0.5):
+                    continue
+                if self._skip_to_now:
+                    # Audio captured while we were paused is of no interest; jump to the present.
+                    self._skip_to_now = False
+                    subscription.skip_to_now()
+
+                # Wait for the next frame of 16-bit samples from the shared microphone stream.
+                # If we ever fall behind, the bus skips the oldest audio rather than blocking capture.
+                # The samples are copied straight into the frame buffer Porcupine reads.
+                if subscription.read(frame_length, timeout=0.5, out=frame.samples) is None:
+                    if subscription.closed:
+                        break  # stopped
+                    if not self.audio_bus.is_running():
+                        self.suspend()  # the microphone went away; resume() once it is back
+                    continue
+                if self._state != self.LISTENING:
+                    continue  # paused while this frame was arriving
 
                 # Feed the audio chunk into the Porcupine engine.
-                keyword_index = self.porcupine.process(pcm)
+                started = time.perf_counter()
+                keyword_index = frame.process()
+                took = time.perf_counter() - started
+                self.frames_processed += 1
+                self.processing_seconds += took
+                if took > self.max_frame_seconds:
+                    self.max_frame_seconds = took
 
                 # The 'process' method returns -1 if no keyword is detected.
                 # It returns 0 or greater if a keyword is found (0 corresponds to the first keyword in our list).
                 if keyword_index >= 0:
                     print("Wake word detected!")
+                    # Whatever the user says next starts here; the listener picks up from this point.
+                    self.detected_at = subscription.position
+                    # Stay paused until the conversation is over and resume() is called.
+                    self.pause()
                     # Call the callback function that was passed to __init__.
                     self.on_wake_word()
-                    self._running = False  # Allow restart after detection
-                    break # Exit the loop to stop the thread.
-            except IOError as e:
-                # This error can happen if the audio stream is closed while we're trying to read from it.
-                if self._running:
-                    print(f"Audio stream error: {e}")
-                break # Exit the loop to stop the thread.
             except Exception as e:
                 print(f"An unexpected error occurred in the run loop: {e}")
+        subscription.close()
+        self._dropped_samples += subscription.dropped
         print("[WakeWordDetector] Exiting listening thread.")
 
+    def get_stats(self) -> dict:
+        """
+        Frames processed and dropped (because detection fell behind the microphone), and the
+        time Porcupine takes per frame. cpu_load is that time as a fraction of the frame's duration.
+        """
+        frame_length = self.porcupine.frame_length if self.porcupine else 512
+        sample_rate = self.porcupine.sample_rate if self.porcupine else 16000
+        dropped = self._dropped_samples
+        if self._state != self.STOPPED and self._subscription:
+            dropped += self._subscription.dropped
+        average = self.processing_seconds / self.frames_processed if self.frames_processed else 0.0
+        return {
+            "frames_processed": self.frames_processed,
+            "frames_dropped": dropped // frame_length,
+            "avg_frame_ms": average * 1000,
+            "max_frame_ms": self.max_frame_seconds * 1000,
+            "cpu_load": average / (frame_length / sample_rate),
+        }
+
     def is_running(self) -> bool:
-        """Checks if the wake word detection thread is currently running."""
-        return self._thread is not None and self._thread.is_alive()
+        """Checks if the detector is currently listening for the wake word."""
+        return self._state == self.LISTENING
 
     def stop(self):
-        """Stops the wake word detection thread and cleanly closes the audio stream."""
-        if not self._running:
+        """Ends the detection thread for good (use pause() between turns). The shared microphone stays open."""
+        if self._state == self.STOPPED:
             return
         print("[WakeWordDetector] Stopping...")
-        self._running = False
-        if self._thread:
+        self._stopping = True
+        self._set_state(self.STOPPED)
+        if self._subscription:
+            # Leaving the bus wakes the thread if it is waiting for audio.
+            self._subscription.close()
+        self._listening.set()  # ...and this if it is paused
+        if self._thread and self._thread is not threading.current_thread():
             self._thread.join(timeout=1) # Wait for the thread to finish cleanly.
-            self._thread = None
-
-        # Close the stream to release the microphone for other components.
-        if self.audio_stream:
-            try:
-                if self.audio_stream.is_active():
-                    self.audio_stream.stop_stream()
-                self.audio_stream.close()
-            except Exception as e:
-                print(f"Error closing audio stream: {e}")
-            finally:
-                self.audio_stream = None
-
-        # Add a small delay to ensure audio device is fully released
-        import time
-        time.sleep(0.1)
+        self._thread = None
         print("Wake word detector stopped.")
 
     def force_restart(self):
         """Force restart the wake word detector by stopping and starting it."""
         print("[DEBUG] Force restarting wake word detector...")
         self.stop()
-        import time
-        time.sleep(0.5)  # Wait for cleanup
         self.start()
 
-    def start_with_retry(self, max_retries=5, retry_delay=10):
-        """Start wake word detection with automatic retry if audio device is busy"""
-        print(f"[DEBUG] Starting wake word detection with retry (max {max_retries} attempts, {retry_delay}s delay)")
-        
+    def start_with_retry(self, device_manager, max_retries=5, retry_delay=10):
+        """
+        Starts wake word detection, retrying whenever the microphone becomes usable again
+        rather than on a fixed timer.
+
+        Args:
+            device_manager (AudioDeviceManager): The running manager of this detector's audio bus;
+                                                 each retry waits for it to report the microphone ready.
+            max_retries (int): Attempts before giving up.
+            retry_delay (float): The longest to wait for the microphone between attempts.
+        """
+        print(f"[DEBUG] Starting wake word detection with retry (max {max_retries} attempts, up to {retry_delay}s apart)")
+
         def retry_worker():
-            import time
             for attempt in range(max_retries):
-                try:
-                    print(f"[DEBUG] Attempt {attempt + 1}/{max_retries} to start wake word detection")
-                    self.start()
-                    
-                    # Check if it actually started
-                    if self.is_running():
-                        print(f"[DEBUG] Wake word detection started successfully on attempt {attempt + 1}")
-                        return
-                    else:
-                        print(f"[DEBUG] Wake word detection failed to start on attempt {attempt + 1}")
-                        
-                except Exception as e:
-                    error_msg = str(e).lower()
-                    if "busy" in error_msg or "10863" in error_msg or "cannot do in current context" in error_msg:
-                        print(f"[INFO] Audio device busy on attempt {attempt + 1}, will retry in {retry_delay} seconds...")
-                    else:
-                        print(f"[ERROR] Unexpected error on attempt {attempt + 1}: {e}")
-                
-                if attempt < max_retries - 1:  # Don't sleep after the last attempt
-                    time.sleep(retry_delay)
-            
+                self.start()
+                if self.is_running():
+                    print(f"[DEBUG] Wake word detection started successfully on attempt {attempt + 1}")
+                    return
+                if attempt < max_retries - 1:  # Don't wait after the last attempt
+                    device_manager.wait_until_ready(retry_delay)
             print(f"[WARNING] Failed to start wake word detection after {max_retries} attempts")
-            print("[INFO] Audio device may still be busy. Try ending calls or closing audio apps.")
-        
+
         # Run retry in background thread
         threading.Thread(target=retry_worker, daemon=True).start()
 
@@ -335,12 +389,7 @@ class WakeWordDetector:
         """This is a special Python method called a destructor. It ensures cleanup happens
         when the object is about to be destroyed, preventing resource leaks."""
         # First, ensure the listening thread is stopped.
-        if self.is_running():
-            self.stop()
-            
-        if self.p_audio:
-            self.p_audio.terminate()
-            self.p_audio = None
+        self.stop()
 
         if self.porcupine:
             self.porcupine.delete()
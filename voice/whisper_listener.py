@@ -1,51 +1,137 @@
-import sounddevice as sd
 import numpy as np
-import whisper
-import tempfile
-import scipy.io.wavfile
 import threading
-import ssl
-import certifi
+import time
+from core.config import STT_BACKEND, STT_MODEL_SIZE, STT_STREAMING, VAD_FRAME_MS, AUDIO_PREROLL_SECONDS
+from voice.audio_bus import AudioBus
+from voice.audio_format import to_float32_mono
+from voice.streaming_transcriber import StreamingTranscriber
+from voice.stt_backends import create_stt_backend
+from voice.vad import EnergyVAD, Endpointer
 
 class WhisperListener:
-    def __init__(self, model_size="base"):
-        # Fix SSL certificate issues on macOS
-        try:
-            ssl._create_default_https_context = lambda: ssl.create_default_context(cafile=certifi.where())
-        except:
-            pass
-        
-        try:
-            self.model = whisper.load_model(model_size)  # You can use "tiny", "base", "small", "medium", "large"
-        except Exception as e:
-            print(f"[ERROR] Failed to load Whisper model: {e}")
-            print("[INFO] Trying to download with SSL fix...")
-            # Try with a different approach
-            import os
-            os.environ['REQUESTS_CA_BUNDLE'] = certifi.where()
-            self.model = whisper.load_model(model_size)
-            
+    def __init__(self, model_size=STT_MODEL_SIZE, streaming=STT_STREAMING, backend=None, audio_bus=None,
+                 preroll_seconds=AUDIO_PREROLL_SECONDS):
+        """
+        Args:
+            model_size (str): Whisper model to load ("tiny", "base", "small", ...).
+            streaming (bool): Decode while the user is still talking.
+            backend (STTBackend, optional): A ready speech-to-text engine; by default STT_BACKEND is loaded.
+            audio_bus (AudioBus, optional): The shared microphone stream; a private one is made if not given.
+            preroll_seconds (float): How far back a recording may start (see start_listening's start_position).
+        """
+        self.backend = backend or create_stt_backend(STT_BACKEND, model_size)
+        print(f"[WhisperListener] Using the {self.backend.name} speech-to-text backend")
+
+        self.audio_bus = audio_bus or AudioBus()
         self.is_recording = False
         self.audio = None
-        self.samplerate = 16000
-        self.duration = 5  # seconds
+        self.samplerate = self.audio_bus.samplerate
+        self.frame_size = int(self.samplerate * VAD_FRAME_MS / 1000)
+        self.preroll_samples = int(preroll_seconds * self.samplerate)
         self.recording_thread = None
         self.on_finish_callback = None
+        self.on_utterance_end = None
+        self.end_reason = None
+        self._stop_event = threading.Event()
+        # Shared by every recording so the learned background-noise level carries over.
+        self.vad = EnergyVAD()
+        # Decode while the user is still talking (see StreamingTranscriber)
+        self.streaming = streaming
+        self._streamer = None
+        self._subscription = None
+
+    def start_listening(self, on_utterance_end=None, max_utterance=None, no_speech_timeout=None, on_partial=None,
+                        start_position=None):
+        """
+        Starts recording until the user stops talking.
 
-    def start_listening(self):
+        Args:
+            on_utterance_end (callable, optional): Called (from the recording thread) when the recording
+                                                   has ended on its own; call stop_and_transcribe next.
+            max_utterance (float, optional): Overrides the configured maximum utterance length.
+            no_speech_timeout (float, optional): Overrides how long to wait for the user to start talking.
+            on_partial (callable, optional): Receives the transcript so far while the user is speaking
+                                             (streaming mode only).
+            start_position (int, optional): Audio bus position to record from, e.g. where the wake word
+                                            ended, so words said before this call aren't lost. At most
+                                            preroll_seconds of already captured audio is used.
+        """
         if self.is_recording:
             return
         self.is_recording = True
         print("[WhisperListener] Started recording...")
         self.audio = None
-        self.recording_thread = threading.Thread(target=self._record_audio, daemon=True)
+        self.end_reason = None
+        self.on_utterance_end = on_utterance_end
+        self._stop_event = threading.Event()
+        limits = {}
+        if max_utterance is not None:
+            limits["max_utterance"] = max_utterance
+        if no_speech_timeout is not None:
+            limits["no_speech_timeout"] = no_speech_timeout
+        endpointer = Endpointer(frame_seconds=self.frame_size / self.samplerate, vad=self.vad, **limits)
+        if self._streamer:
+            self._streamer.cancel()
+        self._streamer = None
+        if self.streaming:
+            self._streamer = StreamingTranscriber(self.backend.transcribe_segments, self.samplerate, on_partial=on_partial)
+            self._streamer.start()
+        if start_position is not None:
+            start_position = max(start_position, self.audio_bus.position - self.preroll_samples)
+        self.recording_thread = threading.Thread(target=self._record_audio, args=(endpointer, self._stop_event, start_position),
+                                                 daemon=True)
         self.recording_thread.start()
 
-    def _record_audio(self):
-        self.audio = sd.rec(int(self.duration * self.samplerate), samplerate=self.samplerate, channels=1, dtype='int16')
-        sd.wait()
+    def _record_audio(self, endpointer, stop_event, start_position=None):
+        frames = []
+        ended = []
+        streamer = self._streamer
+
+        try:
+            # The microphone is already open; recording is just reading the shared stream from now on.
+            self.audio_bus.start()
+            # With a start position the buffered pre-roll is read first (much faster than real time).
+            subscription = self.audio_bus.subscribe("listener", start=start_position)
+            self._subscription = subscription
+        except Exception as e:
+            print(f"[ERROR] Recording failed: {e}")
+            subscription = None
+        deadline = time.monotonic() + endpointer.max_utterance + 1
+        try:
+            while subscription and not stop_event.is_set() and time.monotonic() < deadline:
+                block = subscription.read(self.frame_size, timeout=0.5)
+                if block is None:
+                    if subscription.closed or not self.audio_bus.is_running():
+                        break
+                    continue
+                # Converted to float32 once here (Whisper's input format), so nothing needs converting afterwards.
+                frame = to_float32_mono(block)
+                frames.append(frame)
+                if streamer:
+                    streamer.add_audio(frame)
+                reason = endpointer.feed(frame)
+                if reason:
+                    ended.append(reason)
+                    stop_event.set()
+        finally:
+            if subscription:
+                subscription.close()
+
+        if stop_event is not self._stop_event:
+            if streamer:
+                streamer.cancel()
+            return  # stopped, and a newer recording has already started
+        self.end_reason = ended[0] if ended else None
+        # Nothing but silence: skip the decode (Whisper tends to hallucinate words on empty audio).
+        if frames and endpointer.speech_started:
+            self.audio = np.concatenate(frames)
+        elif streamer:
+            streamer.cancel()
+            self._streamer = None
         self.is_recording = False
-        print("[WhisperListener] Finished recording.")
+        print(f"[WhisperListener] Finished recording ({self.end_reason or 'stopped'}, {endpointer.elapsed:.1f}s).")
+        if self.on_utterance_end and self.end_reason:
+            self.on_utterance_end()
 
     def stop_and_transcribe(self, on_finish=None):
         if self.is_recording:
@@ -57,22 +143,27 @@ class WhisperListener:
             if on_finish:
                 on_finish("")
             return
-        # Save to temp file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
-            scipy.io.wavfile.write(f.name, self.samplerate, self.audio)
-            result = self.model.transcribe(f.name)
-            text = result["text"].strip()
-            print(f"[WhisperListener] Transcribed: '{text}'")
-            if on_finish:
-                on_finish(text)
+        if self._streamer:
+            # Most of the utterance was decoded while it was spoken; only the tail is left.
+            text = self._streamer.finish()
+            self._streamer = None
+        else:
+            # Hand the samples to Whisper directly: no temp WAV file and no ffmpeg decode.
+            text = self.backend.transcribe(to_float32_mono(self.audio))
+        print(f"[WhisperListener] Transcribed: '{text}'")
+        if on_finish:
+            on_finish(text)
 
     def stop(self):
         """Force stop any ongoing recording"""
         if self.is_recording:
             print("[WhisperListener] Force stopping recording...")
             self.is_recording = False
+            self._stop_event.set()
+            if self._subscription:
+                self._subscription.close()  # wakes the recording thread if it is waiting for audio
             if self.recording_thread and self.recording_thread.is_alive():
                 self.recording_thread.join(timeout=1)
-            # Add a small delay to ensure audio device is released
-            import time
-            time.sleep(0.1) 
\ No newline at end of file
+            if self._streamer:
+                self._streamer.cancel()
+                self._streamer = None 
\ No newline at end of file